@@ -1,7 +1,14 @@
 # create a fastapi app
+from os import path
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from fastapi.staticfiles import StaticFiles
+
+from lc_app.api.routes import router
+from lc_app.core.metrics import render_prometheus
+
 
 def create_app() -> FastAPI:
     """Create a FastAPI application."""
@@ -23,10 +30,17 @@ def create_app() -> FastAPI:
     )
 
     # Include the API router
-    api_router = APIRouter()
-    app.include_router(api_router, prefix="/api")
+    app.include_router(router, prefix="/api")
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        """Expose stage latency and size histograms to Prometheus."""
+        return PlainTextResponse(
+            render_prometheus(), media_type="text/plain; version=0.0.4"
+        )
 
     # Serve static files
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+    if path.isdir("static"):
+        app.mount("/static", StaticFiles(directory="static"), name="static")
 
-    return app
\ No newline at end of file
+    return app
@@ -1 +1,298 @@
-# TODO: implement the routes
\ No newline at end of file
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from os import getenv, path
+from typing import AsyncIterator, Literal
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from langchain_core.documents import Document
+from pydantic import BaseModel, Field
+
+from lc_app.core.engine import DEFAULT_SEARCH_KWARGS, get_engine
+from lc_app.core.federation import is_collection_pattern
+from lc_app.core.filters import build_filter
+from lc_app.core.market import embed_market_data
+from lc_app.core.news import embed_news
+from lc_app.core.retrievers import compression_report
+from lc_app.core.rag import embed_csv_data, embed_json_data, embed_web_data
+from lc_app.core.streaming import StreamTimings
+from lc_app.core.tracing import tracer_stats
+
+DEFAULT_EMBED_JOB_WORKERS = 1  # Ingest jobs run at the same time by the API
+DEFAULT_EMBED_JOBS_KEPT = 1000  # Finished ingest jobs kept for status requests
+DEFAULT_API_DATA_ROOT = "data"  # Directory every API document and collection is in
+MAX_ASK_K = 50  # Most chunks a single question may retrieve
+# Tickers and topics name collection directories, so they must not walk out of one
+PATH_SEGMENT_PATTERN = r"^[A-Za-z0-9][\w.^=-]*$"
+
+router = APIRouter()
+
+
+class AskRequest(BaseModel):
+    query: str
+    db_path: str
+    embed_model: str | None = None
+    rag_model: str | None = None
+    k: int = Field(default=DEFAULT_SEARCH_KWARGS["k"], ge=1, le=MAX_ASK_K)
+    ticker: str | None = None
+    source: str | None = None
+    since: str | None = None  # YYYY-MM-DD or an age such as 7d
+
+    def search_kwargs(self) -> dict:
+        """Build retriever search arguments, including any metadata filter."""
+        try:
+            where = build_filter(
+                ticker=self.ticker, source=self.source, since=self.since
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return {"k": self.k, "filter": where} if where else {"k": self.k}
+
+
+class Source(BaseModel):
+    content: str
+    metadata: dict
+
+    @classmethod
+    def from_document(cls, doc: Document) -> "Source":
+        return cls(content=doc.page_content, metadata=doc.metadata)
+
+
+class AskResponse(BaseModel):
+    answer: str
+    sources: list[Source]
+    compression: dict | None = None  # Prompt tokens before and after compression
+
+
+class EmbedRequest(BaseModel):
+    doctype: Literal["csv", "json", "web", "news", "market"]
+    db_path: str
+    embed_model: str | None = None
+    doc: str | None = None
+    urls: list[str] = []
+    scrape_class: str | None = None
+    ticker: str | None = Field(default=None, pattern=PATH_SEGMENT_PATTERN)
+    topic: str | None = Field(default=None, pattern=PATH_SEGMENT_PATTERN)
+    source: str = "yahoo"
+    backend: Literal["chroma", "numpy"] | None = None
+    window: str = "W"  # Period per market data summary
+
+
+class EmbedJob(BaseModel):
+    id: str
+    status: Literal["queued", "running", "done", "failed"] = "queued"
+    request: EmbedRequest
+    db_path: str
+    created_at: datetime
+    finished_at: datetime | None = None
+    result: str | None = None
+    error: str | None = None
+
+
+_embed_executor = ThreadPoolExecutor(
+    max_workers=int(getenv("EMBED_JOB_WORKERS", DEFAULT_EMBED_JOB_WORKERS)),
+    thread_name_prefix="embed-job",
+)
+_embed_jobs: dict[str, EmbedJob] = {}
+
+
+def _resolve_path(value: str, field: str) -> str:
+    """
+    Resolve a request path under the API data root (API_DATA_ROOT).
+
+    Relative paths are taken from the root. Anything that ends up outside it,
+    through `..` or a symlink, is rejected. Globs and templates are only
+    normalized, since they cannot be resolved before they are expanded.
+    """
+    root = path.realpath(getenv("API_DATA_ROOT", DEFAULT_API_DATA_ROOT))
+    resolved = path.normpath(path.join(root, value))
+    if not is_collection_pattern(value):
+        resolved = path.realpath(resolved)
+    if path.commonpath([root, resolved]) != root:
+        raise HTTPException(
+            status_code=403, detail=f"{field} must be inside the API data root."
+        )
+    return resolved
+
+
+async def _get_engine(request: AskRequest):
+    # Opening a collection the first time touches disk, keep it off the loop
+    return await run_in_threadpool(
+        get_engine,
+        _resolve_path(request.db_path, "db_path"),
+        embedding_model=request.embed_model,
+        llm_model=request.rag_model,
+    )
+
+
+@router.post("/ask", response_model=AskResponse)
+async def ask(request: AskRequest) -> AskResponse:
+    """Answer a question with the RAG chain."""
+    engine = await _get_engine(request)
+    answer, sources = await engine.aquery(
+        request.query, search_kwargs=request.search_kwargs()
+    )
+    return AskResponse(
+        answer=answer,
+        sources=[Source.from_document(doc) for doc in sources],
+        compression=compression_report(sources),
+    )
+
+
+def _sse(event: str, data: object) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/ask/stream")
+async def ask_stream(request: AskRequest) -> StreamingResponse:
+    """Answer a question with the RAG chain, streaming tokens as server-sent events."""
+    timings = StreamTimings()
+    search_kwargs = request.search_kwargs()
+    engine = await _get_engine(request)
+    cached = await run_in_threadpool(
+        engine.cached_answer, request.query, search_kwargs
+    )
+    if cached is not None:
+        answer, docs = cached
+    else:
+        answer, docs = None, await engine.aretrieve(request.query, search_kwargs)
+    timings.mark_retrieved()
+
+    async def events() -> AsyncIterator[str]:
+        yield _sse(
+            "sources", [Source.from_document(doc).model_dump() for doc in docs]
+        )
+        if answer is not None:
+            timings.mark_token()
+            yield _sse("token", answer)
+        else:
+            tokens = []
+            try:
+                async for token in engine.astream(request.query, docs):
+                    timings.mark_token()
+                    tokens.append(token)
+                    yield _sse("token", token)
+            except Exception as e:
+                yield _sse("error", str(e))
+                return
+            await run_in_threadpool(
+                engine.remember_answer,
+                request.query,
+                "".join(tokens),
+                docs,
+                search_kwargs,
+            )
+        timings.mark_done()
+        yield _sse("done", timings.as_dict())
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def _run_embed_job(job: EmbedJob) -> None:
+    """Run an ingest job on the embed worker pool."""
+    job.status = "running"
+    request = job.request
+    try:
+        if request.doctype == "csv":
+            stats = embed_csv_data(
+                request.doc,
+                job.db_path,
+                model=request.embed_model,
+                backend=request.backend,
+            )
+        elif request.doctype == "json":
+            stats = embed_json_data(
+                request.doc,
+                job.db_path,
+                model=request.embed_model,
+                backend=request.backend,
+            )
+        elif request.doctype == "market":
+            stats = embed_market_data(
+                request.doc,
+                job.db_path,
+                ticker=request.ticker,
+                window=request.window,
+                model=request.embed_model,
+                backend=request.backend,
+            )
+        elif request.doctype == "web":
+            stats = embed_web_data(
+                request.urls,
+                job.db_path,
+                webpage_class=request.scrape_class,
+                model=request.embed_model,
+                backend=request.backend,
+            )
+        else:
+            job.db_path, stats = embed_news(
+                job.db_path,
+                ticker=request.ticker,
+                topic=request.topic,
+                source=request.source,
+                embed_model=request.embed_model,
+                backend=request.backend,
+            )
+        job.result = str(stats) if stats is not None else "No articles found."
+        job.status = "done"
+    except Exception as e:
+        job.error = repr(e)
+        job.status = "failed"
+    finally:
+        job.finished_at = datetime.now()
+
+
+def _evict_finished_jobs() -> None:
+    """Forget the oldest finished jobs beyond EMBED_JOBS_KEPT."""
+    kept = int(getenv("EMBED_JOBS_KEPT", DEFAULT_EMBED_JOBS_KEPT))
+    finished = [
+        job_id
+        for job_id, job in _embed_jobs.items()
+        if job.status in ("done", "failed")
+    ]
+    for job_id in finished[: max(0, len(finished) - kept)]:
+        del _embed_jobs[job_id]
+
+
+@router.post("/embed", response_model=EmbedJob, status_code=202)
+async def embed(request: EmbedRequest) -> EmbedJob:
+    """Queue an ingest job and return immediately."""
+    if request.doctype in ("csv", "json", "market") and not request.doc:
+        raise HTTPException(status_code=422, detail="A document path is required.")
+    if request.doctype == "web" and not request.urls:
+        raise HTTPException(status_code=422, detail="At least one URL is required.")
+    request = request.model_copy(
+        update={
+            "db_path": _resolve_path(request.db_path, "db_path"),
+            "doc": _resolve_path(request.doc, "doc") if request.doc else None,
+        }
+    )
+    job = EmbedJob(
+        id=uuid.uuid4().hex,
+        request=request,
+        db_path=request.db_path,
+        created_at=datetime.now(),
+    )
+    _evict_finished_jobs()
+    _embed_jobs[job.id] = job
+    _embed_executor.submit(_run_embed_job, job)
+    return job
+
+
+@router.get("/embed/{job_id}", response_model=EmbedJob)
+async def embed_status(job_id: str) -> EmbedJob:
+    """Get the status of an ingest job."""
+    job = _embed_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job.")
+    return job
+
+
+@router.get("/tracing")
+async def tracing() -> dict:
+    """Get trace export counters: queued, dropped, sent and flush latency."""
+    stats = tracer_stats()
+    return {"enabled": stats is not None, **(stats or {})}
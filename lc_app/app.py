@@ -1,12 +1,30 @@
 import click
 
-from lc_app.commands import add_commands
+from lc_app.commands import LazyGroup, add_commands
 
 
-@click.group()
-def cli():
+@click.group(cls=LazyGroup)
+@click.option(
+    "--profile", is_flag=True, help="Print time spent per stage when done."
+)
+@click.option(
+    "--profile-output",
+    type=str,
+    help="Write a cProfile dump, or a pyinstrument .html/.txt report, here.",
+)
+@click.pass_context
+def cli(ctx: click.Context, profile: bool, profile_output: str | None):
     """A starter CLI application."""
-    pass
+    if profile_output:
+        from lc_app.core.metrics import Profiler
+
+        profiler = Profiler(profile_output)
+        profiler.start()
+        ctx.call_on_close(profiler.stop)
+    if profile:
+        from lc_app.core.metrics import format_summary
+
+        ctx.call_on_close(lambda: click.echo(format_summary(), err=True))
 
 
 def run():
@@ -1,11 +1,114 @@
-from click import Command, Group
+import ast
+import importlib
+import importlib.util
+import pkgutil
+from dataclasses import dataclass
+from os import path
+
+from click import Command, Context, Group, HelpFormatter
+
+
+@dataclass
+class LazyCommand:
+    """A command found in the commands package but not imported yet."""
+
+    module: str
+    attribute: str
+    help: str
+
+
+def _command_name(function: ast.FunctionDef) -> str | None:
+    """Get the CLI name of a function decorated with click.command/group."""
+    for decorator in function.decorator_list:
+        call = decorator if isinstance(decorator, ast.Call) else None
+        target = call.func if call else decorator
+        if isinstance(target, ast.Attribute) and target.attr in (
+            "command",
+            "group",
+        ):
+            for keyword in call.keywords if call else []:
+                if keyword.arg == "name" and isinstance(keyword.value, ast.Constant):
+                    return keyword.value.value
+            return function.name.replace("_", "-")
+    return None
+
+
+def discover_commands(package: str) -> dict[str, LazyCommand]:
+    """
+    Find the commands of a package without importing its modules.
+
+    Each module is parsed for a top-level click command or group named after
+    the module, and its docstring becomes the help shown in `--help`.
+    """
+    spec = importlib.util.find_spec(package)
+    found = {}
+    for module_info in pkgutil.iter_modules(spec.submodule_search_locations):
+        name = module_info.name
+        source_path = path.join(module_info.module_finder.path, f"{name}.py")
+        if not path.exists(source_path):
+            continue
+        with open(source_path) as f:
+            tree = ast.parse(f.read(), source_path)
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef) and node.name == name:
+                command_name = _command_name(node)
+                if command_name is not None:
+                    found[command_name] = LazyCommand(
+                        module=f"{package}.{name}",
+                        attribute=name,
+                        help=(ast.get_docstring(node) or "").split("\n")[0],
+                    )
+    return found
+
+
+class LazyGroup(Group):
+    """
+    A click group whose subcommands are imported when they are first used.
+
+    Listing the commands in `--help` only needs their names and docstrings,
+    which are read from source, so the CLI starts without importing LangChain,
+    Chroma or Playwright.
+    """
+
+    def __init__(
+        self, *args, lazy_commands: dict[str, LazyCommand] | None = None, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx: Context) -> list[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx: Context, cmd_name: str) -> Command | None:
+        command = super().get_command(ctx, cmd_name)
+        if command is None and cmd_name in self.lazy_commands:
+            lazy = self.lazy_commands[cmd_name]
+            command = getattr(importlib.import_module(lazy.module), lazy.attribute)
+            self.add_command(command, cmd_name)
+        return command
+
+    def format_commands(self, ctx: Context, formatter: HelpFormatter) -> None:
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                command = self.commands[name]
+                if command.hidden:
+                    continue
+                rows.append((name, command.get_short_help_str(formatter.width)))
+            else:
+                rows.append((name, self.lazy_commands[name].help))
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
 
 
 def add_commands(cli: Group):
     """Add commands to the CLI group."""
-    # dynamically import all commands from the commands directory
-    import pkgutil
+    if isinstance(cli, LazyGroup):
+        cli.lazy_commands.update(discover_commands(__name__))
+        return cli
 
+    # dynamically import all commands from the commands directory
     from lc_app import commands
 
     for _, name, _ in pkgutil.iter_modules(commands.__path__):
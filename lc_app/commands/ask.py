@@ -1,13 +1,21 @@
+import time
+
 import click
 
-from lc_app.core.rag import run_rag_chain
+from lc_app.core.filters import build_filter
+from lc_app.core.streaming import StreamTimings, ThinkFilter, strip_think
 
 
 @click.command()
 @click.option(
     "--query", type=str, prompt="Enter your query", help="The query you want to ask."
 )
-@click.option("--db-path", type=str, help="Path to the database.", envvar="DB_PATH")
+@click.option(
+    "--db-path",
+    type=str,
+    help="Path to the database, or a glob or template over several databases.",
+    envvar="DB_PATH",
+)
 @click.option(
     "--embed-model",
     type=str,
@@ -22,17 +30,75 @@ from lc_app.core.rag import run_rag_chain
     required=False,
     envvar="RAG_MODEL",
 )
+@click.option(
+    "--stream/--no-stream",
+    default=False,
+    help="Print the answer token by token as it is generated.",
+)
+@click.option(
+    "--hide-think",
+    is_flag=True,
+    default=False,
+    help="Hide the <think> section produced by reasoning models.",
+)
+@click.option(
+    "--ticker", type=str, required=False, help="Only use news for this ticker."
+)
+@click.option(
+    "--source", type=str, required=False, help="Only use news from this publisher."
+)
+@click.option(
+    "--since",
+    type=str,
+    required=False,
+    help="Only use news published since a date (YYYY-MM-DD) or age (e.g. 7d).",
+)
 def ask(
     query: str,
     db_path: str,
     embed_model: str | None = None,
     rag_model: str | None = None,
+    stream: bool = False,
+    hide_think: bool = False,
+    ticker: str | None = None,
+    source: str | None = None,
+    since: str | None = None,
 ):
     """Ask a question using the RAG chain."""
+    from lc_app.core.engine import DEFAULT_SEARCH_KWARGS, get_engine
+    from lc_app.core.retrievers import compression_report
+
     click.echo(f"Loading documents from: {db_path}")
     click.echo(f"You asked: {query}")
-    answer, _ = run_rag_chain(
-        db_path=db_path, query=query, embedding_model=embed_model, llm_model=rag_model
-    )
-    click.echo(f"Answer: {answer}")
+    try:
+        where = build_filter(ticker=ticker, source=source, since=since)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--since")
+    search_kwargs = {**DEFAULT_SEARCH_KWARGS, "filter": where} if where else None
+    engine = get_engine(db_path, embedding_model=embed_model, llm_model=rag_model)
+
+    if not stream:
+        started_at = time.perf_counter()
+        answer, sources = engine.query(query, search_kwargs)
+        if hide_think:
+            answer = strip_think(answer)
+        click.echo(f"Answer: {answer}")
+        click.echo(f"Total latency: {time.perf_counter() - started_at:.2f}s")
+        report = compression_report(sources)
+        if report is not None:
+            click.echo(
+                f"Context tokens: {report['tokens_before']} -> "
+                f"{report['tokens_after']} (saved {report['tokens_saved']})"
+            )
+        return
+
+    timings = StreamTimings()
+    think_filter = ThinkFilter() if hide_think else None
+    click.echo("Answer: ", nl=False)
+    for token in engine.stream_query(query, search_kwargs, timings=timings):
+        click.echo(think_filter.feed(token) if think_filter else token, nl=False)
+    if think_filter:
+        click.echo(think_filter.flush(), nl=False)
+    click.echo()
+    click.echo(f"Timings: {timings}")
     return
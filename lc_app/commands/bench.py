@@ -0,0 +1,157 @@
+import json
+import os
+from tempfile import TemporaryDirectory
+
+import click
+
+from lc_app.core.vectorstores import DEFAULT_VECTOR_BACKEND, VECTOR_BACKENDS
+
+
+def _prepare_environment(fetch_mode: str = "http") -> None:
+    """Keep benchmarks offline and free of cross-run caching."""
+    os.environ["EMBED_CACHE"] = "0"
+    os.environ["ANSWER_CACHE"] = "0"
+    os.environ["SCRAPER_FETCH_MODE"] = fetch_mode
+    os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+
+def _emit(results: dict, output: str | None) -> None:
+    """Write benchmark results as JSON to a file or stdout."""
+    from lc_app.core.benchmarks import environment
+
+    payload = json.dumps({"environment": environment(), **results}, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(payload)
+        click.echo(f"Benchmark results written to: {output}")
+    else:
+        click.echo(payload)
+
+
+_output_option = click.option(
+    "--output", type=str, required=False, help="Write JSON results to this file."
+)
+
+
+@click.group()
+def bench():
+    """Benchmark scrape, ingest and query paths offline."""
+    pass
+
+
+@bench.command()
+@click.option("--stories", type=int, default=40, help="Stories on the fixture page.")
+@click.option("--runs", type=int, default=3, help="Number of full scrapes.")
+@click.option(
+    "--host-interval",
+    type=float,
+    default=0.0,
+    help="Seconds between requests to the fixture host.",
+)
+@click.option(
+    "--fetch-mode",
+    type=click.Choice(["http", "browser", "auto"]),
+    default="http",
+    help="Scraper fetch mode; browser requires Chromium.",
+)
+@_output_option
+def scrape(
+    stories: int, runs: int, host_interval: float, fetch_mode: str, output: str | None
+):
+    """Measure scrape throughput against a local fixture server."""
+    from lc_app.core.benchmarks import bench_scrape
+
+    _prepare_environment(fetch_mode)
+    _emit({"scrape": bench_scrape(stories, runs, host_interval)}, output)
+
+
+@bench.command()
+@click.option("--rows", type=int, default=5000, help="Rows in the generated CSV.")
+@click.option(
+    "--articles", type=int, default=500, help="Articles in the generated JSON."
+)
+@_output_option
+def ingest(rows: int, articles: int, output: str | None):
+    """Measure split/embed/insert throughput of embed_csv_data and embed_json_data."""
+    from lc_app.core.benchmarks import bench_ingest
+
+    _prepare_environment()
+    with TemporaryDirectory() as workdir:
+        _emit({"ingest": bench_ingest(workdir, rows, articles)}, output)
+
+
+@bench.command()
+@click.option(
+    "--sizes",
+    type=str,
+    default="100,1000,10000",
+    help="Comma separated collection sizes.",
+)
+@click.option("--queries", type=int, default=50, help="Queries per collection size.")
+@click.option(
+    "--backend",
+    type=click.Choice(VECTOR_BACKENDS),
+    default=DEFAULT_VECTOR_BACKEND,
+    help="Vector store backend to benchmark.",
+)
+@_output_option
+def query(sizes: str, queries: int, backend: str, output: str | None):
+    """Measure run_rag_chain latency percentiles across collection sizes."""
+    from lc_app.core.benchmarks import bench_query
+
+    _prepare_environment()
+    parsed = tuple(int(size) for size in sizes.split(",") if size.strip())
+    with TemporaryDirectory() as workdir:
+        results = bench_query(workdir, parsed, queries, backend)
+        _emit({"query": {"backend": backend, **results}}, output)
+
+
+@bench.command()
+@click.option("--runs", type=int, default=10, help="Runs per CLI invocation.")
+@click.option(
+    "--max-ratio",
+    type=float,
+    default=0.5,
+    show_default=True,
+    help="Fail when lazy --help takes longer than this share of the eager one.",
+)
+@click.option(
+    "--max-seconds",
+    type=float,
+    required=False,
+    help="Fail when any timed invocation's median exceeds this many seconds.",
+)
+@_output_option
+def startup(
+    runs: int, max_ratio: float, max_seconds: float | None, output: str | None
+):
+    """Measure CLI start-up latency, e.g. of --help and test."""
+    from lc_app.core.benchmarks import bench_startup, startup_regressions
+
+    results = bench_startup(runs=runs)
+    _emit({"startup": results}, output)
+    failures = startup_regressions(results, max_ratio, max_seconds)
+    if failures:
+        raise click.ClickException("Start-up regressed: " + "; ".join(failures))
+
+
+@bench.command(name="all")
+@_output_option
+def all_(output: str | None):
+    """Run every benchmark with default settings."""
+    from lc_app.core.benchmarks import (
+        bench_ingest,
+        bench_query,
+        bench_scrape,
+        bench_startup,
+    )
+
+    _prepare_environment()
+    with TemporaryDirectory() as workdir:
+        results = {
+            "scrape": bench_scrape(),
+            "ingest": bench_ingest(workdir),
+            "query": bench_query(workdir),
+            "startup": bench_startup(),
+        }
+    _emit(results, output)
@@ -0,0 +1,121 @@
+import click
+
+from lc_app.core.federation import expand_collections, is_collection_pattern
+from lc_app.core.maintenance import (
+    DEFAULT_HNSW_CONSTRUCTION_EF,
+    DEFAULT_HNSW_M,
+    DEFAULT_HNSW_SEARCH_EF,
+    collection_stats,
+    compact_collection,
+    merge_collections,
+    snapshot_collection,
+)
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+_db_path_option = click.option(
+    "--db-path", type=str, help="Path to the database.", envvar="DB_PATH"
+)
+
+
+@click.group()
+def db():
+    """Inspect and maintain Chroma collections."""
+    pass
+
+
+@db.command()
+@click.option(
+    "--db-path",
+    type=str,
+    help="Path to the database, or a glob or template over several databases.",
+    envvar="DB_PATH",
+)
+def stats(db_path: str):
+    """Show record counts, duplicates, size on disk and index settings."""
+    db_paths = (
+        expand_collections(db_path) if is_collection_pattern(db_path) else [db_path]
+    )
+    if not db_paths:
+        click.echo(f"No collections match: {db_path}")
+        return
+    for path in db_paths:
+        try:
+            result = collection_stats(path)
+        except FileNotFoundError as e:
+            raise click.ClickException(str(e))
+        index = ", ".join(f"{k}={v}" for k, v in result["index"].items()) or "defaults"
+        click.echo(
+            f"{result['path']} ({result['backend']}): {result['count']} records, "
+            f"{result['duplicates']} duplicates, {result['segments']} segments, "
+            f"{_megabytes(result['size_bytes'])}, index {index}, "
+            f"keyword index {'yes' if result['keyword_index'] else 'no'}"
+        )
+
+
+@db.command()
+@_db_path_option
+@click.option(
+    "--m", type=int, default=DEFAULT_HNSW_M, help="HNSW links per node (Chroma)."
+)
+@click.option(
+    "--construction-ef",
+    type=int,
+    default=DEFAULT_HNSW_CONSTRUCTION_EF,
+    help="HNSW candidate list size while building (Chroma).",
+)
+@click.option(
+    "--search-ef",
+    type=int,
+    default=DEFAULT_HNSW_SEARCH_EF,
+    help="HNSW candidate list size while searching (Chroma).",
+)
+def compact(db_path: str, m: int, construction_ef: int, search_ef: int):
+    """Drop duplicate chunks and rebuild the vector index."""
+    click.echo(f"Compacting: {db_path}")
+    try:
+        result = compact_collection(db_path, m, construction_ef, search_ef)
+    except FileNotFoundError as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"Kept {result['kept']} records, removed {result['removed']} duplicates, "
+        f"{_megabytes(result['size_before'])} -> {_megabytes(result['size_after'])}"
+    )
+
+
+@db.command()
+@click.option(
+    "--source",
+    type=str,
+    multiple=True,
+    required=True,
+    help="Database path, glob or template to merge; may be repeated.",
+)
+@click.option("--target", type=str, required=True, help="Database to merge into.")
+def merge(source: list[str], target: str):
+    """Fold many collections, e.g. per-day directories, into one."""
+    try:
+        result = merge_collections(list(source), target)
+    except (FileNotFoundError, ValueError) as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"Merged {len(result['sources'])} collections into {result['target']}: "
+        f"{result['copied']} records copied, {result['skipped']} duplicates skipped"
+    )
+
+
+@db.command()
+@_db_path_option
+@click.option("--target", type=str, required=True, help="Directory for the copy.")
+def snapshot(db_path: str, target: str):
+    """Write a consistent copy of a collection, e.g. for a read replica."""
+    try:
+        result = snapshot_collection(db_path, target)
+    except (FileExistsError, FileNotFoundError) as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"Snapshot written to {result['path']} ({_megabytes(result['size_bytes'])})"
+    )
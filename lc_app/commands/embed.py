@@ -1,12 +1,31 @@
-from tempfile import NamedTemporaryFile
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
 import click
 
-from lc_app.core import utils
-from lc_app.core.rag import embed_csv_data, embed_json_data, embed_web_data
-from lc_app.core.scrapers.models import Article, DataSet
-from lc_app.core.scrapers.yf_scraper import YahooFinanceNewsScraper
+from lc_app.core.jobs import DEFAULT_JOB_ATTEMPTS, DEFAULT_JOB_BACKOFF
+from lc_app.core.vectorstores import VECTOR_BACKENDS
+
+if TYPE_CHECKING:
+    from lc_app.core.pipeline import IngestStats
+
+
+def _echo_progress(stats: "IngestStats") -> None:
+    """Report ingest progress after every written batch."""
+    click.echo(f"  ... {stats}")
+
+
+_backend_option = click.option(
+    "--backend",
+    type=click.Choice(VECTOR_BACKENDS),
+    required=False,
+    help="Vector store for new collections (default: VECTOR_BACKEND or chroma); "
+    "existing ones keep theirs.",
+)
+_refresh_option = click.option(
+    "--refresh",
+    is_flag=True,
+    help="Scrape every article again instead of using the article cache.",
+)
 
 
 @click.group()
@@ -28,6 +47,21 @@ def embed():
     "--url", type=str, multiple=True, required=False, help="Path to web urls."
 )
 @click.option("--scrape-class", type=str, required=False, help="CSS class to scrape.")
+@click.option(
+    "--batch-size",
+    type=int,
+    required=False,
+    help="Documents embedded per batch.",
+    envvar="EMBED_BATCH_SIZE",
+)
+@click.option(
+    "--workers",
+    type=int,
+    required=False,
+    help="Concurrent embedding workers.",
+    envvar="EMBED_WORKERS",
+)
+@_backend_option
 def raw(
     doctype: Literal["csv", "web"],
     db_path: str,
@@ -35,8 +69,13 @@ def raw(
     doc: str | None = None,
     url: list[str] | None = None,
     scrape_class: str | None = None,
+    batch_size: int | None = None,
+    workers: int | None = None,
+    backend: str | None = None,
 ):
     """Embed documents using Ollama and store them in the chroma database."""
+    from lc_app.core.rag import embed_csv_data, embed_web_data
+
     click.echo(f"Embedding documents from: {doc}")
 
     if doctype == "csv":
@@ -44,18 +83,35 @@ def raw(
         if doc is None:
             click.echo("No document path provided for CSV.")
             return
-        embed_csv_data(file_path=doc, chroma_db_path=db_path, model=embed_model)
+        try:
+            stats = embed_csv_data(
+                file_path=doc,
+                chroma_db_path=db_path,
+                model=embed_model,
+                batch_size=batch_size,
+                workers=workers,
+                progress=_echo_progress,
+                backend=backend,
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Ingested {stats}")
     elif doctype == "web":
         click.echo("Document type is Web.")
         if url is None:
             click.echo("No URL provided for web data.")
             return
-        embed_web_data(
-            urls=url,
-            chroma_db_path=db_path,
-            webpage_class=scrape_class,
-            model=embed_model,
-        )
+        try:
+            stats = embed_web_data(
+                urls=url,
+                chroma_db_path=db_path,
+                webpage_class=scrape_class,
+                model=embed_model,
+                backend=backend,
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Ingested {stats}")
     else:
         click.echo("Unsupported document type.")
         return
@@ -65,6 +121,60 @@ def raw(
     return
 
 
+@embed.command()
+@click.option(
+    "--doc",
+    type=str,
+    required=True,
+    help="Path to a market data CSV or Parquet file.",
+)
+@click.option("--db-path", type=str, help="Path to the database.", envvar="DB_PATH")
+@click.option(
+    "--ticker",
+    type=str,
+    required=False,
+    help="Ticker of the rows, if the file has no ticker or symbol column.",
+)
+@click.option(
+    "--window",
+    type=str,
+    default="W",
+    show_default=True,
+    help="Period summarized per chunk, as a pandas alias, e.g. D, W, M or Q.",
+)
+@click.option(
+    "--embed-model", type=str, help="Embedding model to use.", envvar="EMBED_MODEL"
+)
+@_backend_option
+def market(
+    doc: str,
+    db_path: str,
+    ticker: str | None = None,
+    window: str = "W",
+    embed_model: str | None = None,
+    backend: str | None = None,
+):
+    """Embed per-ticker market data summaries and store the rows as Parquet."""
+    from lc_app.core.market import embed_market_data
+
+    click.echo(f"Embedding market data from: {doc}")
+    try:
+        stats = embed_market_data(
+            doc,
+            db_path,
+            ticker=ticker,
+            window=window,
+            model=embed_model,
+            progress=_echo_progress,
+            backend=backend,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Ingested {stats}")
+    click.echo(f"Summaries embedded and rows stored in: {db_path}")
+    click.echo("Use 'lookup' for numeric questions and 'ask' for the rest.")
+
+
 @embed.command()
 @click.option(
     "--db-path", type=str, required=True, help="Path to the database.", envvar="DB_PATH"
@@ -90,6 +200,8 @@ def raw(
     help="Ollama host URL.",
     envvar="OLLAMA_HOST",
 )
+@_refresh_option
+@_backend_option
 def news(
     db_path: str,
     ticker: str | None = None,
@@ -97,38 +209,203 @@ def news(
     source: str | None = "yahoo",
     embed_model: str | None = None,
     ollama_host: str | None = None,
+    refresh: bool = False,
+    backend: str | None = None,
 ):
     """Embed news articles for a given ticker symbol."""
+    from lc_app.core.news import NEWS_SOURCES, embed_news
+
     click.echo(f"Embedding news articles for ticker: {ticker}")
 
-    articles: list[Article] = []
-    if source == "yahoo":
-        click.echo("Scraping news articles from Yahoo Finance.")
-        scraper = YahooFinanceNewsScraper(ticker=ticker, topic=topic)
-    else:
+    if source not in NEWS_SOURCES:
         click.echo("Unsupported source.")
         return
+    if source == "yahoo":
+        click.echo("Scraping news articles from Yahoo Finance.")
 
-    articles = utils.run_sync(scraper.scrape_news)
-    if not articles:
+    try:
+        db_path, stats = embed_news(
+            db_path,
+            ticker=ticker,
+            topic=topic,
+            source=source,
+            ollama_host=ollama_host,
+            embed_model=embed_model,
+            backend=backend,
+            refresh=refresh,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if stats is None:
         click.echo("No articles found.")
         return
-    with NamedTemporaryFile(delete=False) as temp_file:
-        db_path = utils.hydreate_template(
-            template_str=db_path,
-            placeholders={
-                "ticker": ticker,
-                "topic": topic or "general",
-            },
-        )
-        temp_file.write(DataSet[Article](entries=articles).model_dump_json().encode())
-        temp_file.flush()
-        temp_file.seek(0)
-        temp_file_path = temp_file.name
-        embed_json_data(
-            file_path=temp_file_path, chroma_db_path=db_path, model=embed_model
-        )
+    click.echo(f"Ingested {stats}")
     click.echo(f"Articles embedded and stored in: {db_path}")
     click.echo("Embedding completed successfully.")
     click.echo("You can now use the 'ask' command to query the embedded data.")
     return
+
+
+@embed.command()
+@click.option(
+    "--db-path",
+    type=str,
+    required=True,
+    help="Path template of the collections, e.g. ./db/{ticker}.",
+    envvar="DB_PATH",
+)
+@click.option(
+    "--ticker", type=str, multiple=True, required=False, help="Ticker symbol."
+)
+@click.option(
+    "--tickers-file",
+    type=click.Path(exists=True, dir_okay=False),
+    required=False,
+    help="File of tickers, one per line or comma separated.",
+)
+@click.option(
+    "--topic",
+    type=str,
+    multiple=True,
+    required=False,
+    help="Topic to scrape news articles for.",
+)
+@click.option(
+    "--source", type=str, required=False, default="yahoo", help="Source of the data."
+)
+@click.option(
+    "--workers",
+    type=int,
+    required=False,
+    help="Worker processes scraping and embedding at once.",
+    envvar="JOB_WORKERS",
+)
+@click.option(
+    "--attempts",
+    type=int,
+    default=DEFAULT_JOB_ATTEMPTS,
+    show_default=True,
+    help="Tries per job before it is marked failed.",
+)
+@click.option(
+    "--backoff",
+    type=float,
+    default=DEFAULT_JOB_BACKOFF,
+    show_default=True,
+    help="Seconds before the first retry, doubled after each.",
+)
+@click.option(
+    "--queue-path",
+    type=str,
+    required=False,
+    help="Job queue database.",
+    envvar="JOBS_PATH",
+)
+@click.option(
+    "--embed-model",
+    type=str,
+    required=False,
+    help="Embedding model to use.",
+    envvar="EMBED_MODEL",
+)
+@click.option(
+    "--ollama-host",
+    type=str,
+    required=False,
+    help="Ollama host URL.",
+    envvar="OLLAMA_HOST",
+)
+@_refresh_option
+@_backend_option
+def batch(
+    db_path: str,
+    ticker: tuple[str, ...] = (),
+    tickers_file: str | None = None,
+    topic: tuple[str, ...] = (),
+    source: str = "yahoo",
+    workers: int | None = None,
+    attempts: int = DEFAULT_JOB_ATTEMPTS,
+    backoff: float = DEFAULT_JOB_BACKOFF,
+    queue_path: str | None = None,
+    embed_model: str | None = None,
+    ollama_host: str | None = None,
+    refresh: bool = False,
+    backend: str | None = None,
+):
+    """Scrape and embed news for many tickers or topics with worker processes.
+
+    Jobs are kept in a persistent queue, so running the command again without
+    tickers or topics resumes the jobs an interrupted run left unfinished.
+    """
+    from lc_app.core.jobs import (
+        DEFAULT_JOB_WORKERS,
+        JobQueue,
+        collection_path,
+        get_jobs_path,
+        read_tickers,
+        run_workers,
+    )
+    from lc_app.core.news import NEWS_SOURCES
+
+    if source not in NEWS_SOURCES:
+        raise click.ClickException(f"Unsupported source {source!r}.")
+    tickers = [t.upper() for t in ticker]
+    if tickers_file:
+        tickers.extend(read_tickers(tickers_file))
+    targets = [(t, None) for t in dict.fromkeys(tickers)]
+    targets += [(None, t) for t in dict.fromkeys(topic)]
+
+    queue = JobQueue(queue_path or get_jobs_path())
+    job_ids = [
+        queue.enqueue(
+            collection_path(db_path, ticker_, topic_),
+            ticker=ticker_,
+            topic=topic_,
+            source=source,
+            embed_model=embed_model,
+            ollama_host=ollama_host,
+            backend=backend,
+            max_attempts=attempts,
+        )
+        for ticker_, topic_ in targets
+    ]
+    unfinished = queue.unfinished()
+    if not unfinished:
+        click.echo("No jobs to run.")
+        return
+    if job_ids:
+        click.echo(f"Queued {len(job_ids)} jobs in: {queue.db_path}")
+    if len(unfinished) > len(job_ids):
+        click.echo(f"Resuming {len(unfinished) - len(job_ids)} unfinished jobs.")
+    workers = min(workers or DEFAULT_JOB_WORKERS, len(unfinished))
+    click.echo(f"Running jobs with {workers} workers.")
+
+    last = None
+
+    def report() -> None:
+        nonlocal last
+        counts = queue.counts(unfinished)
+        if counts != last:
+            last = counts
+            click.echo("  ... " + ", ".join(f"{n} {s}" for s, n in counts.items()))
+
+    try:
+        run_workers(
+            queue.db_path,
+            workers,
+            backoff=backoff,
+            progress=report,
+            refresh=refresh,
+        )
+    except KeyboardInterrupt:
+        click.echo("Interrupted; run 'embed batch' again to resume.")
+        raise SystemExit(130)
+    report()
+
+    for job in queue.jobs(unfinished):
+        if job.status == "failed":
+            error = job.error.splitlines()[0] if job.error else "unknown error"
+            click.echo(f"Failed {job.name} after {job.attempts} attempts: {error}")
+    done = queue.counts(unfinished)["done"]
+    click.echo(f"Finished {done} of {len(unfinished)} jobs.")
+    queue.close()
@@ -0,0 +1,47 @@
+import click
+
+
+@click.command()
+@click.option("--db-path", type=str, help="Path to the database.", envvar="DB_PATH")
+@click.option("--ticker", type=str, required=False, help="Only rows of this ticker.")
+@click.option(
+    "--since",
+    type=str,
+    required=False,
+    help="Only rows on or after a date (YYYY-MM-DD) or age (e.g. 30d).",
+)
+@click.option(
+    "--until", type=str, required=False, help="Only rows on or before a date."
+)
+@click.option(
+    "--rows", type=int, default=0, help="Also print the last N matching rows."
+)
+def lookup(
+    db_path: str,
+    ticker: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    rows: int = 0,
+):
+    """Answer numeric market data questions from the stored Parquet rows."""
+    from lc_app.core.filters import parse_since
+    from lc_app.core.market import lookup_market_data, market_summary
+
+    try:
+        df = lookup_market_data(
+            db_path,
+            ticker=ticker,
+            since=parse_since(since) if since else None,
+            until=parse_since(until) if until else None,
+        )
+    except FileNotFoundError as e:
+        raise click.ClickException(str(e))
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    if df.empty:
+        click.echo("No matching rows.")
+        return
+    click.echo(market_summary(df).to_string(float_format="{:.2f}".format))
+    if rows:
+        click.echo()
+        click.echo(df.tail(rows).to_string(index=False, float_format="{:.2f}".format))
@@ -0,0 +1,35 @@
+import os
+
+import click
+
+
+@click.command()
+@click.option("--host", type=str, default="127.0.0.1", help="Host to bind to.")
+@click.option("--port", type=int, default=8000, help="Port to listen on.")
+@click.option(
+    "--workers", type=int, default=1, help="Number of server worker processes."
+)
+@click.option("--reload", is_flag=True, default=False, help="Reload on code changes.")
+@click.option(
+    "--data-root",
+    type=click.Path(file_okay=False),
+    default="data",
+    show_default=True,
+    help="Directory that every document and collection path of a request must be in.",
+    envvar="API_DATA_ROOT",
+)
+def serve(host: str, port: int, workers: int, reload: bool, data_root: str):
+    """Serve the RAG API over HTTP."""
+    import uvicorn
+
+    # Server workers read it from the environment
+    os.environ["API_DATA_ROOT"] = os.path.abspath(data_root)
+
+    uvicorn.run(
+        "lc_app.api:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        reload=reload,
+    )
@@ -0,0 +1,159 @@
+import json
+import sqlite3
+import threading
+import time
+from os import getenv, makedirs, path
+
+import numpy as np
+from langchain_core.documents import Document
+
+VERSION_FILE = "lc_app_version"  # Collection version stamp, bumped on every write
+ANSWER_CACHE_FILE = "answer_cache.sqlite3"  # Answer cache stored next to the collection
+DEFAULT_ANSWER_CACHE_THRESHOLD = 0.95  # Minimum cosine similarity for a cache hit
+DEFAULT_ANSWER_CACHE_TTL = 3600.0  # Seconds a cached answer stays valid
+DEFAULT_ANSWER_CACHE_SIZE = 512  # Cached answers kept per collection
+
+
+def collection_version(db_path: str) -> str:
+    """Get the version stamp of a collection, "0" if it was never written."""
+    try:
+        with open(path.join(db_path, VERSION_FILE)) as f:
+            return f.read().strip() or "0"
+    except FileNotFoundError:
+        return "0"
+
+
+def bump_collection_version(db_path: str) -> str:
+    """Mark a collection as changed, invalidating answers cached against it."""
+    version = str(time.time_ns())
+    makedirs(db_path, exist_ok=True)
+    with open(path.join(db_path, VERSION_FILE), "w") as f:
+        f.write(version)
+    return version
+
+
+class AnswerCache:
+    """
+    Cache answers by query embedding for a single collection.
+
+    A query hits the cache when a previous query against the same collection
+    version and search arguments has a cosine similarity of at least
+    `threshold`. Entries expire after `ttl` seconds, only the newest
+    `max_entries` are kept, and everything cached against an older collection
+    version is dropped as soon as the collection changes.
+    """
+
+    def __init__(self, db_path: str, threshold: float, ttl: float, max_entries: int):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        makedirs(db_path, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path.join(db_path, ANSWER_CACHE_FILE), check_same_thread=False, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                version TEXT NOT NULL,
+                search_key TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                answer TEXT NOT NULL,
+                sources TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _normalize(embedding: list[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(
+        self, search_key: str, embedding: list[float]
+    ) -> tuple[str, list[Document]] | None:
+        """Find a cached answer for a query embedding."""
+        version = collection_version(self.db_path)
+        with self._lock:
+            # Stale entries are skipped here and deleted when answers are stored
+            rows = self._conn.execute(
+                "SELECT embedding, answer, sources FROM answers "
+                "WHERE search_key = ? AND version = ? AND created_at >= ?",
+                (search_key, version, time.time() - self.ttl),
+            ).fetchall()
+        if rows:
+            matrix = np.stack([np.frombuffer(row[0], dtype=np.float32) for row in rows])
+            scores = matrix @ self._normalize(embedding)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                with self._lock:
+                    self.hits += 1
+                _, answer, sources = rows[best]
+                return answer, [Document(**source) for source in json.loads(sources)]
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(
+        self,
+        search_key: str,
+        embedding: list[float],
+        answer: str,
+        sources: list[Document],
+    ) -> None:
+        """Cache an answer for a query embedding."""
+        serialized = json.dumps(
+            [
+                {"page_content": doc.page_content, "metadata": doc.metadata}
+                for doc in sources
+            ],
+            default=str,
+        )
+        version = collection_version(self.db_path)
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM answers WHERE version != ? OR created_at < ?",
+                (version, time.time() - self.ttl),
+            )
+            self._conn.execute(
+                "INSERT INTO answers "
+                "(version, search_key, embedding, answer, sources, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    version,
+                    search_key,
+                    self._normalize(embedding).tobytes(),
+                    answer,
+                    serialized,
+                    time.time(),
+                ),
+            )
+            self._conn.execute(
+                "DELETE FROM answers WHERE id NOT IN "
+                "(SELECT id FROM answers ORDER BY id DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+
+def get_answer_cache(db_path: str) -> AnswerCache | None:
+    """Get an answer cache for a collection, or None if caching is disabled."""
+    if getenv("ANSWER_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    return AnswerCache(
+        db_path,
+        threshold=float(
+            getenv("ANSWER_CACHE_THRESHOLD", DEFAULT_ANSWER_CACHE_THRESHOLD)
+        ),
+        ttl=float(getenv("ANSWER_CACHE_TTL", DEFAULT_ANSWER_CACHE_TTL)),
+        max_entries=int(getenv("ANSWER_CACHE_SIZE", DEFAULT_ANSWER_CACHE_SIZE)),
+    )
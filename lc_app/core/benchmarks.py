@@ -0,0 +1,415 @@
+import csv
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import path
+from typing import Callable
+
+from langchain_chroma import Chroma
+from langchain_community.document_loaders import CSVLoader, JSONLoader
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from lc_app.core import utils
+from lc_app.core.fakes import FAKE_MODEL, FakeEmbeddings
+from lc_app.core.news import scrape_news
+from lc_app.core.pipeline import content_hash, document_id
+from lc_app.core.rag import (
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    JSON_CONTENT_KEY,
+    embed_csv_data,
+    embed_from_texts,
+    embed_json_data,
+    run_rag_chain,
+)
+from lc_app.core.scrapers.models import Article, DataSet
+from lc_app.core.scrapers.yf_scraper import YahooFinanceNewsScraper
+
+WORDS = (
+    "revenue earnings guidance margin growth shares dividend buyback forecast "
+    "analyst upgrade downgrade quarter outlook demand supply chip cloud retail "
+    "inflation rates bond yield merger acquisition lawsuit regulator launch"
+).split()
+TICKERS = ("AAPL", "MSFT", "GOOG", "AMZN", "NVDA", "META", "TSLA", "JPM")
+STARTUP_COMMANDS = (
+    ("--help",),
+    ("test",),
+    ("ask", "--help"),
+    ("embed", "--help"),
+    ("db", "--help"),
+)  # CLI invocations timed by bench_startup
+DEFAULT_STARTUP_MAX_RATIO = 0.5  # Lazy --help p50 allowed, as a share of the eager one
+
+
+def summarize(samples: list[float]) -> dict:
+    """Summarize latency samples in seconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": ordered[-1],
+    }
+
+
+def environment() -> dict:
+    """Describe the machine a benchmark ran on."""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _article_text(rng: random.Random, ticker: str, sentences: int) -> str:
+    body = " ".join(_sentence(rng, rng.randint(8, 20)) for _ in range(sentences))
+    return f"{ticker} {body}"
+
+
+class FixtureServer:
+    """
+    Serve Yahoo Finance shaped listing and article pages from a local thread.
+
+    The listing for any ticker contains `stories` story items that link to
+    article pages on the same server, so scrapers can be benchmarked offline.
+    """
+
+    def __init__(self, stories: int = 40, seed: int = 0):
+        self.stories = stories
+        rng = random.Random(seed)
+        self.pages = {
+            i: (_sentence(rng, 8), _article_text(rng, "", 30)) for i in range(stories)
+        }
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = server.render(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                payload = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def render(self, request_path: str) -> str | None:
+        if request_path.startswith("/quote/") or request_path.startswith("/topic/"):
+            items = "".join(
+                f'<li class="stream-item story-item"><a href="/news/{i}.html">'
+                f"<h3>{title}</h3></a><p>{body[:120]}</p>"
+                f'<div class="publishing">Newswire<i>•</i>{i} hours ago</div></li>'
+                for i, (title, body) in self.pages.items()
+            )
+            return (
+                '<html><body><div class="news-stream topic-stream">'
+                f"<ul>{items}</ul></div></body></html>"
+            )
+        if request_path.startswith("/news/"):
+            try:
+                title, body = self.pages[int(request_path[6:].split(".")[0])]
+            except (KeyError, ValueError):
+                return None
+            return (
+                '<html><body><div class="article">'
+                f'<h1 class="cover-title">{title}</h1>'
+                f'<div class="body">{body}</div></div></body></html>'
+            )
+        return None
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def bench_scrape(stories: int = 40, runs: int = 3, host_interval: float = 0.0) -> dict:
+    """Measure article throughput of the Yahoo Finance scraper against fixtures."""
+    samples = []
+    articles = 0
+    with FixtureServer(stories=stories) as server:
+        for _ in range(runs):
+            scraper = YahooFinanceNewsScraper(ticker="BENCH", base_url=server.base_url)
+            scraper.host_interval = host_interval
+            started_at = time.perf_counter()
+            articles = len(utils.run_sync(scrape_news, scraper))
+            samples.append(time.perf_counter() - started_at)
+    return {
+        "stories": stories,
+        "articles": articles,
+        "latency": summarize(samples),
+        "articles_per_second": articles / statistics.fmean(samples),
+    }
+
+
+def write_market_csv(file_path: str, rows: int, seed: int = 0) -> None:
+    """Write a CSV shaped like data/dummy_market_data.csv."""
+    rng = random.Random(seed)
+    day = datetime(2020, 1, 1)
+    with open(file_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", "open", "high", "low", "close", "volume"])
+        for i in range(rows):
+            open_ = rng.uniform(50, 250)
+            close = rng.uniform(50, 250)
+            writer.writerow(
+                [
+                    (day + timedelta(days=i)).strftime("%Y-%m-%d"),
+                    round(open_, 2),
+                    round(max(open_, close) + rng.uniform(0, 60), 2),
+                    round(min(open_, close) - rng.uniform(0, 40), 2),
+                    round(close, 2),
+                    rng.randint(1000, 5000),
+                ]
+            )
+
+
+def write_news_json(file_path: str, articles: int, seed: int = 0) -> None:
+    """Write a scraped-news dataset like the one embed news produces."""
+    rng = random.Random(seed)
+    entries = [
+        Article(
+            title=_sentence(rng, 8),
+            url=f"https://example.com/news/{i}.html",
+            content=_article_text(rng, ticker, rng.randint(5, 40)),
+            date=datetime.now(),
+            ticker=ticker,
+            source="Newswire",
+            system="Benchmark",
+        )
+        for i, ticker in ((i, rng.choice(TICKERS)) for i in range(articles))
+    ]
+    with open(file_path, "w") as f:
+        f.write(DataSet[Article](entries=entries).model_dump_json())
+
+
+def _timed(func: Callable[[], object]) -> tuple[object, float]:
+    started_at = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started_at
+
+
+def bench_stages(docs: list[Document], workdir: str) -> dict:
+    """Measure split, embed and insert throughput separately."""
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+        add_start_index=True,
+    )
+    chunks, split_time = _timed(lambda: splitter.split_documents(docs))
+    embeddings = FakeEmbeddings()
+    texts = [chunk.page_content for chunk in chunks]
+    vectors, embed_time = _timed(lambda: embeddings.embed_documents(texts))
+
+    db = Chroma(persist_directory=workdir, embedding_function=embeddings)
+    ids = [document_id(chunk) for chunk in chunks]
+
+    def insert() -> None:
+        for start in range(0, len(ids), 1000):
+            end = start + 1000
+            db._collection.upsert(
+                ids=ids[start:end],
+                embeddings=vectors[start:end],
+                documents=texts[start:end],
+                metadatas=[
+                    {"content_hash": content_hash(text)} for text in texts[start:end]
+                ],
+            )
+
+    _, insert_time = _timed(insert)
+
+    def rate(count: int, seconds: float) -> float:
+        return count / seconds if seconds > 0 else 0.0
+
+    return {
+        "docs": len(docs),
+        "chunks": len(chunks),
+        "split_docs_per_second": rate(len(docs), split_time),
+        "embed_chunks_per_second": rate(len(chunks), embed_time),
+        "insert_chunks_per_second": rate(len(chunks), insert_time),
+    }
+
+
+def bench_ingest(workdir: str, rows: int = 5000, articles: int = 500) -> dict:
+    """Measure end-to-end and per-stage ingest throughput for CSV and JSON data."""
+    csv_path = path.join(workdir, "market.csv")
+    json_path = path.join(workdir, "news.json")
+    write_market_csv(csv_path, rows)
+    write_news_json(json_path, articles)
+
+    results = {}
+    for name, file_path, embed in (
+        ("csv", csv_path, embed_csv_data),
+        ("json", json_path, embed_json_data),
+    ):
+        db_path = path.join(workdir, f"{name}_db")
+        stats = embed(file_path=file_path, chroma_db_path=db_path, model=FAKE_MODEL)
+        rerun = embed(file_path=file_path, chroma_db_path=db_path, model=FAKE_MODEL)
+        if name == "csv":
+            docs = CSVLoader(file_path).load()
+        else:
+            docs = JSONLoader(
+                file_path,
+                jq_schema=".entries[]",
+                content_key=JSON_CONTENT_KEY,
+                is_content_key_jq_parsable=True,
+                text_content=False,
+            ).load()
+        results[name] = {
+            "docs": stats.loaded,
+            "chunks": stats.chunks,
+            "seconds": stats.elapsed,
+            "docs_per_second": stats.loaded / stats.elapsed,
+            "chunks_per_second": stats.chunks_per_second,
+            "unchanged_rerun_seconds": rerun.elapsed,
+            "stages": bench_stages(docs, path.join(workdir, f"{name}_stages_db")),
+        }
+    return results
+
+
+def bench_query(
+    workdir: str,
+    sizes: tuple[int, ...] = (100, 1000, 10000),
+    queries: int = 50,
+    backend: str | None = None,
+) -> dict:
+    """Measure run_rag_chain latency percentiles across collection sizes."""
+    rng = random.Random(0)
+    questions = [
+        f"What is the latest on {rng.choice(TICKERS)} {rng.choice(WORDS)}?"
+        for _ in range(queries)
+    ]
+    results = {}
+    for size in sizes:
+        db_path = path.join(workdir, f"query_{size}")
+        texts = [
+            _article_text(rng, rng.choice(TICKERS), rng.randint(2, 6))
+            for _ in range(size)
+        ]
+        _, build_time = _timed(
+            lambda: embed_from_texts(texts, db_path, model=FAKE_MODEL, backend=backend)
+        )
+        # The first query opens the collection; report it separately
+        _, cold = _timed(
+            lambda: run_rag_chain(
+                db_path, questions[0], embedding_model=FAKE_MODEL, llm_model=FAKE_MODEL
+            )
+        )
+        samples = []
+        for question in questions:
+            _, latency = _timed(
+                lambda: run_rag_chain(
+                    db_path, question, embedding_model=FAKE_MODEL, llm_model=FAKE_MODEL
+                )
+            )
+            samples.append(latency)
+        results[str(size)] = {
+            "build_seconds": build_time,
+            "cold_query_seconds": cold,
+            "latency": summarize(samples),
+        }
+    return results
+
+
+_CLI_SCRIPT = (
+    "import sys; from lc_app.app import run; "
+    "sys.argv = ['lc-app', *sys.argv[1:]]; run()"
+)
+# The pre-lazy CLI: every command module is imported before parsing arguments
+_EAGER_CLI_SCRIPT = (
+    "import sys, click; from lc_app.commands import add_commands; "
+    "cli = add_commands(click.Group()); cli(sys.argv[1:], prog_name='lc-app')"
+)
+
+
+def _run_cli(script: str, args: tuple[str, ...]) -> None:
+    subprocess.run(
+        [sys.executable, "-c", script, *args], check=True, capture_output=True
+    )
+
+
+def bench_startup(
+    commands: tuple[tuple[str, ...], ...] = STARTUP_COMMANDS, runs: int = 10
+) -> dict:
+    """
+    Measure CLI start-up latency, each run in a fresh interpreter.
+
+    `--help` is also timed with every command imported eagerly, as the
+    baseline the lazy command group is measured against.
+    """
+    results = {}
+    for args in commands:
+        samples = [_timed(lambda: _run_cli(_CLI_SCRIPT, args))[1] for _ in range(runs)]
+        results[" ".join(args)] = summarize(samples)
+    samples = [
+        _timed(lambda: _run_cli(_EAGER_CLI_SCRIPT, ("--help",)))[1]
+        for _ in range(runs)
+    ]
+    results["--help (eager)"] = summarize(samples)
+    return results
+
+
+def startup_regressions(
+    results: dict,
+    max_ratio: float | None = DEFAULT_STARTUP_MAX_RATIO,
+    max_seconds: float | None = None,
+) -> list[str]:
+    """
+    Check `bench_startup` results against start-up bounds.
+
+    Lazy `--help` fails when its median exceeds `max_ratio` of the eager
+    baseline's, and every invocation fails when its median exceeds
+    `max_seconds`. Returns a description of each bound exceeded.
+    """
+    failures = []
+    lazy, eager = results["--help"]["p50"], results["--help (eager)"]["p50"]
+    if max_ratio is not None and lazy > eager * max_ratio:
+        failures.append(
+            f"--help took {lazy:.3f}s, {lazy / eager:.2f}x the eager {eager:.3f}s "
+            f"(limit {max_ratio:.2f}x)"
+        )
+    if max_seconds is not None:
+        failures += [
+            f"{name} took {summary['p50']:.3f}s (limit {max_seconds:.3f}s)"
+            for name, summary in results.items()
+            if name != "--help (eager)" and summary["p50"] > max_seconds
+        ]
+    return failures
@@ -0,0 +1,220 @@
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from hashlib import sha256
+from os import getenv, makedirs, path
+
+from langchain_core.embeddings import Embeddings
+
+from lc_app.core.fakes import get_fake_embeddings, is_fake_model
+
+DEFAULT_OLLAMA_HOST = "http://localhost:11434"  # Ollama server URL
+DEFAULT_EMBEDDING_MODEL = "nomic-embed-text"  # Default embedding model
+DEFAULT_EMBED_CACHE_PATH = path.join(
+    path.expanduser("~"), ".cache", "lc_app", "embeddings.sqlite3"
+)  # On-disk embedding cache
+DEFAULT_EMBED_CACHE_MAX_MB = 512  # Size of the embedding cache before LRU eviction
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text: str) -> str:
+    """Hash normalized text for use as an embedding cache key."""
+    return sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    A SQLite-backed store of embedding vectors keyed by (model, text hash).
+
+    Vectors are stored as float32 blobs. Every lookup refreshes the entry's
+    last-used time, and once the stored vectors exceed `max_bytes` the least
+    recently used ones are evicted. Hit and miss counters are kept per process.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = path.dirname(db_path)
+        if directory:
+            makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def get_many(self, model: str, hashes: list[str]) -> dict[str, list[float]]:
+        """Look up cached vectors, returning those that were found."""
+        found: dict[str, list[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for hash_, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[hash_] = vector.tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, hash_) for hash_ in found],
+                )
+                self._conn.commit()
+            self.hits += sum(1 for hash_ in hashes if hash_ in found)
+            self.misses += sum(1 for hash_ in hashes if hash_ not in found)
+        return found
+
+    def put_many(self, model: str, vectors: dict[str, list[float]]) -> None:
+        """Store vectors and evict least recently used entries if needed."""
+        if not vectors:
+            return
+        now = time.time()
+        rows = [
+            (model, hash_, array("f", vector).tobytes(), now)
+            for hash_, vector in vectors.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._size += sum(len(row[2]) for row in rows)
+            if self._size > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used vectors until the cache is at 90% of its size."""
+        target = int(self.max_bytes * 0.9)
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+        while self._size > target:
+            rows = self._conn.execute(
+                "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                break
+            dropped = []
+            for rowid, size in rows:
+                dropped.append((rowid,))
+                self._size -= size
+                if self._size <= target:
+                    break
+            self._conn.executemany("DELETE FROM embeddings WHERE rowid = ?", dropped)
+
+    def stats(self) -> dict[str, int]:
+        """Get hit/miss counters and the current cache size."""
+        return {"hits": self.hits, "misses": self.misses, "bytes": self._size}
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wrap an embedding model so each distinct text is only ever embedded once.
+
+    Document and query embeddings share the cache, so repeated questions and
+    chunks that appear in several collections are served from disk.
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        hashes = [text_hash(text) for text in texts]
+        found = self.cache.get_many(self.model, hashes)
+
+        missing: dict[str, str] = {}
+        for hash_, text in zip(hashes, texts):
+            if hash_ not in found and hash_ not in missing:
+                missing[hash_] = text
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing, vectors))
+            self.cache.put_many(self.model, computed)
+            found.update(computed)
+        return [found[hash_] for hash_ in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        hash_ = text_hash(text)
+        found = self.cache.get_many(self.model, [hash_])
+        if hash_ in found:
+            return found[hash_]
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many(self.model, {hash_: vector})
+        return vector
+
+
+_embedding_caches: dict[str, EmbeddingCache] = {}
+
+
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Get the process-wide embedding cache, or None if it is disabled."""
+    if getenv("EMBED_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    db_path = getenv("EMBED_CACHE_PATH", DEFAULT_EMBED_CACHE_PATH)
+    if db_path not in _embedding_caches:
+        max_mb = float(getenv("EMBED_CACHE_MAX_MB", DEFAULT_EMBED_CACHE_MAX_MB))
+        _embedding_caches[db_path] = EmbeddingCache(db_path, int(max_mb * 1024 * 1024))
+    return _embedding_caches[db_path]
+
+
+def get_embeddings(ollama_host: str | None = None, model: str | None = None) -> Embeddings:
+    """
+    Get Ollama embeddings, wrapped in the on-disk cache unless it is disabled.
+
+    The model name "fake" (or "fake:<dimensions>") selects deterministic
+    offline embeddings instead of Ollama.
+    """
+    if ollama_host is None:
+        ollama_host = getenv("OLLAMA_HOST", DEFAULT_OLLAMA_HOST)
+
+    if model is None:
+        model = getenv("EMBED_MODEL", DEFAULT_EMBEDDING_MODEL)
+
+    if is_fake_model(model):
+        embeddings = get_fake_embeddings(model)
+    else:
+        from langchain_ollama import OllamaEmbeddings
+
+        embeddings = OllamaEmbeddings(base_url=ollama_host, model=model)
+    cache = get_embedding_cache()
+    if cache is None:
+        return embeddings
+    return CachedEmbeddings(embeddings, model, cache)
@@ -0,0 +1,399 @@
+import threading
+import time
+from collections import OrderedDict
+from os import getenv
+from typing import AsyncIterator, Iterator
+
+from langchain.chains import RetrievalQA
+from langchain.chains.retrieval_qa.prompt import PROMPT as STUFF_PROMPT
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseLLM
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables.config import run_in_executor
+
+from lc_app.core.answer_cache import get_answer_cache
+from lc_app.core.embeddings import (
+    DEFAULT_EMBEDDING_MODEL,
+    DEFAULT_OLLAMA_HOST,
+    get_embeddings,
+)
+from lc_app.core.fakes import FakeLLM, is_fake_model
+from lc_app.core.federation import (
+    DEFAULT_FEDERATED_MAX_OPEN,
+    CollectionCache,
+    FederatedRetriever,
+    is_collection_pattern,
+)
+from lc_app.core.keyword_index import KeywordIndex
+from lc_app.core.rag import DEFAULT_RAG_MODEL, get_langfuse_callback_handler
+from lc_app.core.retrievers import (
+    DEFAULT_CONTEXT_TOKEN_BUDGET,
+    DEFAULT_FETCH_MULTIPLIER,
+    CompressingRetriever,
+    HybridRetriever,
+    compression_enabled,
+)
+from lc_app.core.metrics import span
+from lc_app.core.streaming import StreamTimings
+from lc_app.core.tracing import stage_metrics_handler
+from lc_app.core.vectorstores import open_vectorstore
+
+DEFAULT_SEARCH_KWARGS = {"k": 5}  # Default retriever search arguments
+DEFAULT_ENGINE_CACHE_SIZE = 8  # RAG engines kept open per process
+DEFAULT_ENGINE_IDLE_TTL = 1800.0  # Seconds before an unused engine is dropped
+DEFAULT_RETRIEVAL_MODE = "hybrid"  # "hybrid" (vectors + BM25) or "dense"
+DEFAULT_CHAIN_CACHE_SIZE = 32  # Chains kept per engine, one per search arguments
+
+
+class RagEngine:
+    """
+    A RAG chain over one collection, built once and reused for every query.
+
+    The engine owns the vector store, the embeddings, the LLM and its HTTP
+    connections to Ollama, and the Langfuse callback handler, so answering a
+    question only costs retrieval and generation. Collections with a keyword
+    index are searched by dense vectors and BM25 together unless RETRIEVAL_MODE
+    is "dense".
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        ollama_host: str,
+        embedding_model: str,
+        llm_model: str,
+        search_kwargs: dict | None = None,
+    ):
+        self.db_path = db_path
+        self.ollama_host = ollama_host
+        self.embedding_model = embedding_model
+        self.llm_model = llm_model
+        self.search_kwargs = dict(search_kwargs or DEFAULT_SEARCH_KWARGS)
+        self.token_budget = (
+            int(getenv("CONTEXT_TOKEN_BUDGET", DEFAULT_CONTEXT_TOKEN_BUDGET))
+            if compression_enabled()
+            else None
+        )
+
+        self.embeddings = get_embeddings(ollama_host, embedding_model)
+        self._open(db_path)
+        self.llm = get_llm(ollama_host, llm_model)
+        self.callbacks = [
+            handler
+            for handler in [stage_metrics_handler, get_langfuse_callback_handler()]
+            if handler is not None
+        ]
+        self._chains: OrderedDict[str, RetrievalQA] = OrderedDict()
+        self._chains_lock = threading.Lock()
+        self.max_chains = max(
+            1, int(getenv("RAG_CHAIN_CACHE_SIZE", DEFAULT_CHAIN_CACHE_SIZE))
+        )
+        self.last_used = time.monotonic()
+
+    def _open(self, db_path: str) -> None:
+        """Open the collection, its keyword index and its answer cache."""
+        self.db = open_vectorstore(db_path, self.embeddings)
+        self.keyword_index = (
+            KeywordIndex(db_path)
+            if getenv("RETRIEVAL_MODE", DEFAULT_RETRIEVAL_MODE) == "hybrid"
+            and KeywordIndex.exists(db_path)
+            else None
+        )
+        self.answer_cache = get_answer_cache(db_path)
+
+    def _retriever(self, search_kwargs: dict) -> BaseRetriever:
+        if self.keyword_index is not None:
+            return HybridRetriever(
+                vectorstore=self.db,
+                keyword_index=self.keyword_index,
+                search_kwargs=search_kwargs,
+            )
+        return self.db.as_retriever(search_kwargs=search_kwargs)
+
+    def _context_retriever(self, search_kwargs: dict) -> BaseRetriever:
+        """Get the retriever whose documents are pasted into the prompt."""
+        if self.token_budget is None:
+            return self._retriever(search_kwargs)
+        k = search_kwargs.get("k", 4)
+        base_kwargs = {**search_kwargs, "k": k * DEFAULT_FETCH_MULTIPLIER}
+        if self.keyword_index is not None:
+            # Fuse the same rankings as without compression, so the top `k`
+            # candidates are the baseline the compression report measures against
+            base_kwargs["fetch_k"] = search_kwargs.get(
+                "fetch_k", k * DEFAULT_FETCH_MULTIPLIER
+            )
+        return CompressingRetriever(
+            base_retriever=self._retriever(base_kwargs),
+            embeddings=self.embeddings,
+            vectorstore=self.db,
+            k=k,
+            token_budget=self.token_budget,
+        )
+
+    def _search_key(self, search_kwargs: dict | None) -> str:
+        search_kwargs = search_kwargs or self.search_kwargs
+        items = sorted((k, repr(v)) for k, v in search_kwargs.items())
+        # Answers from different models over the same collection are cached apart
+        items.append(("embedding_model", repr(self.embedding_model)))
+        items.append(("llm_model", repr(self.llm_model)))
+        if self.token_budget is not None:
+            # Answers over compressed and over whole chunks are cached apart
+            items.append(("token_budget", repr(self.token_budget)))
+        return repr(items)
+
+    def _chain(self, search_kwargs: dict | None) -> RetrievalQA:
+        """
+        Get the chain for a set of search arguments, building it on first use.
+
+        The `max_chains` most recently used chains are kept.
+        """
+        search_kwargs = search_kwargs or self.search_kwargs
+        key = self._search_key(search_kwargs)
+        with self._chains_lock:
+            chain = self._chains.get(key)
+            if chain is None:
+                chain = RetrievalQA.from_chain_type(
+                    llm=self.llm,
+                    retriever=self._context_retriever(search_kwargs),
+                    return_source_documents=True,
+                )
+                self._chains[key] = chain
+            self._chains.move_to_end(key)
+            while len(self._chains) > self.max_chains:
+                self._chains.popitem(last=False)
+            return chain
+
+    def _config(self) -> dict:
+        self.last_used = time.monotonic()
+        return {"callbacks": self.callbacks}
+
+    def cached_answer(
+        self, query: str, search_kwargs: dict | None = None
+    ) -> tuple[str, list[Document]] | None:
+        """Look up a cached answer to the same or a near-duplicate query."""
+        if self.answer_cache is None:
+            return None
+        embedding = self.embeddings.embed_query(query)
+        return self.answer_cache.lookup(self._search_key(search_kwargs), embedding)
+
+    def remember_answer(
+        self,
+        query: str,
+        answer: str,
+        sources: list[Document],
+        search_kwargs: dict | None = None,
+    ) -> None:
+        """Cache an answer for later near-duplicate queries."""
+        if self.answer_cache is None:
+            return
+        embedding = self.embeddings.embed_query(query)
+        self.answer_cache.store(
+            self._search_key(search_kwargs), embedding, answer, sources
+        )
+
+    def query(
+        self, query: str, search_kwargs: dict | None = None
+    ) -> tuple[str, list[Document]]:
+        """Answer a query and return the answer and source documents."""
+        with span("query"):
+            cached = self.cached_answer(query, search_kwargs)
+            if cached is not None:
+                return cached
+            response = self._chain(search_kwargs).invoke(query, config=self._config())
+            answer, sources = response["result"], response["source_documents"]
+            self.remember_answer(query, answer, sources, search_kwargs)
+            return answer, sources
+
+    async def aquery(
+        self, query: str, search_kwargs: dict | None = None
+    ) -> tuple[str, list[Document]]:
+        """Answer a query asynchronously and return the answer and source documents."""
+        with span("query"):
+            cached = await run_in_executor(
+                None, self.cached_answer, query, search_kwargs
+            )
+            if cached is not None:
+                return cached
+            response = await self._chain(search_kwargs).ainvoke(
+                query, config=self._config()
+            )
+            answer, sources = response["result"], response["source_documents"]
+            await run_in_executor(
+                None, self.remember_answer, query, answer, sources, search_kwargs
+            )
+            return answer, sources
+
+    def retrieve(self, query: str, search_kwargs: dict | None = None) -> list[Document]:
+        """Retrieve the source documents for a query."""
+        retriever = self._chain(search_kwargs).retriever
+        return retriever.invoke(query, config=self._config())
+
+    async def aretrieve(
+        self, query: str, search_kwargs: dict | None = None
+    ) -> list[Document]:
+        """Retrieve the source documents for a query asynchronously."""
+        retriever = self._chain(search_kwargs).retriever
+        return await retriever.ainvoke(query, config=self._config())
+
+    def build_prompt(self, query: str, docs: list[Document]) -> str:
+        """Build the same "stuff" prompt that the RetrievalQA chain sends."""
+        context = "\n\n".join(doc.page_content for doc in docs)
+        return STUFF_PROMPT.format(context=context, question=query)
+
+    def stream(self, query: str, docs: list[Document]) -> Iterator[str]:
+        """Stream answer tokens for a query over already retrieved documents."""
+        prompt = self.build_prompt(query, docs)
+        yield from self.llm.stream(prompt, config=self._config())
+
+    def stream_query(
+        self,
+        query: str,
+        search_kwargs: dict | None = None,
+        timings: StreamTimings | None = None,
+    ) -> Iterator[str]:
+        """Retrieve documents and stream the answer, recording its latencies."""
+        timings = timings if timings is not None else StreamTimings()
+        cached = self.cached_answer(query, search_kwargs)
+        if cached is not None:
+            timings.mark_retrieved()
+            timings.mark_token()
+            yield cached[0]
+            timings.mark_done()
+            return
+        docs = self.retrieve(query, search_kwargs)
+        timings.mark_retrieved()
+        tokens = []
+        for token in self.stream(query, docs):
+            timings.mark_token()
+            tokens.append(token)
+            yield token
+        timings.mark_done()
+        self.remember_answer(query, "".join(tokens), docs, search_kwargs)
+
+    async def astream(self, query: str, docs: list[Document]) -> AsyncIterator[str]:
+        """Stream answer tokens asynchronously over already retrieved documents."""
+        prompt = self.build_prompt(query, docs)
+        async for token in self.llm.astream(prompt, config=self._config()):
+            yield token
+
+
+class FederatedEngine(RagEngine):
+    """
+    A RAG engine over every collection matching a glob or DB_PATH template.
+
+    Collections are searched concurrently and their results merged by score;
+    recently used collections stay open between queries. Answers are not
+    cached, since the set of collections behind a pattern can change.
+    """
+
+    def _open(self, db_path: str) -> None:
+        self.db = None
+        self.keyword_index = None
+        self.answer_cache = None
+        self.collections = CollectionCache(
+            self.embeddings,
+            int(getenv("FEDERATED_MAX_OPEN", DEFAULT_FEDERATED_MAX_OPEN)),
+        )
+
+    def _retriever(self, search_kwargs: dict) -> BaseRetriever:
+        return FederatedRetriever(
+            pattern=self.db_path,
+            collections=self.collections,
+            search_kwargs=search_kwargs,
+        )
+
+
+def get_llm(ollama_host: str, llm_model: str) -> BaseLLM:
+    """Get the LLM for a model name; "fake" selects a deterministic offline LLM."""
+    if is_fake_model(llm_model):
+        return FakeLLM()
+    from langchain_ollama import OllamaLLM
+
+    return OllamaLLM(base_url=ollama_host, model=llm_model)
+
+
+class EngineRegistry:
+    """
+    Keep RAG engines keyed by (db_path, Ollama host, embedding model, LLM model).
+
+    At most `max_engines` engines are kept; the least recently used one is
+    dropped when a new engine is needed, and engines idle for longer than
+    `idle_ttl` seconds are dropped on the next lookup.
+    """
+
+    def __init__(self, max_engines: int, idle_ttl: float):
+        self.max_engines = max(1, max_engines)
+        self.idle_ttl = idle_ttl
+        self._engines: OrderedDict[tuple, RagEngine] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, db_path: str, ollama_host: str, embedding_model: str, llm_model: str
+    ) -> RagEngine:
+        key = (db_path, ollama_host, embedding_model, llm_model)
+        with self._lock:
+            self._evict_idle()
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                return engine
+        # Build outside the lock; opening a collection can take a while
+        engine_class = FederatedEngine if is_collection_pattern(db_path) else RagEngine
+        engine = engine_class(db_path, ollama_host, embedding_model, llm_model)
+        with self._lock:
+            engine = self._engines.setdefault(key, engine)
+            self._engines.move_to_end(key)
+            while len(self._engines) > self.max_engines:
+                self._engines.popitem(last=False)
+        return engine
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        for key in [
+            key
+            for key, engine in self._engines.items()
+            if now - engine.last_used > self.idle_ttl
+        ]:
+            del self._engines[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._engines.clear()
+
+
+_registry: EngineRegistry | None = None
+
+
+def get_engine_registry() -> EngineRegistry:
+    """Get the process-wide RAG engine registry."""
+    global _registry
+    if _registry is None:
+        _registry = EngineRegistry(
+            max_engines=int(getenv("RAG_ENGINE_CACHE_SIZE", DEFAULT_ENGINE_CACHE_SIZE)),
+            idle_ttl=float(getenv("RAG_ENGINE_IDLE_TTL", DEFAULT_ENGINE_IDLE_TTL)),
+        )
+    return _registry
+
+
+def get_engine(
+    db_path: str,
+    ollama_host: str | None = None,
+    embedding_model: str | None = None,
+    llm_model: str | None = None,
+) -> RagEngine:
+    """
+    Get a cached RAG engine for a collection, creating it if needed.
+
+    A glob or DB_PATH template (e.g. "data/{ticker}/{date}") gets a federated
+    engine over all matching collections.
+    """
+    if ollama_host is None:
+        ollama_host = getenv("OLLAMA_HOST", DEFAULT_OLLAMA_HOST)
+
+    if embedding_model is None:
+        embedding_model = getenv("EMBED_MODEL", DEFAULT_EMBEDDING_MODEL)
+
+    if llm_model is None:
+        llm_model = getenv("RAG_MODEL", DEFAULT_RAG_MODEL)
+
+    return get_engine_registry().get(db_path, ollama_host, embedding_model, llm_model)
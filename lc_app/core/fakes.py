@@ -0,0 +1,106 @@
+import math
+import re
+import time
+from hashlib import blake2b
+from typing import Any, Iterator
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+FAKE_MODEL = "fake"  # Model name that selects the offline stand-ins
+DEFAULT_FAKE_DIMENSIONS = 256  # Size of fake embedding vectors
+_WORD = re.compile(r"\w+")
+
+
+def is_fake_model(model: str | None) -> bool:
+    """Whether a model name selects the offline stand-ins ("fake" or "fake:<n>")."""
+    return model is not None and (model == FAKE_MODEL or model.startswith("fake:"))
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic, offline embeddings built by hashing words into buckets.
+
+    Texts that share words get similar vectors, so retrieval over a fake
+    collection still behaves sensibly. `latency` adds a fixed delay per call to
+    mimic a remote model.
+    """
+
+    def __init__(self, dimensions: int = DEFAULT_FAKE_DIMENSIONS, latency: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        for word in _WORD.findall(text.lower()):
+            digest = blake2b(word.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class FakeLLM(LLM):
+    """
+    Deterministic, offline LLM that answers with the start of its prompt's context.
+
+    `first_token_latency` and `token_latency` mimic prompt evaluation and
+    generation time of a real model.
+    """
+
+    answer_tokens: int = 32
+    first_token_latency: float = 0.0
+    token_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _tokens(self, prompt: str) -> list[str]:
+        words = _WORD.findall(prompt)[: self.answer_tokens]
+        return [f"{word} " for word in words] or ["I don't know."]
+
+    def _call(
+        self,
+        prompt: str,
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> str:
+        return "".join(self._stream_tokens(prompt))
+
+    def _stream_tokens(self, prompt: str) -> Iterator[str]:
+        if self.first_token_latency:
+            time.sleep(self.first_token_latency)
+        for token in self._tokens(prompt):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            yield token
+
+    def _stream(
+        self,
+        prompt: str,
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        for token in self._stream_tokens(prompt):
+            if run_manager is not None:
+                run_manager.on_llm_new_token(token)
+            yield GenerationChunk(text=token)
+
+
+def get_fake_embeddings(model: str) -> FakeEmbeddings:
+    """Build fake embeddings for a "fake" or "fake:<dimensions>" model name."""
+    _, _, dimensions = model.partition(":")
+    return FakeEmbeddings(int(dimensions) if dimensions else DEFAULT_FAKE_DIMENSIONS)
@@ -0,0 +1,113 @@
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from glob import glob
+from os import getenv
+from typing import Any
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+from pydantic import ConfigDict
+
+from lc_app.core.vectorstores import is_collection, open_vectorstore
+
+DEFAULT_FEDERATED_WORKERS = 8  # Collections searched at the same time
+DEFAULT_FEDERATED_MAX_OPEN = 32  # Collection handles kept open per engine
+
+_PLACEHOLDER = re.compile(r"\{[^{}]*\}")
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(getenv("FEDERATED_WORKERS", DEFAULT_FEDERATED_WORKERS)),
+    thread_name_prefix="federated",
+)
+
+
+def is_collection_pattern(db_path: str) -> bool:
+    """Whether a DB path is a glob or `hydreate_template` template."""
+    return bool(_PLACEHOLDER.search(db_path) or _GLOB_CHARS.search(db_path))
+
+
+def expand_collections(pattern: str) -> list[str]:
+    """
+    Find the collections matching a glob or DB_PATH template.
+
+    Template placeholders such as `{ticker}` or `{date}` match any single path
+    segment, so the same DB_PATH that `embed news` writes to can be queried.
+    """
+    return sorted(
+        directory
+        for directory in glob(_PLACEHOLDER.sub("*", pattern))
+        if is_collection(directory)
+    )
+
+
+class CollectionCache:
+    """Keep the most recently used collections open."""
+
+    def __init__(self, embeddings: Embeddings, max_open: int):
+        self.embeddings = embeddings
+        self.max_open = max(1, max_open)
+        self._collections: OrderedDict[str, VectorStore] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db_path: str) -> VectorStore:
+        with self._lock:
+            db = self._collections.get(db_path)
+            if db is None:
+                db = open_vectorstore(db_path, self.embeddings)
+                self._collections[db_path] = db
+            self._collections.move_to_end(db_path)
+            while len(self._collections) > self.max_open:
+                self._collections.popitem(last=False)
+            return db
+
+
+class FederatedRetriever(BaseRetriever):
+    """
+    Retrieve from every collection matching a pattern and merge by distance.
+
+    The query is embedded once, each collection is searched for its own top
+    `k` on a shared thread pool, and the overall top `k` are returned. Every
+    document's metadata records the collection it came from. The pattern is
+    expanded on each query, so collections created later are picked up.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    pattern: str
+    collections: CollectionCache
+    search_kwargs: dict[str, Any] = {}
+
+    def _search(
+        self, db_path: str, vector: list[float], k: int, where: dict | None
+    ) -> list[tuple[Document, float]]:
+        db = self.collections.get(db_path)
+        results = db.similarity_search_by_vector_with_relevance_scores(
+            vector, k=k, filter=where
+        )
+        for doc, _ in results:
+            doc.metadata["collection"] = db_path
+        return results
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        db_paths = expand_collections(self.pattern)
+        if not db_paths:
+            return []
+        k = self.search_kwargs.get("k", 4)
+        where = self.search_kwargs.get("filter")
+        vector = self.collections.embeddings.embed_query(query)
+        futures = [
+            _executor.submit(self._search, db_path, vector, k, where)
+            for db_path in db_paths
+        ]
+        results = [result for future in futures for result in future.result()]
+        # Scores are distances, smaller is closer
+        results.sort(key=lambda result: result[1])
+        return [doc for doc, _ in results[:k]]
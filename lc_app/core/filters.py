@@ -0,0 +1,103 @@
+import re
+from datetime import datetime, timedelta
+
+# Relative ages as Yahoo Finance shows them, e.g. "3 hours ago" or "2d"
+_RELATIVE_AGE = re.compile(
+    r"^(?P<count>\d+|an?)\s*(?P<unit>m|min|minutes?|h|hours?|d|days?|w|weeks?|"
+    r"months?|y|years?)(?:\s+ago)?$"
+)
+_AGE_UNITS = {
+    "m": timedelta(minutes=1),
+    "min": timedelta(minutes=1),
+    "minute": timedelta(minutes=1),
+    "h": timedelta(hours=1),
+    "hour": timedelta(hours=1),
+    "d": timedelta(days=1),
+    "day": timedelta(days=1),
+    "w": timedelta(weeks=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+    "y": timedelta(days=365),
+    "year": timedelta(days=365),
+}
+
+
+def parse_age(value: str) -> timedelta | None:
+    """Parse a relative age such as "3 hours ago", "yesterday" or "7d"."""
+    value = value.strip().lower()
+    if value in ("now", "just now", "today"):
+        return timedelta(0)
+    if value == "yesterday":
+        return timedelta(days=1)
+    match = _RELATIVE_AGE.match(value)
+    if match is None:
+        return None
+    count = match["count"]
+    unit = match["unit"]
+    unit = unit if unit in _AGE_UNITS else unit.rstrip("s")
+    return (1 if count in ("a", "an") else int(count)) * _AGE_UNITS[unit]
+
+
+def published_datetime(published_at: str | None, scraped_at: datetime) -> datetime:
+    """
+    Estimate when an article was published.
+
+    `published_at` is either an absolute date or an age relative to the time
+    the article was scraped; if it cannot be parsed the scrape time is used.
+    """
+    if published_at:
+        age = parse_age(published_at)
+        if age is not None:
+            return scraped_at - age
+        try:
+            return datetime.fromisoformat(published_at)
+        except ValueError:
+            pass
+    return scraped_at
+
+
+def parse_since(value: str) -> datetime:
+    """
+    Parse a --since value: an ISO date/time or an age such as "7d".
+
+    Ages are rounded down, to the start of the day for a day or more and to
+    the minute otherwise, so repeated queries build the same filter and can
+    share cached chains and answers.
+    """
+    age = parse_age(value)
+    if age is not None:
+        since = datetime.now() - age
+        if age >= timedelta(days=1):
+            return since.replace(hour=0, minute=0, second=0, microsecond=0)
+        return since.replace(second=0, microsecond=0)
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(
+            f"Invalid date {value!r}; use YYYY-MM-DD or an age such as 7d."
+        ) from None
+
+
+def build_filter(
+    ticker: str | None = None,
+    source: str | None = None,
+    topic: str | None = None,
+    since: str | datetime | None = None,
+) -> dict | None:
+    """Build a Chroma `where` clause from metadata filters, or None for no filter."""
+    conditions: list[dict] = []
+    if ticker:
+        conditions.append({"ticker": ticker.upper()})
+    if source:
+        conditions.append({"source": source})
+    if topic:
+        conditions.append({"topic": topic})
+    if since:
+        if isinstance(since, str):
+            since = parse_since(since)
+        conditions.append({"date_ts": {"$gte": since.timestamp()}})
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
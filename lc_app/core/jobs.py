@@ -0,0 +1,396 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import get_context
+from os import getenv, makedirs, path
+from typing import Callable, Iterable, Iterator
+
+from lc_app.core import utils
+
+DEFAULT_JOBS_PATH = path.join(
+    path.expanduser("~"), ".cache", "lc_app", "jobs.sqlite3"
+)  # Persistent scrape-and-embed job queue
+DEFAULT_JOB_WORKERS = os.cpu_count() or 1  # Worker processes running jobs at once
+DEFAULT_JOB_ATTEMPTS = 3  # Tries per job before it is marked failed
+DEFAULT_JOB_BACKOFF = 30.0  # Seconds before the first retry, doubled after each
+DEFAULT_JOB_BACKOFF_MAX = 900.0  # Longest wait between retries in seconds
+DEFAULT_JOB_POLL_INTERVAL = 1.0  # Seconds an idle worker waits before looking again
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+
+@dataclass
+class Job:
+    id: int
+    db_path: str
+    ticker: str | None
+    topic: str | None
+    source: str
+    embed_model: str | None
+    ollama_host: str | None
+    backend: str | None
+    attempts: int
+    max_attempts: int
+    status: str = "queued"
+    error: str | None = None
+    result: str | None = None
+
+    @property
+    def name(self) -> str:
+        return self.ticker or self.topic or "general"
+
+
+_JOB_COLUMNS = (
+    "id, db_path, ticker, topic, source, embed_model, ollama_host, backend, "
+    "attempts, max_attempts, status, error, result"
+)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """
+    A SQLite queue of news scrape-and-embed jobs shared by worker processes.
+
+    Workers claim jobs in a write transaction, so a job runs in one worker at
+    a time, and never claim a job whose collection another worker is writing.
+    Failed jobs are retried with exponential backoff until they run out of
+    attempts, and jobs left running by a worker that died are requeued.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = path.dirname(db_path)
+        if directory:
+            makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            db_path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                db_path TEXT NOT NULL,
+                ticker TEXT,
+                topic TEXT,
+                source TEXT NOT NULL,
+                embed_model TEXT,
+                ollama_host TEXT,
+                backend TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                next_run_at REAL NOT NULL,
+                worker_pid INTEGER,
+                error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, next_run_at)"
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block in a write transaction, serialized across processes."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(
+        self,
+        db_path: str,
+        ticker: str | None = None,
+        topic: str | None = None,
+        source: str = "yahoo",
+        embed_model: str | None = None,
+        ollama_host: str | None = None,
+        backend: str | None = None,
+        max_attempts: int = DEFAULT_JOB_ATTEMPTS,
+    ) -> int:
+        """Add a job and return its id."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (db_path, ticker, topic, source, embed_model, "
+                "ollama_host, backend, status, max_attempts, next_run_at, "
+                "created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (
+                    db_path,
+                    ticker,
+                    topic,
+                    source,
+                    embed_model,
+                    ollama_host,
+                    backend,
+                    max(1, max_attempts),
+                    now,
+                    now,
+                    now,
+                ),
+            )
+            return cursor.lastrowid
+
+    def _requeue_orphans(self, conn: sqlite3.Connection, now: float) -> None:
+        """Put back jobs whose worker process is gone."""
+        rows = conn.execute(
+            "SELECT id, worker_pid, attempts, max_attempts FROM jobs "
+            "WHERE status = 'running'"
+        ).fetchall()
+        for job_id, pid, attempts, max_attempts in rows:
+            if pid is not None and _pid_alive(pid):
+                continue
+            status = "failed" if attempts >= max_attempts else "queued"
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_pid = NULL, "
+                "error = 'worker exited while running the job', "
+                "next_run_at = ?, updated_at = ? WHERE id = ?",
+                (status, now, now, job_id),
+            )
+
+    def claim(self, pid: int | None = None) -> Job | None:
+        """
+        Take the next due job for the worker process `pid`, or None.
+
+        Jobs writing a collection that a running job is already writing are
+        skipped until it finishes.
+        """
+        pid = pid or os.getpid()
+        now = time.time()
+        with self._transaction() as conn:
+            self._requeue_orphans(conn, now)
+            row = conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs AS j "
+                "WHERE status = 'queued' AND next_run_at <= ? AND NOT EXISTS ("
+                "SELECT 1 FROM jobs WHERE status = 'running' AND db_path = j.db_path"
+                ") ORDER BY next_run_at, id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            job = Job(*row)
+            job.attempts += 1
+            job.status = "running"
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = ?, worker_pid = ?, "
+                "updated_at = ? WHERE id = ?",
+                (job.attempts, pid, now, job.id),
+            )
+        return job
+
+    def complete(self, job: Job, result: str) -> None:
+        """Mark a job done."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', worker_pid = NULL, error = NULL, "
+                "result = ?, updated_at = ? WHERE id = ?",
+                (result, time.time(), job.id),
+            )
+
+    def fail(
+        self,
+        job: Job,
+        error: str,
+        backoff: float = DEFAULT_JOB_BACKOFF,
+        backoff_max: float = DEFAULT_JOB_BACKOFF_MAX,
+    ) -> bool:
+        """
+        Record a failed attempt; returns whether the job will be retried.
+
+        Retries wait `backoff` seconds, doubling after every attempt up to
+        `backoff_max`.
+        """
+        now = time.time()
+        retry = job.attempts < job.max_attempts
+        delay = min(backoff * 2 ** (job.attempts - 1), backoff_max)
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_pid = NULL, error = ?, "
+                "next_run_at = ?, updated_at = ? WHERE id = ?",
+                ("queued" if retry else "failed", error, now + delay, now, job.id),
+            )
+        return retry
+
+    def counts(self, job_ids: Iterable[int] | None = None) -> dict[str, int]:
+        """Count jobs per status, optionally only among `job_ids`."""
+        query = "SELECT status, COUNT(*) FROM jobs"
+        params: list = []
+        if job_ids is not None:
+            job_ids = list(job_ids)
+            query += f" WHERE id IN ({','.join('?' * len(job_ids))})"
+            params = job_ids
+        with self._lock:
+            rows = self._conn.execute(f"{query} GROUP BY status", params).fetchall()
+        return {status: dict(rows).get(status, 0) for status in JOB_STATUSES}
+
+    def jobs(self, job_ids: Iterable[int] | None = None) -> list[Job]:
+        """Get jobs by id, or every job, oldest first."""
+        query = f"SELECT {_JOB_COLUMNS} FROM jobs"
+        params: list = []
+        if job_ids is not None:
+            job_ids = list(job_ids)
+            query += f" WHERE id IN ({','.join('?' * len(job_ids))})"
+            params = job_ids
+        with self._lock:
+            rows = self._conn.execute(f"{query} ORDER BY id", params).fetchall()
+        return [Job(*row) for row in rows]
+
+    def unfinished(self) -> list[int]:
+        """Get the ids of jobs that are queued or running."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY id"
+            ).fetchall()
+        return [job_id for (job_id,) in rows]
+
+    def next_due(self) -> float | None:
+        """Get when the next queued job is due, or None if none is queued."""
+        with self._lock:
+            (due,) = self._conn.execute(
+                "SELECT MIN(next_run_at) FROM jobs WHERE status = 'queued'"
+            ).fetchone()
+        return due
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def get_jobs_path() -> str:
+    """Get the job queue's database path from JOBS_PATH."""
+    return getenv("JOBS_PATH", DEFAULT_JOBS_PATH)
+
+
+def run_job(job: Job, refresh: bool = False) -> str:
+    """Scrape and embed the news of one job and describe what was stored."""
+    from lc_app.core.maintenance import release_clients
+    from lc_app.core.news import embed_news
+
+    try:
+        db_path, stats = embed_news(
+            job.db_path,
+            ticker=job.ticker,
+            topic=job.topic,
+            source=job.source,
+            ollama_host=job.ollama_host,
+            embed_model=job.embed_model,
+            backend=job.backend,
+            refresh=refresh,
+        )
+    finally:
+        # Another worker may write this collection next; never reuse a stale client
+        release_clients()
+    if stats is None:
+        return "no articles found"
+    return f"{stats} into {db_path}"
+
+
+def work(
+    queue_path: str,
+    backoff: float = DEFAULT_JOB_BACKOFF,
+    poll_interval: float = DEFAULT_JOB_POLL_INTERVAL,
+    refresh: bool = False,
+) -> None:
+    """
+    Run queued jobs until none are left.
+
+    This is the body of a worker process. A worker waits while the remaining
+    jobs are backing off or blocked on a collection another worker is writing.
+    """
+    queue = JobQueue(queue_path)
+    try:
+        while True:
+            job = queue.claim()
+            if job is None:
+                due = queue.next_due()
+                if due is None:
+                    return
+                time.sleep(min(max(due - time.time(), 0.0), poll_interval) or 0.05)
+                continue
+            try:
+                result = run_job(job, refresh)
+            except Exception as e:
+                queue.fail(job, f"{type(e).__name__}: {e}", backoff=backoff)
+            else:
+                queue.complete(job, result)
+    finally:
+        queue.close()
+
+
+def run_workers(
+    queue_path: str,
+    workers: int = DEFAULT_JOB_WORKERS,
+    backoff: float = DEFAULT_JOB_BACKOFF,
+    progress: Callable[[], None] | None = None,
+    poll_interval: float = DEFAULT_JOB_POLL_INTERVAL,
+    refresh: bool = False,
+) -> None:
+    """
+    Work the queue with `workers` processes until every queued job has finished.
+
+    `progress` is called every `poll_interval` seconds while they run, and
+    `refresh` makes every job bypass the article cache.
+    """
+    # Spawned workers do not inherit the parent's threads, clients or locks
+    context = get_context("spawn")
+    processes = [
+        context.Process(
+            target=work,
+            args=(queue_path, backoff, poll_interval, refresh),
+            name=f"embed-worker-{i}",
+        )
+        for i in range(max(1, workers))
+    ]
+    for process in processes:
+        process.start()
+    try:
+        while any(process.is_alive() for process in processes):
+            for process in processes:
+                process.join(poll_interval / len(processes))
+            if progress is not None:
+                progress()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+
+def read_tickers(file_path: str) -> list[str]:
+    """Read tickers from a file, separated by newlines or commas; # starts a comment."""
+    tickers = []
+    with open(file_path) as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            tickers.extend(t.strip().upper() for t in line.split(",") if t.strip())
+    return tickers
+
+
+def collection_path(db_path: str, ticker: str | None, topic: str | None) -> str:
+    """Hydrate a collection path template the way `embed_news` does."""
+    return utils.hydreate_template(
+        template_str=db_path,
+        placeholders={"ticker": ticker, "topic": topic or "general"},
+    )
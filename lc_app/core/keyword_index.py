@@ -0,0 +1,165 @@
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from os import getenv, makedirs, path
+
+KEYWORD_INDEX_FILE = "keyword_index.sqlite3"  # BM25 index stored next to the collection
+DEFAULT_BM25_K1 = 1.5  # BM25 term frequency saturation
+DEFAULT_BM25_B = 0.75  # BM25 document length normalization
+DEFAULT_MAX_DF_RATIO = 0.5  # Query terms found in a larger share of chunks are skipped
+
+# Keep tickers, CUSIPs, dotted numbers and hyphenated terms as single tokens
+_TOKEN = re.compile(r"\w+(?:[.\-/]\w+)*")
+
+# Function words that match most chunks and say nothing about relevance
+STOPWORDS = frozenset(
+    "a about all an and any are as at be been but by can could did do does for "
+    "from had has have he her his how i if in into is it its me my no not of on "
+    "or our she so than that the their them then there these they this those to "
+    "up us was we were what when where which who whom why will with would you "
+    "your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase keyword tokens."""
+    return [token.lower() for token in _TOKEN.findall(text)]
+
+
+def keyword_terms(text: str) -> list[str]:
+    """
+    Split text into the lowercase tokens the keyword index stores and searches.
+
+    Stopwords are dropped unless written in capitals, like the tickers ON, IT
+    or ARE.
+    """
+    return [
+        token.lower()
+        for token in _TOKEN.findall(text)
+        if token.lower() not in STOPWORDS or (token.isupper() and len(token) > 1)
+    ]
+
+
+class KeywordIndex:
+    """
+    A persisted BM25 inverted index over the chunks of one collection.
+
+    Postings live in a SQLite file next to the Chroma files and are updated
+    incrementally with the same IDs the vector store uses, so both indexes can
+    be queried and their results fused. Stopwords are not indexed, and query
+    terms found in more than `max_df_ratio` of the chunks are skipped, so
+    common words never cost a scan of a long posting list.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        k1: float = DEFAULT_BM25_K1,
+        b: float = DEFAULT_BM25_B,
+        max_df_ratio: float = DEFAULT_MAX_DF_RATIO,
+    ):
+        self.db_path = db_path
+        self.k1 = k1
+        self.b = b
+        self.max_df_ratio = max_df_ratio
+        self._lock = threading.Lock()
+
+        makedirs(db_path, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path.join(db_path, KEYWORD_INDEX_FILE), check_same_thread=False, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs (id TEXT PRIMARY KEY, length INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS postings_doc_id ON postings (doc_id)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def exists(db_path: str) -> bool:
+        """Whether a collection has a keyword index."""
+        return path.exists(path.join(db_path, KEYWORD_INDEX_FILE))
+
+    def upsert(self, ids: list[str], texts: list[str]) -> None:
+        """Index or re-index documents by ID."""
+        rows = []
+        docs = []
+        for id_, text in zip(ids, texts):
+            counts = Counter(keyword_terms(text))
+            docs.append((id_, sum(counts.values())))
+            rows.extend((term, id_, tf) for term, tf in counts.items())
+        with self._lock:
+            self._delete(ids)
+            self._conn.executemany("INSERT INTO docs (id, length) VALUES (?, ?)", docs)
+            self._conn.executemany(
+                "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def delete(self, ids: list[str]) -> None:
+        """Remove documents from the index."""
+        with self._lock:
+            self._delete(ids)
+            self._conn.commit()
+
+    def _delete(self, ids: list[str]) -> None:
+        self._conn.executemany("DELETE FROM postings WHERE doc_id = ?", ((i,) for i in ids))
+        self._conn.executemany("DELETE FROM docs WHERE id = ?", ((i,) for i in ids))
+
+    def search(self, query: str, k: int) -> list[tuple[str, float]]:
+        """Return the IDs of the `k` best BM25 matches with their scores."""
+        terms = set(keyword_terms(query))
+        if not terms:
+            return []
+        with self._lock:
+            count, total_length = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+            ).fetchone()
+            if not count:
+                return []
+            average_length = total_length / count
+            max_df = max(1, int(count * self.max_df_ratio))
+            scores: dict[str, float] = {}
+            for term in terms:
+                # Count no further than the cutoff, common terms stay cheap
+                (df,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM "
+                    "(SELECT 1 FROM postings WHERE term = ? LIMIT ?)",
+                    (term, max_df + 1),
+                ).fetchone()
+                if not df or df > max_df:
+                    continue
+                postings = self._conn.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM postings p "
+                    "JOIN docs d ON d.id = p.doc_id WHERE p.term = ?",
+                    (term,),
+                ).fetchall()
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf, length in postings:
+                    norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                    score = idf * tf * (self.k1 + 1) / (tf + norm)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def keyword_index_enabled() -> bool:
+    """Whether ingest should maintain keyword indexes."""
+    return getenv("KEYWORD_INDEX", "1").lower() not in ("0", "false", "no", "off")
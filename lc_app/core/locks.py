@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+from os import makedirs, path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+LOCK_FILE = "lc_app.lock"  # Lock file older versions kept inside a collection
+LOCK_SUFFIX = ".lock"  # Lock file next to a collection, named after its directory
+
+
+def lock_path(db_path: str) -> str:
+    """
+    Get the lock file of a collection.
+
+    It lives next to the collection rather than inside it, so it survives
+    compaction replacing the collection's directory.
+    """
+    return path.normpath(path.abspath(db_path)) + LOCK_SUFFIX
+
+
+@contextmanager
+def collection_lock(db_path: str, shared: bool = False) -> Iterator[None]:
+    """
+    Hold an advisory lock on a collection across processes.
+
+    Writers take the lock exclusively; snapshots take it shared so they can run
+    alongside each other but never while the collection is being written. On
+    platforms without fcntl the lock is a no-op.
+    """
+    if fcntl is None:
+        yield
+        return
+    makedirs(db_path, exist_ok=True)
+    with open(lock_path(db_path), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
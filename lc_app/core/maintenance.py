@@ -0,0 +1,322 @@
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from os import path
+from typing import Iterator
+
+from langchain_core.vectorstores import VectorStore
+
+from lc_app.core.answer_cache import ANSWER_CACHE_FILE, bump_collection_version
+from lc_app.core.federation import expand_collections, is_collection_pattern
+from lc_app.core.keyword_index import KeywordIndex, keyword_index_enabled
+from lc_app.core.locks import LOCK_FILE, collection_lock
+from lc_app.core.pipeline import content_hash
+from lc_app.core.vectorstores import (
+    NumpyVectorStore,
+    collection_backend,
+    open_vectorstore,
+    upsert_vectors,
+)
+
+DEFAULT_HNSW_M = 16  # HNSW graph links per node
+DEFAULT_HNSW_CONSTRUCTION_EF = 200  # HNSW candidate list size while building
+DEFAULT_HNSW_SEARCH_EF = 64  # HNSW candidate list size while searching
+DEFAULT_COPY_BATCH_SIZE = 1000  # Records read and written per store call
+
+
+def _open(
+    db_path: str,
+    backend: str | None = None,
+    collection_metadata: dict | None = None,
+    dtype: str | None = None,
+) -> VectorStore:
+    """Open a collection with its own backend, or create one with `backend`."""
+    backend = collection_backend(db_path) or backend
+    if backend == "chroma" and collection_metadata is not None:
+        from langchain_chroma import Chroma
+
+        return Chroma(
+            persist_directory=db_path, collection_metadata=collection_metadata
+        )
+    if backend == "numpy" and dtype is not None:
+        return NumpyVectorStore(db_path, dtype=dtype)
+    return open_vectorstore(db_path, backend=backend)
+
+
+def _close(db: VectorStore) -> None:
+    if isinstance(db, NumpyVectorStore):
+        db.close()
+
+
+def _pages(
+    db: VectorStore, include: list[str], batch_size: int = DEFAULT_COPY_BATCH_SIZE
+) -> Iterator[dict]:
+    """Read every record of a collection, one page at a time."""
+    offset = 0
+    while True:
+        page = db.get(include=include, limit=batch_size, offset=offset)
+        if not page["ids"]:
+            return
+        yield page
+        offset += len(page["ids"])
+
+
+def _record_hash(text: str | None, metadata: dict | None) -> str:
+    return (metadata or {}).get("content_hash") or content_hash(text or "")
+
+
+def _disk_size(directory: str) -> int:
+    return sum(
+        path.getsize(path.join(root, name))
+        for root, _, names in os.walk(directory)
+        for name in names
+    )
+
+
+def release_clients() -> None:
+    """Drop Chroma's cached clients so directories can be replaced or reopened."""
+    if "chromadb" not in sys.modules:
+        return
+    from chromadb.api.client import SharedSystemClient
+
+    SharedSystemClient.clear_system_cache()
+
+
+def _require_collection(db_path: str) -> str:
+    """Get the backend of a collection, raising if there is none."""
+    backend = collection_backend(db_path)
+    if backend is None:
+        raise FileNotFoundError(f"No collection at {db_path!r}.")
+    return backend
+
+
+def _index_settings(db: VectorStore) -> dict:
+    """Get the HNSW settings of a Chroma store or the layout of a NumPy one."""
+    if isinstance(db, NumpyVectorStore):
+        return db.layout()
+    return {
+        key: value
+        for key, value in (db._collection.metadata or {}).items()
+        if key.startswith("hnsw:")
+    }
+
+
+def collection_stats(db_path: str) -> dict:
+    """Count records, duplicate chunks, index segments and bytes on disk."""
+    backend = _require_collection(db_path)
+    db = _open(db_path)
+    try:
+        hashes: set[str] = set()
+        count = 0
+        for page in _pages(db, ["documents", "metadatas"]):
+            for text, metadata in zip(page["documents"], page["metadatas"]):
+                count += 1
+                hashes.add(_record_hash(text, metadata))
+        index = _index_settings(db)
+    finally:
+        _close(db)
+    return {
+        "path": db_path,
+        "backend": backend,
+        "count": count,
+        "duplicates": count - len(hashes),
+        "segments": sum(
+            1 for entry in os.scandir(db_path) if entry.is_dir(follow_symlinks=False)
+        ),
+        "size_bytes": _disk_size(db_path),
+        "index": index,
+        "keyword_index": KeywordIndex.exists(db_path),
+    }
+
+
+def _copy_into(
+    source: VectorStore, target: VectorStore, target_path: str, seen: set[str]
+) -> tuple[int, int]:
+    """
+    Copy stored vectors from one collection into another without re-embedding.
+
+    Records whose content hash is in `seen` are skipped. Returns the number of
+    records copied and skipped.
+    """
+    keyword_index = KeywordIndex(target_path) if keyword_index_enabled() else None
+    copied = skipped = 0
+    try:
+        for page in _pages(source, ["embeddings", "documents", "metadatas"]):
+            keep = []
+            for i, (text, metadata) in enumerate(
+                zip(page["documents"], page["metadatas"])
+            ):
+                hash_ = _record_hash(text, metadata)
+                if hash_ in seen:
+                    skipped += 1
+                    continue
+                seen.add(hash_)
+                keep.append(i)
+            if not keep:
+                continue
+            ids = [page["ids"][i] for i in keep]
+            documents = [page["documents"][i] for i in keep]
+            upsert_vectors(
+                target,
+                ids,
+                [page["embeddings"][i] for i in keep],
+                documents,
+                [page["metadatas"][i] for i in keep],
+            )
+            if keyword_index is not None:
+                keyword_index.upsert(ids, documents)
+            copied += len(ids)
+    finally:
+        if keyword_index is not None:
+            keyword_index.close()
+    return copied, skipped
+
+
+def compact_collection(
+    db_path: str,
+    m: int = DEFAULT_HNSW_M,
+    construction_ef: int = DEFAULT_HNSW_CONSTRUCTION_EF,
+    search_ef: int = DEFAULT_HNSW_SEARCH_EF,
+) -> dict:
+    """
+    Rebuild a collection without duplicate chunks and with new index settings.
+
+    The stored vectors are copied into a fresh collection next to the old one,
+    which then replaces it, so a Chroma HNSW index is built once instead of
+    being patched by every upsert, and a NumPy vector file loses the rows of
+    deleted and replaced records. Nothing is re-embedded. Market data tables
+    are carried over. The HNSW settings only apply to Chroma collections.
+    """
+    # Imported here to keep pandas and pyarrow out of the CLI's startup
+    from lc_app.core.market import copy_market_data
+
+    db_path = path.abspath(db_path)
+    backend = _require_collection(db_path)
+    with collection_lock(db_path):
+        source = _open(db_path)
+        collection_metadata = dtype = None
+        if backend == "chroma":
+            collection_metadata = {
+                **(source._collection.metadata or {}),
+                "hnsw:M": m,
+                "hnsw:construction_ef": construction_ef,
+                "hnsw:search_ef": search_ef,
+            }
+        else:
+            dtype = source.dtype.name
+        before = _disk_size(db_path)
+        staging = f"{db_path}.compact-{time.time_ns()}"
+        try:
+            target = _open(staging, backend, collection_metadata, dtype)
+            try:
+                copied, skipped = _copy_into(source, target, staging, set())
+            finally:
+                _close(source)
+                _close(target)
+            copy_market_data(db_path, staging)
+            release_clients()
+            backup = f"{db_path}.old-{time.time_ns()}"
+            os.rename(db_path, backup)
+            os.rename(staging, db_path)
+            shutil.rmtree(backup)
+        finally:
+            if path.exists(staging):
+                release_clients()
+                shutil.rmtree(staging)
+        bump_collection_version(db_path)
+    return {
+        "path": db_path,
+        "kept": copied,
+        "removed": skipped,
+        "size_before": before,
+        "size_after": _disk_size(db_path),
+    }
+
+
+def merge_collections(patterns: list[str], target_path: str) -> dict:
+    """
+    Fold every collection matching the patterns into one target collection.
+
+    Sources may be paths, globs or DB_PATH templates, of either backend. Chunks
+    whose content is already in the target are skipped, so merging is safe to
+    repeat. A new target uses the backend of the first source. Market data
+    tables are copied along.
+    """
+    from lc_app.core.market import copy_market_data
+
+    target_path = path.abspath(target_path)
+    db_paths = [
+        path.abspath(db_path)
+        for pattern in patterns
+        for db_path in (
+            expand_collections(pattern) if is_collection_pattern(pattern) else [pattern]
+        )
+    ]
+    db_paths = [
+        db_path for db_path in dict.fromkeys(db_paths) if db_path != target_path
+    ]
+    backends = [_require_collection(db_path) for db_path in db_paths]
+    with collection_lock(target_path):
+        target = _open(target_path, backends[0] if backends else None)
+        copied = skipped = 0
+        try:
+            seen = {
+                _record_hash(text, metadata)
+                for page in _pages(target, ["documents", "metadatas"])
+                for text, metadata in zip(page["documents"], page["metadatas"])
+            }
+            for db_path in db_paths:
+                with collection_lock(db_path, shared=True):
+                    source = _open(db_path)
+                    try:
+                        counts = _copy_into(source, target, target_path, seen)
+                    finally:
+                        _close(source)
+                    copy_market_data(db_path, target_path)
+                copied += counts[0]
+                skipped += counts[1]
+        finally:
+            _close(target)
+        if copied:
+            bump_collection_version(target_path)
+    return {
+        "target": target_path,
+        "sources": db_paths,
+        "copied": copied,
+        "skipped": skipped,
+    }
+
+
+def _copy_file(src: str, dst: str) -> None:
+    """Copy a file, using SQLite's online backup for databases."""
+    if src.endswith((".sqlite3", ".sqlite")):
+        with closing(sqlite3.connect(src)) as source:
+            with closing(sqlite3.connect(dst)) as target:
+                source.backup(target)
+    else:
+        shutil.copy2(src, dst)
+
+
+def snapshot_collection(db_path: str, target_path: str) -> dict:
+    """
+    Copy a collection to a new directory, e.g. for a read replica.
+
+    The copy is taken under a shared lock, so no ingest can write in the
+    meantime, and SQLite files are copied with the online backup API.
+    """
+    if path.exists(target_path):
+        raise FileExistsError(f"Snapshot target {target_path!r} already exists.")
+    _require_collection(db_path)
+    with collection_lock(db_path, shared=True):
+        shutil.copytree(
+            db_path,
+            target_path,
+            copy_function=_copy_file,
+            ignore=shutil.ignore_patterns(
+                LOCK_FILE, ANSWER_CACHE_FILE, "*-wal", "*-shm", "*-journal"
+            ),
+        )
+    return {"path": target_path, "size_bytes": _disk_size(target_path)}
@@ -0,0 +1,292 @@
+import filecmp
+import os
+import shutil
+from datetime import datetime
+from os import makedirs, path
+from typing import Callable, Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from langchain_core.documents import Document
+
+from lc_app.core.embeddings import get_embeddings
+from lc_app.core.locks import collection_lock
+from lc_app.core.pipeline import IngestStats, ingest_documents
+
+DEFAULT_MARKET_WINDOW = "W"  # Pandas period of each summary chunk, e.g. W, M or Q
+DEFAULT_MARKET_CSV_BLOCK_SIZE = 16 << 20  # Bytes of CSV parsed per pyarrow batch
+DEFAULT_MARKET_PARQUET_BATCH_ROWS = 1 << 16  # Rows read per Parquet batch
+MARKET_DATA_DIR = "market"  # Parquet tables kept inside a collection directory
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+_TICKER_COLUMNS = ("ticker", "symbol")
+_WINDOW_NAMES = {"D": "day", "W": "week", "M": "month", "Q": "quarter", "Y": "year"}
+_AGGREGATIONS = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+    "rows": "sum",
+    "start": "min",
+    "end": "max",
+}
+
+
+def market_data_dir(db_path: str) -> str:
+    """Get the directory holding a collection's market data tables."""
+    return path.join(db_path, MARKET_DATA_DIR)
+
+
+def _batches(file_path: str) -> Iterator[pa.RecordBatch]:
+    """Read a CSV or Parquet file in record batches, never all at once."""
+    if file_path.endswith(".parquet"):
+        yield from pq.ParquetFile(file_path).iter_batches(
+            batch_size=DEFAULT_MARKET_PARQUET_BATCH_ROWS
+        )
+    else:
+        read_options = pacsv.ReadOptions(block_size=DEFAULT_MARKET_CSV_BLOCK_SIZE)
+        yield from pacsv.open_csv(file_path, read_options=read_options)
+
+
+def _normalize(batch: pa.RecordBatch, ticker: str | None) -> pd.DataFrame:
+    """Turn a batch into ticker, date, OHLC and volume columns."""
+    df = batch.to_pandas()
+    df.columns = [str(column).strip().lower() for column in df.columns]
+    if "date" not in df or "close" not in df:
+        raise ValueError("Market data needs at least date and close columns.")
+    ticker_column = next((c for c in _TICKER_COLUMNS if c in df), None)
+    if ticker_column is not None:
+        df["ticker"] = df[ticker_column].astype(str).str.upper()
+    elif ticker:
+        df["ticker"] = ticker.upper()
+    else:
+        raise ValueError("Market data has no ticker column; pass a ticker.")
+    df["date"] = pd.to_datetime(df["date"])
+    for column in PRICE_COLUMNS:
+        df[column] = df[column].astype("float64") if column in df else df["close"]
+    df["volume"] = (
+        df["volume"].fillna(0).astype("float64") if "volume" in df else 0.0
+    )
+    return df[["ticker", "date", *PRICE_COLUMNS, "volume"]]
+
+
+def _summarize(df: pd.DataFrame, window: str) -> pd.DataFrame:
+    """Aggregate rows into one OHLCV row per ticker and window."""
+    df = df.sort_values(["ticker", "date"])
+    return (
+        df.assign(
+            window=df["date"].dt.to_period(window),
+            rows=1,
+            start=df["date"],
+            end=df["date"],
+        )
+        .groupby(["ticker", "window"], sort=False)
+        .agg(_AGGREGATIONS)
+        .reset_index()
+    )
+
+
+def _write_parquet(
+    file_path: str, target: str, ticker: str | None, window: str
+) -> list[pd.DataFrame]:
+    """Copy a file into a Parquet table chunk by chunk, summarizing each chunk."""
+    partials = []
+    writer = None
+    try:
+        for batch in _batches(file_path):
+            df = _normalize(batch, ticker)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                makedirs(path.dirname(target), exist_ok=True)
+                writer = pq.ParquetWriter(target, table.schema)
+            writer.write_table(table)
+            partials.append(_summarize(df, window))
+    finally:
+        if writer is not None:
+            writer.close()
+    return partials
+
+
+def store_market_data(
+    file_path: str,
+    db_path: str,
+    ticker: str | None = None,
+    window: str = DEFAULT_MARKET_WINDOW,
+) -> pd.DataFrame:
+    """
+    Store a market data file as Parquet in a collection and summarize it.
+
+    The file is read in chunks; each chunk is appended to the collection's
+    Parquet table for the file and aggregated per ticker and window, and the
+    partial aggregates are combined at the end, so only summaries are held in
+    memory. Returns one row per ticker and window.
+    """
+    directory = market_data_dir(db_path)
+    name = path.splitext(path.basename(file_path))[0]
+    target = path.join(directory, f"{name}.parquet")
+    staging = f"{target}.tmp"
+    try:
+        partials = _write_parquet(file_path, staging, ticker, window)
+    except BaseException:
+        if path.exists(staging):
+            os.remove(staging)
+        raise
+    if not partials:
+        return pd.DataFrame()
+    with collection_lock(db_path):
+        os.replace(staging, target)
+
+    summaries = (
+        pd.concat(partials)
+        .sort_values(["ticker", "window", "start", "end"])
+        .groupby(["ticker", "window"], sort=True)
+        .agg(_AGGREGATIONS)
+        .reset_index()
+    )
+    summaries["change_pct"] = (summaries["close"] / summaries["open"] - 1) * 100
+    return summaries
+
+
+def summary_documents(
+    summaries: pd.DataFrame, file_path: str, window: str = DEFAULT_MARKET_WINDOW
+) -> Iterator[Document]:
+    """Describe each ticker and window summary as a document to embed."""
+    label = _WINDOW_NAMES.get(window.upper()[:1], window)
+    for row in summaries.itertuples(index=False):
+        start, end = row.start.to_pydatetime(), row.end.to_pydatetime()
+        text = (
+            f"{row.ticker} {label} of {start:%Y-%m-%d} to {end:%Y-%m-%d}: "
+            f"opened at {row.open:.2f}, high {row.high:.2f}, low {row.low:.2f}, "
+            f"closed at {row.close:.2f} ({row.change_pct:+.2f}%), "
+            f"volume {row.volume:,.0f} over {row.rows} trading days."
+        )
+        yield Document(
+            page_content=text,
+            metadata={
+                "source": file_path,
+                "row": f"{row.ticker}:{row.window}",
+                "ticker": row.ticker,
+                "window": str(row.window),
+                "date": f"{start:%Y-%m-%d}",
+                "date_ts": start.timestamp(),
+                "end_date": f"{end:%Y-%m-%d}",
+                "open": float(row.open),
+                "high": float(row.high),
+                "low": float(row.low),
+                "close": float(row.close),
+                "volume": float(row.volume),
+                "change_pct": float(row.change_pct),
+            },
+        )
+
+
+def embed_market_data(
+    file_path: str,
+    chroma_db_path: str,
+    ticker: str | None = None,
+    window: str = DEFAULT_MARKET_WINDOW,
+    ollama_host: str | None = None,
+    model: str | None = None,
+    batch_size: int | None = None,
+    workers: int | None = None,
+    progress: Callable[[IngestStats], None] | None = None,
+    backend: str | None = None,
+) -> IngestStats:
+    """
+    Ingest a market data CSV or Parquet file into a collection.
+
+    Only the per-ticker, per-window summaries are embedded; the raw rows are
+    kept as Parquet next to the collection for `lookup_market_data`.
+    """
+    summaries = store_market_data(file_path, chroma_db_path, ticker, window)
+    embeddings = get_embeddings(ollama_host, model)
+    return ingest_documents(
+        summary_documents(summaries, file_path, window),
+        chroma_db_path,
+        embeddings,
+        batch_size=batch_size,
+        workers=workers,
+        progress=progress,
+        backend=backend,
+    )
+
+
+def lookup_market_data(
+    db_path: str,
+    ticker: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> pd.DataFrame:
+    """
+    Read market data rows stored in a collection, filtered in the scan.
+
+    Filters are pushed down to the Parquet reader, so only matching row
+    groups and columns are decoded.
+    """
+    directory = market_data_dir(db_path)
+    if not path.isdir(directory):
+        raise FileNotFoundError(f"No market data in {db_path!r}.")
+    dataset = ds.dataset(directory, format="parquet")
+    conditions = []
+    if ticker:
+        conditions.append(ds.field("ticker") == ticker.upper())
+    date_type = dataset.schema.field("date").type
+    if since is not None:
+        conditions.append(ds.field("date") >= pa.scalar(since, type=date_type))
+    if until is not None:
+        conditions.append(ds.field("date") <= pa.scalar(until, type=date_type))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    df = dataset.to_table(filter=expression).to_pandas()
+    return df.sort_values(["ticker", "date"]).reset_index(drop=True)
+
+
+def market_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """Summarize market data rows per ticker: range, extremes, change, volume."""
+    df = df.sort_values(["ticker", "date"])
+    summary = df.groupby("ticker").agg(
+        rows=("close", "size"),
+        first_date=("date", "min"),
+        last_date=("date", "max"),
+        open=("open", "first"),
+        close=("close", "last"),
+        low=("low", "min"),
+        high=("high", "max"),
+        mean_close=("close", "mean"),
+        volume=("volume", "sum"),
+    )
+    summary["change_pct"] = (summary["close"] / summary["open"] - 1) * 100
+    return summary
+
+
+def copy_market_data(source_path: str, target_path: str) -> int:
+    """
+    Copy a collection's market data tables into another collection.
+
+    A table whose name is already taken in the target by a different table is
+    prefixed with the source directory's name; tables the target already has
+    are skipped. Returns the number of tables copied.
+    """
+    source_dir = market_data_dir(source_path)
+    if not path.isdir(source_dir):
+        return 0
+    target_dir = market_data_dir(target_path)
+    makedirs(target_dir, exist_ok=True)
+    copied = 0
+    for name in sorted(os.listdir(source_dir)):
+        if not name.endswith(".parquet"):
+            continue
+        source = path.join(source_dir, name)
+        target = path.join(target_dir, name)
+        if path.exists(target) and not filecmp.cmp(source, target):
+            target = path.join(target_dir, f"{path.basename(source_path)}-{name}")
+        if path.exists(target) and filecmp.cmp(source, target):
+            continue
+        shutil.copy2(source, target)
+        copied += 1
+    return copied
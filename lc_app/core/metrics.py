@@ -0,0 +1,290 @@
+import functools
+import inspect
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import Callable, Iterator, TextIO
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)  # Seconds
+SIZE_BUCKETS = tuple(float(4**i) for i in range(13))  # Bytes or tokens, 1 to 16M
+RATE_BUCKETS = tuple(float(10**i) for i in range(7))  # Items per second, 1 to 1M
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+        self._series: dict[tuple[tuple[str, str], ...], list[float]] = {}
+
+    @staticmethod
+    def _labels(key: tuple[tuple[str, str], ...], extra: str = "") -> str:
+        pairs = [f'{name}="{value}"' for name, value in key]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            lines.extend(self._render_series(key, values))
+        return lines
+
+    def _render_series(self, key, values: list[float]) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series.setdefault(key, [0.0])[0] += amount
+
+    def _render_series(self, key, values: list[float]) -> list[str]:
+        return [f"{self.name}{self._labels(key)} {values[0]:g}"]
+
+
+class Histogram(_Metric):
+    """
+    Observations bucketed per label set, like a Prometheus histogram.
+
+    Each series keeps a count per bucket followed by the sum, count and
+    maximum of its observations.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...]):
+        super().__init__(name, description)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        size = len(self.buckets) + 1
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * size + [0.0, 0.0, 0.0]
+            series[index] += 1
+            series[size] += value
+            series[size + 1] += 1
+            series[size + 2] = max(series[size + 2], value)
+
+    def totals(self) -> dict[tuple[tuple[str, str], ...], tuple[float, float, float]]:
+        """Get the (count, sum, max) of every series."""
+        size = len(self.buckets) + 1
+        with self._lock:
+            return {
+                key: (values[size + 1], values[size], values[size + 2])
+                for key, values in self._series.items()
+            }
+
+    def _render_series(self, key, values: list[float]) -> list[str]:
+        lines = []
+        cumulative = 0.0
+        for bound, count in zip(self.buckets, values):
+            cumulative += count
+            le = self._labels(key, f'le="{bound:g}"')
+            lines.append(f"{self.name}_bucket{le} {cumulative:g}")
+        cumulative += values[len(self.buckets)]
+        le = self._labels(key, 'le="+Inf"')
+        lines.append(f"{self.name}_bucket{le} {cumulative:g}")
+        size = len(self.buckets) + 1
+        lines.append(f"{self.name}_sum{self._labels(key)} {values[size]:g}")
+        lines.append(f"{self.name}_count{self._labels(key)} {values[size + 1]:g}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "lc_app_stage_seconds", "Time spent in a pipeline stage.", LATENCY_BUCKETS
+)
+STAGE_ITEMS_PER_SECOND = Histogram(
+    "lc_app_stage_items_per_second",
+    "Documents, chunks or pages processed per second by a stage.",
+    RATE_BUCKETS,
+)
+STAGE_BYTES = Histogram(
+    "lc_app_stage_bytes", "Bytes of text handled by a stage call.", SIZE_BUCKETS
+)
+STAGE_TOKENS = Histogram(
+    "lc_app_stage_tokens",
+    "Tokens consumed or produced by a stage call.",
+    SIZE_BUCKETS,
+)
+STAGE_ERRORS = Counter("lc_app_stage_errors_total", "Stage calls that raised.")
+
+METRICS = (
+    STAGE_SECONDS,
+    STAGE_ITEMS_PER_SECOND,
+    STAGE_BYTES,
+    STAGE_TOKENS,
+    STAGE_ERRORS,
+)
+
+
+@dataclass
+class Span:
+    """A timed stage call; set its sizes while it runs."""
+
+    stage: str
+    items: int | None = None
+    bytes: int | None = None
+    tokens: int | None = None
+
+
+def record(
+    stage: str,
+    seconds: float,
+    items: int | None = None,
+    bytes: int | None = None,
+    tokens: int | None = None,
+) -> None:
+    """Record one call of a stage."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    if items is not None and seconds > 0:
+        STAGE_ITEMS_PER_SECOND.observe(items / seconds, stage=stage)
+    if bytes is not None:
+        STAGE_BYTES.observe(bytes, stage=stage)
+    if tokens is not None:
+        STAGE_TOKENS.observe(tokens, stage=stage)
+
+
+@contextmanager
+def span(
+    stage: str, items: int | None = None, bytes: int | None = None
+) -> Iterator[Span]:
+    """Time the enclosed block as a call of `stage`."""
+    current = Span(stage, items=items, bytes=bytes)
+    started_at = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started_at
+        record(stage, elapsed, current.items, current.bytes, current.tokens)
+
+
+def timed(stage: str) -> Callable:
+    """Decorate a function or coroutine function to time its calls as `stage`."""
+
+    def decorator(function: Callable) -> Callable:
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def render_prometheus() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    lines = [line for metric in METRICS for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+
+def format_summary() -> str:
+    """Summarize time spent per stage, slowest first, for the terminal."""
+    totals = STAGE_SECONDS.totals()
+    if not totals:
+        return "No stages recorded."
+    rows = sorted(
+        ((dict(key).get("stage", ""), *values) for key, values in totals.items()),
+        key=lambda row: row[2],
+        reverse=True,
+    )
+    lines = [f"{'stage':<12} {'calls':>7} {'total s':>9} {'mean ms':>9} {'max ms':>9}"]
+    for stage, count, total, maximum in rows:
+        lines.append(
+            f"{stage:<12} {count:>7g} {total:>9.3f} "
+            f"{total / count * 1000:>9.1f} {maximum * 1000:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+class Profiler:
+    """
+    Profile a block of code with pyinstrument, if installed, or cProfile.
+
+    Reports ending in .html or .txt are written by pyinstrument when it is
+    available; anything else is a cProfile dump readable with pstats.
+    """
+
+    def __init__(self, output: str):
+        self.output = output
+        self.use_pyinstrument = find_spec("pyinstrument") is not None and (
+            output.endswith((".html", ".txt"))
+        )
+        self._profiler = None
+
+    def start(self) -> None:
+        if self.use_pyinstrument:
+            from pyinstrument import Profiler as PyinstrumentProfiler
+
+            self._profiler = PyinstrumentProfiler(async_mode="enabled")
+            self._profiler.start()
+        else:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self, stream: TextIO = sys.stderr) -> None:
+        """Stop profiling, write the report and print where it went."""
+        if self.use_pyinstrument:
+            self._profiler.stop()
+            report = (
+                self._profiler.output_html()
+                if self.output.endswith(".html")
+                else self._profiler.output_text()
+            )
+            with open(self.output, "w") as f:
+                f.write(report)
+        else:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.output)
+        print(f"Profile written to: {self.output}", file=stream)
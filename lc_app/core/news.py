@@ -0,0 +1,92 @@
+from contextlib import aclosing
+from itertools import chain
+from typing import AsyncIterator
+
+from lc_app.core import utils
+from lc_app.core.pipeline import IngestStats
+from lc_app.core.rag import article_document, embed_from_documents
+from lc_app.core.scrapers.article_cache import get_article_cache
+from lc_app.core.scrapers.models import Article
+from lc_app.core.scrapers.scraper import NewsScraper, close_scraper_resources
+from lc_app.core.scrapers.yf_scraper import YahooFinanceNewsScraper
+
+NEWS_SOURCES = ("yahoo",)  # Sources that embed_news can scrape
+
+
+def get_news_scraper(
+    source: str,
+    ticker: str | None = None,
+    topic: str | None = None,
+    refresh: bool = False,
+) -> NewsScraper:
+    """Get the scraper for a news source; `refresh` bypasses the article cache."""
+    if source == "yahoo":
+        return YahooFinanceNewsScraper(
+            ticker=ticker, topic=topic, cache=get_article_cache(), refresh=refresh
+        )
+    raise ValueError(f"Unsupported news source {source!r}.")
+
+
+async def scrape_news(scraper: NewsScraper) -> list[Article]:
+    """Scrape news and release the shared scraper resources afterwards."""
+    try:
+        return await scraper.scrape_news()
+    finally:
+        await close_scraper_resources()
+
+
+async def stream_news(scraper: NewsScraper) -> AsyncIterator[Article]:
+    """Stream news and release the shared scraper resources afterwards."""
+    try:
+        async with aclosing(scraper.stream_news()) as articles:
+            async for article in articles:
+                yield article
+    finally:
+        await close_scraper_resources()
+
+
+def embed_news(
+    db_path: str,
+    ticker: str | None = None,
+    topic: str | None = None,
+    source: str = "yahoo",
+    ollama_host: str | None = None,
+    embed_model: str | None = None,
+    backend: str | None = None,
+    refresh: bool = False,
+) -> tuple[str, IngestStats | None]:
+    """
+    Scrape news for a ticker or topic and embed it into a Chroma collection.
+
+    `db_path` may be a template (see `utils.hydreate_template`). Returns the
+    hydrated collection path and the ingest stats, or None if nothing was found.
+    Articles scraped recently are taken from the article cache unless
+    `refresh` is set. Articles are embedded as they are scraped, so embedding
+    overlaps fetching the remaining pages.
+    """
+    scraper = get_news_scraper(source, ticker=ticker, topic=topic, refresh=refresh)
+    db_path = utils.hydreate_template(
+        template_str=db_path,
+        placeholders={
+            "ticker": ticker,
+            "topic": topic or "general",
+        },
+    )
+    articles = utils.iter_sync(stream_news, scraper)
+    try:
+        # Do not create a collection until there is something to put in it
+        first = next(articles, None)
+        if first is None:
+            return db_path, None
+        # The ingest reader thread consumes the stream; closing it from here
+        # cancels the scrape and lets the reader see the stream end
+        stats = embed_from_documents(
+            (article_document(article) for article in chain([first], articles)),
+            db_path,
+            ollama_host,
+            embed_model,
+            backend=backend,
+        )
+    finally:
+        articles.close()
+    return db_path, stats
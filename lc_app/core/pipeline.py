@@ -0,0 +1,382 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from hashlib import sha256
+from os import getenv
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from lc_app.core.answer_cache import bump_collection_version
+from lc_app.core.keyword_index import KeywordIndex, keyword_index_enabled
+from lc_app.core.locks import collection_lock
+from lc_app.core.metrics import span
+from lc_app.core.vectorstores import open_vectorstore, upsert_vectors
+
+if TYPE_CHECKING:
+    from langchain_text_splitters import TextSplitter
+
+DEFAULT_EMBED_BATCH_SIZE = 256  # Documents embedded and written per store call
+DEFAULT_EMBED_WORKERS = 4  # Concurrent embedding requests
+DEFAULT_QUEUE_BATCHES = 8  # Batches buffered between pipeline stages
+
+_DONE = object()
+
+
+def content_hash(text: str) -> str:
+    """Hash document content to detect unchanged chunks."""
+    return sha256(text.encode("utf-8")).hexdigest()
+
+
+def document_origin(metadata: dict) -> tuple[str, str, object] | None:
+    """
+    Get the metadata field, its value and the row a chunk was split from.
+
+    Chunks are split from a page (keyed by its URL) or from a file or one of
+    its rows or records (keyed by its source and row).
+    """
+    if metadata.get("url"):
+        return "url", metadata["url"], None
+    if metadata.get("source"):
+        row = metadata.get("row", metadata.get("seq_num"))
+        return "source", metadata["source"], row
+    return None
+
+
+def document_id(doc: Document) -> str:
+    """
+    Build a stable ID for a document from where it came from.
+
+    Documents are keyed by their URL (or source file) and their position within
+    it, so re-embedding the same page or file maps onto the same IDs. Documents
+    without any origin are keyed by their content.
+    """
+    origin = document_origin(doc.metadata)
+    if origin is None:
+        return content_hash(doc.page_content)
+    field_name, value, row = origin
+    if field_name == "url":
+        parts = [value, doc.metadata.get("start_index")]
+    else:
+        parts = [value, row, doc.metadata.get("start_index")]
+    return sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class IngestStats:
+    """Progress counters for a single ingest run."""
+
+    loaded: int = 0  # Source documents read from the loader
+    chunks: int = 0  # Chunks produced by the splitter
+    skipped: int = 0  # Chunks already stored with the same content
+    written: int = 0  # Chunks embedded and upserted
+    removed: int = 0  # Stored chunks their source no longer produces
+    batches: int = 0  # Batches written to the store
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.loaded} docs, {self.chunks} chunks "
+            f"({self.written} embedded, {self.skipped} unchanged, "
+            f"{self.removed} removed) "
+            f"in {self.elapsed:.1f}s, {self.chunks_per_second:.1f} chunks/s"
+        )
+
+
+@dataclass
+class _Batch:
+    ids: list[str]
+    docs: list[Document]
+    vectors: list[list[float]] | None = None
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+@dataclass
+class _Prune:
+    origin: tuple[str, str, None]
+    ids: set[str]
+
+
+def _batched(
+    docs: Iterable[Document],
+    splitter: "TextSplitter | None",
+    batch_size: int,
+    stats: IngestStats,
+    split: Callable[[tuple[str, str, None], set[str]], None] | None = None,
+) -> Iterator[dict[str, Document]]:
+    """
+    Split documents lazily and group the chunks into batches keyed by ID.
+
+    `split` is called with the origin and chunk IDs of every page or whole
+    file once it has been split; rows and records are not tracked.
+    """
+    batch: dict[str, Document] = {}
+    for doc in docs:
+        ids: set[str] = set()
+        stats.loaded += 1
+        if splitter is not None:
+            with span("split", bytes=len(doc.page_content)) as current:
+                chunks = splitter.split_documents([doc])
+                current.items = len(chunks)
+        else:
+            chunks = [doc]
+        for chunk in chunks:
+            stats.chunks += 1
+            chunk.metadata["content_hash"] = content_hash(chunk.page_content)
+            id_ = document_id(chunk)
+            ids.add(id_)
+            # Later versions of the same chunk win within a batch
+            batch[id_] = chunk
+            if len(batch) >= batch_size:
+                yield batch
+                batch = {}
+        origin = document_origin(doc.metadata)
+        if split is not None and origin is not None and origin[2] is None:
+            split(origin, ids)
+    if batch:
+        yield batch
+
+
+def _changed(db: VectorStore, batch: dict[str, Document]) -> list[str]:
+    """Get the IDs in a batch that are new or whose content has changed."""
+    existing = db.get(ids=list(batch), include=["metadatas"])
+    stored_hashes = {
+        id_: (metadata or {}).get("content_hash")
+        for id_, metadata in zip(existing["ids"], existing["metadatas"])
+    }
+    return [
+        id_
+        for id_, doc in batch.items()
+        if stored_hashes.get(id_) != doc.metadata["content_hash"]
+    ]
+
+
+def _prune_stale(
+    db: VectorStore,
+    keyword_index: KeywordIndex | None,
+    prune: _Prune,
+    page_size: int,
+) -> int:
+    """
+    Delete stored chunks of a page or file that it no longer produced.
+
+    A page or file that shrank leaves chunks at offsets it no longer reaches;
+    they would otherwise stay retrievable. Stored chunks are read a page at a
+    time. Returns how many were deleted.
+    """
+    field_name, value, _ = prune.origin
+    stale = []
+    offset = 0
+    while True:
+        stored = db.get(
+            where={field_name: value},
+            include=["metadatas"],
+            limit=page_size,
+            offset=offset,
+        )
+        if not stored["ids"]:
+            break
+        stale += [
+            id_
+            for id_, metadata in zip(stored["ids"], stored["metadatas"])
+            # Rows of a file with the same source are not part of the whole file
+            if id_ not in prune.ids and document_origin(metadata or {}) == prune.origin
+        ]
+        offset += len(stored["ids"])
+    if stale:
+        db.delete(ids=stale)
+        if keyword_index is not None:
+            keyword_index.delete(stale)
+    return len(stale)
+
+
+def _backfill_keyword_index(
+    db: VectorStore, keyword_index: KeywordIndex, batch_size: int
+) -> None:
+    """Index chunks stored before the collection had a keyword index."""
+    offset = 0
+    while True:
+        stored = db.get(include=["documents"], limit=batch_size, offset=offset)
+        if not stored["ids"]:
+            break
+        keyword_index.upsert(stored["ids"], stored["documents"])
+        offset += len(stored["ids"])
+
+
+def ingest_documents(
+    docs: Iterable[Document],
+    chroma_db_path: str,
+    embeddings: Embeddings,
+    splitter: "TextSplitter | None" = None,
+    batch_size: int | None = None,
+    workers: int | None = None,
+    queue_batches: int = DEFAULT_QUEUE_BATCHES,
+    progress: Callable[[IngestStats], None] | None = None,
+    backend: str | None = None,
+) -> IngestStats:
+    """
+    Stream documents through split, embed and store stages.
+
+    A reader thread pulls documents lazily from `docs`, splits them and groups
+    the chunks into batches, skipping chunks that are already stored with the
+    same content hash. A pool of worker threads embeds the batches concurrently
+    and the calling thread upserts the finished batches into the vector store
+    (see `open_vectorstore` for `backend`) and, unless KEYWORD_INDEX is
+    disabled, into the collection's keyword index. The stages are connected
+    by bounded queues, so memory use does not depend on how many documents
+    the loader yields. `progress` is called after every written batch. Once a
+    page or whole file has been split, its stored chunks that it no longer
+    produced are deleted.
+    """
+    if batch_size is None:
+        batch_size = int(getenv("EMBED_BATCH_SIZE", DEFAULT_EMBED_BATCH_SIZE))
+    if workers is None:
+        workers = int(getenv("EMBED_WORKERS", DEFAULT_EMBED_WORKERS))
+    workers = max(1, workers)
+
+    # Compaction and merges must not run while the collection is being written
+    with collection_lock(chroma_db_path):
+        return _ingest(
+            docs,
+            chroma_db_path,
+            embeddings,
+            splitter,
+            batch_size,
+            workers,
+            queue_batches,
+            progress,
+            backend,
+        )
+
+
+def _ingest(
+    docs: Iterable[Document],
+    chroma_db_path: str,
+    embeddings: Embeddings,
+    splitter: "TextSplitter | None",
+    batch_size: int,
+    workers: int,
+    queue_batches: int,
+    progress: Callable[[IngestStats], None] | None,
+    backend: str | None,
+) -> IngestStats:
+    from langchain_community.vectorstores.utils import filter_complex_metadata
+
+    db = open_vectorstore(chroma_db_path, embeddings, backend)
+    keyword_index = None
+    if keyword_index_enabled():
+        backfill = not KeywordIndex.exists(chroma_db_path)
+        keyword_index = KeywordIndex(chroma_db_path)
+        if backfill:
+            _backfill_keyword_index(db, keyword_index, batch_size)
+    stats = IngestStats()
+    pending: queue.Queue = queue.Queue(maxsize=queue_batches)
+    embedded: queue.Queue = queue.Queue(maxsize=queue_batches)
+    stop = threading.Event()
+
+    def put(target: queue.Queue, item: object) -> bool:
+        # Give up on blocked puts once another stage has failed
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def split(origin: tuple[str, str, None], ids: set[str]) -> None:
+        # Upserts and deletes both happen on the calling thread
+        put(embedded, _Prune(origin, ids))
+
+    def read() -> None:
+        try:
+            for batch in _batched(docs, splitter, batch_size, stats, split):
+                changed = _changed(db, batch)
+                stats.skipped += len(batch) - len(changed)
+                if changed and not put(
+                    pending, _Batch(changed, [batch[id_] for id_ in changed])
+                ):
+                    return
+        except BaseException as e:
+            put(embedded, _Failure(e))
+        finally:
+            for _ in range(workers):
+                put(pending, _DONE)
+
+    def embed() -> None:
+        try:
+            while not stop.is_set():
+                try:
+                    item = pending.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                texts = [doc.page_content for doc in item.docs]
+                with span("embed", items=len(texts), bytes=sum(map(len, texts))):
+                    item.vectors = embeddings.embed_documents(texts)
+                if not put(embedded, item):
+                    return
+        except BaseException as e:
+            put(embedded, _Failure(e))
+        finally:
+            put(embedded, _DONE)
+
+    threads = [threading.Thread(target=read, name="ingest-reader", daemon=True)]
+    threads += [
+        threading.Thread(target=embed, name=f"ingest-embed-{i}", daemon=True)
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        finished = 0
+        while finished < workers:
+            item = embedded.get()
+            if item is _DONE:
+                finished += 1
+                continue
+            if isinstance(item, _Failure):
+                raise item.error
+            if isinstance(item, _Prune):
+                with span("prune", items=len(item.ids)):
+                    stats.removed += _prune_stale(db, keyword_index, item, batch_size)
+                continue
+            stored = filter_complex_metadata(item.docs)
+            texts = [doc.page_content for doc in stored]
+            with span("upsert", items=len(item.ids)):
+                upsert_vectors(
+                    db, item.ids, item.vectors, texts, [doc.metadata for doc in stored]
+                )
+                if keyword_index is not None:
+                    keyword_index.upsert(item.ids, texts)
+            stats.written += len(item.ids)
+            stats.batches += 1
+            if progress is not None:
+                progress(stats)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=1)
+        if keyword_index is not None:
+            keyword_index.close()
+        if stats.written or stats.removed:
+            # Answers cached against the old contents are no longer valid
+            bump_collection_version(chroma_db_path)
+    return stats
@@ -1,25 +1,40 @@
+from datetime import datetime
 from os import getenv
+from typing import TYPE_CHECKING, Callable, Iterable
 
-from langchain.chains import RetrievalQA
-from langchain_chroma import Chroma
-from langchain_community.document_loaders import (
-    AsyncChromiumLoader,
-    CSVLoader,
-    JSONLoader,
-)
-from langchain_community.document_transformers import BeautifulSoupTransformer
 from langchain_core.documents import Document
-from langchain_ollama import OllamaEmbeddings, OllamaLLM
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langfuse.callback import CallbackHandler
+
+from lc_app.core import utils
+from lc_app.core.embeddings import (
+    DEFAULT_EMBEDDING_MODEL,
+    DEFAULT_OLLAMA_HOST,
+    get_embeddings,
+)
+from lc_app.core.filters import published_datetime
+from lc_app.core.pipeline import IngestStats, ingest_documents
+from lc_app.core.scrapers.models import Article
+from lc_app.core.scrapers.web_loader import (
+    WebTextLoader,
+    get_web_text_cache,
+    load_web_documents,
+    web_selector,
+)
+
+if TYPE_CHECKING:
+    from langfuse.callback import CallbackHandler
+
+    from lc_app.core.tracing import Tracer
 
 DEFAULT_LANFUSE_HOST = "https://langfuse.gsingh.io"  # Langfuse server URL
-DEFAULT_OLLAMA_HOST = "http://localhost:11434"  # Ollama server URL
-DEFAULT_EMBEDDING_MODEL = "nomic-embed-text"  # Default embedding model
 DEFAULT_RAG_MODEL = "deepseek-r1:7b"  # Default RAG model
 DEFAULT_CHUNK_SIZE = 1000  # Default chunk size for text splitting
 DEFAULT_CHUNK_OVERLAP = 200  # Default chunk overlap for text splitting
 DEFAULT_WEB_CLASS = "article"  # Default CSS class for web scraping
+# Embed an article's title and body; records that are not articles are embedded whole
+JSON_CONTENT_KEY = (
+    'if (.title or .content) then [.title, .content] | map(select(.)) | join("\\n\\n") '
+    "else tojson end"
+)
 # Load CSV market data with Pandas
 
 
@@ -31,8 +46,15 @@ def embed_web_data(
     model: str | None = None,
     chunk_size: int = DEFAULT_CHUNK_SIZE,
     chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
-) -> None:
-    """Load web data and create embeddings using Ollama."""
+    backend: str | None = None,
+) -> IngestStats:
+    """
+    Load web data and create embeddings using Ollama.
+
+    Only the text of the elements matching `webpage_class` (a tag or class
+    name, or any CSS selector) is embedded. Extracted text is cached per URL,
+    so unchanged pages are neither parsed nor embedded again.
+    """
 
     if ollama_host is None:
         ollama_host = getenv("OLLAMA_HOST", DEFAULT_OLLAMA_HOST)
@@ -43,43 +65,56 @@ def embed_web_data(
     if webpage_class is None:
         webpage_class = DEFAULT_WEB_CLASS
 
-    loader = AsyncChromiumLoader(urls)
-    html_docs = loader.load()
-
-    transformer = BeautifulSoupTransformer()
-
-    docs_transformed = transformer.transform_documents(
-        html_docs, tags_to_extract=["article"]
+    loader = WebTextLoader(web_selector(webpage_class), cache=get_web_text_cache())
+    docs = utils.run_sync(load_web_documents, loader, urls)
+
+    return embed_from_documents(
+        docs,
+        chroma_db_path,
+        ollama_host,
+        model,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        backend=backend,
     )
 
-    # Split documents into chunks
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True
-    )
-
-    split_docs = text_splitter.split_documents(docs_transformed)
-
-    # Initialize Ollama embeddings
-    embeddings = OllamaEmbeddings(base_url=ollama_host, model=model)
-
-    if split_docs:
-        # Create Chroma vector database from documents
-        Chroma.from_documents(split_docs, embeddings, persist_directory=chroma_db_path)
-
 
 def embed_json_data(
     file_path: str,
     chroma_db_path: str,
     ollama_host: str | None = None,
     model: str | None = None,
-) -> None:
+    batch_size: int | None = None,
+    workers: int | None = None,
+    progress: Callable[[IngestStats], None] | None = None,
+    backend: str | None = None,
+) -> IngestStats:
     """Load JSON data and create embeddings using Ollama."""
 
-    # FIXME: add jq schema to parse JSON
-    loader = JSONLoader(file_path, jq_schema=".entries[]", text_content=False)
-    docs = loader.load()
+    # Only the title and body are embedded; the other article fields become
+    # metadata that queries can filter on. Keeping the scrape timestamp out of
+    # the content lets re-scraped but unchanged articles hash to the same value.
+    from langchain_community.document_loaders import JSONLoader
+
+    loader = JSONLoader(
+        file_path,
+        jq_schema=".entries[]",
+        content_key=JSON_CONTENT_KEY,
+        is_content_key_jq_parsable=True,
+        text_content=False,
+        metadata_func=_json_metadata,
+    )
 
-    embed_from_documents(docs, chroma_db_path, ollama_host, model)
+    return embed_from_documents(
+        loader.lazy_load(),
+        chroma_db_path,
+        ollama_host,
+        model,
+        batch_size=batch_size,
+        workers=workers,
+        progress=progress,
+        backend=backend,
+    )
 
 
 def embed_csv_data(
@@ -87,22 +122,49 @@ def embed_csv_data(
     chroma_db_path: str,
     ollama_host: str | None = None,
     model: str | None = None,
-) -> None:
+    batch_size: int | None = None,
+    workers: int | None = None,
+    progress: Callable[[IngestStats], None] | None = None,
+    backend: str | None = None,
+) -> IngestStats:
     """Load CSV data and create embeddings using Ollama."""
 
+    # Rows are read lazily, so the file never has to fit in memory
+    from langchain_community.document_loaders import CSVLoader
+
     loader = CSVLoader(file_path)
-    docs = loader.load()
 
-    embed_from_documents(docs, chroma_db_path, ollama_host, model)
+    return embed_from_documents(
+        loader.lazy_load(),
+        chroma_db_path,
+        ollama_host,
+        model,
+        batch_size=batch_size,
+        workers=workers,
+        progress=progress,
+        backend=backend,
+    )
 
 
 def embed_from_documents(
-    docs: list[Document],
+    docs: Iterable[Document],
     chroma_db_path: str,
     ollama_host: str | None = None,
     model: str | None = None,
-) -> None:
-    """Embed documents and store them in the Chroma database."""
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+    batch_size: int | None = None,
+    workers: int | None = None,
+    progress: Callable[[IngestStats], None] | None = None,
+    backend: str | None = None,
+) -> IngestStats:
+    """
+    Embed documents and store them in the vector store at `chroma_db_path`.
+
+    Documents are consumed lazily and streamed through the batched ingest
+    pipeline; only chunks that are new or changed are embedded. New collections
+    use `backend`, or the VECTOR_BACKEND env var, defaulting to Chroma.
+    """
     if ollama_host is None:
         ollama_host = getenv("OLLAMA_HOST", DEFAULT_OLLAMA_HOST)
 
@@ -110,10 +172,24 @@ def embed_from_documents(
         model = getenv("EMBED_MODEL", DEFAULT_EMBEDDING_MODEL)
 
     # Initialize Ollama embeddings
-    embeddings = OllamaEmbeddings(base_url=ollama_host, model=model)
+    embeddings = get_embeddings(ollama_host, model)
+
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True
+    )
 
-    # Create Chroma vector database from documents
-    Chroma.from_documents(docs, embeddings, persist_directory=chroma_db_path)
+    return ingest_documents(
+        docs,
+        chroma_db_path,
+        embeddings,
+        splitter=text_splitter,
+        batch_size=batch_size,
+        workers=workers,
+        progress=progress,
+        backend=backend,
+    )
 
 
 def embed_from_texts(
@@ -121,20 +197,46 @@ def embed_from_texts(
     chroma_db_path: str,
     ollama_host: str | None = None,
     model: str | None = None,
-) -> None:
+    backend: str | None = None,
+) -> IngestStats:
     """Load text data and create embeddings using Ollama."""
 
-    if ollama_host is None:
-        ollama_host = getenv("OLLAMA_HOST", DEFAULT_OLLAMA_HOST)
-
-    if model is None:
-        model = getenv("EMBED_MODEL", DEFAULT_EMBEDDING_MODEL)
+    docs = (Document(page_content=text) for text in data)
+    return embed_from_documents(
+        docs, chroma_db_path, ollama_host, model, backend=backend
+    )
 
-    # Initialize Ollama embeddings
-    embeddings = OllamaEmbeddings(base_url=ollama_host, model=model)
 
-    # Create Chroma vector database from documents
-    Chroma.from_texts(data, embeddings, persist_directory=chroma_db_path)
+def _json_metadata(record: dict, metadata: dict) -> dict:
+    """
+    Extract filterable article fields into Chroma metadata.
+
+    The URL keys the document; ticker, topic and source allow exact filters and
+    `date_ts`, the estimated publish time in epoch seconds, allows date ranges.
+    """
+    if not isinstance(record, dict):
+        return metadata
+    for key in ("url", "title", "topic", "source", "published_at", "system"):
+        if record.get(key):
+            metadata[key] = record[key]
+    if record.get("ticker"):
+        metadata["ticker"] = record["ticker"].upper()
+    try:
+        scraped_at = datetime.fromisoformat(record["date"])
+    except (KeyError, TypeError, ValueError):
+        return metadata
+    published = published_datetime(record.get("published_at"), scraped_at)
+    metadata["date"] = published.strftime("%Y-%m-%d")
+    metadata["date_ts"] = published.timestamp()
+    return metadata
+
+
+def article_document(article: Article) -> Document:
+    """Turn a scraped article into the document `embed_json_data` would load."""
+    text = "\n\n".join(part for part in (article.title, article.content) if part)
+    return Document(
+        page_content=text, metadata=_json_metadata(article.model_dump(mode="json"), {})
+    )
 
 
 def run_rag_chain(
@@ -147,45 +249,33 @@ def run_rag_chain(
     system_prompt: str | None = None,
 ) -> tuple:
     """Run the RAG chain with the given query and return the answer and source documents."""
-    if ollama_host is None:
-        ollama_host = getenv("OLLAMA_HOST", DEFAULT_OLLAMA_HOST)
-
-    if embedding_model is None:
-        embedding_model = getenv("EMBED_MODEL", DEFAULT_EMBEDDING_MODEL)
-
-    if llm_model is None:
-        llm_model = DEFAULT_RAG_MODEL
-
-    # Initialize Chroma vector database
-    db = Chroma(
-        persist_directory=db_path,
-        embedding_function=OllamaEmbeddings(
-            base_url=ollama_host, model=embedding_model
-        ),
+    # Imported here because the engine module builds on this one
+    from lc_app.core.engine import get_engine
+
+    engine = get_engine(
+        db_path,
+        ollama_host=ollama_host,
+        embedding_model=embedding_model,
+        llm_model=llm_model,
     )
+    return engine.query(query, search_kwargs=search_kwargs)
 
-    llm = OllamaLLM(
-        base_url=ollama_host, model=llm_model
-    )  # Updated to use langchain-ollama package
 
-    # Create RAG chain
-    rag_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        retriever=db.as_retriever(search_kwargs=search_kwargs),
-        return_source_documents=True,
-    )
+def _langfuse_handler(
+    public_key: str, secret_key: str, host: str
+) -> "CallbackHandler":
+    from langfuse.callback import CallbackHandler
 
-    langfuse_callback = get_langfuse_callback_handler()
-    config = {}
-    if langfuse_callback is not None:
-        config["callbacks"] = [langfuse_callback]
-    """Run the RAG chain with the given query."""
-    response = rag_chain.invoke(query, config=config)
-    return response["result"], response["source_documents"]
+    return CallbackHandler(public_key=public_key, secret_key=secret_key, host=host)
 
 
-def get_langfuse_callback_handler() -> CallbackHandler | None:
-    """Get the Langfuse callback handler for tracking RAG chain runs."""
+def get_langfuse_callback_handler() -> "Tracer | None":
+    """
+    Get the callback handler for tracking RAG chain runs in Langfuse.
+
+    The handler is the process-wide tracer, which uploads runs in batches from
+    a background thread; None if Langfuse keys are not configured.
+    """
     langfuse_host = getenv("LANGFUSE_HOST", DEFAULT_LANFUSE_HOST)
 
     public_key = getenv("LANGFUSE_PUBLIC_KEY")
@@ -193,8 +283,8 @@ def get_langfuse_callback_handler() -> CallbackHandler | None:
     if public_key is None or secret_key is None:
         return None
 
-    return CallbackHandler(
-        public_key=public_key,
-        secret_key=secret_key,
-        host=langfuse_host,
+    from lc_app.core.tracing import get_tracer
+
+    return get_tracer(
+        lambda: _langfuse_handler(public_key, secret_key, langfuse_host)
     )
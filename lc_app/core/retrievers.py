@@ -0,0 +1,313 @@
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from os import getenv
+from typing import Any
+
+import numpy as np
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables.config import run_in_executor
+from langchain_core.vectorstores import VectorStore
+from pydantic import ConfigDict
+
+from lc_app.core.keyword_index import KeywordIndex, tokenize
+from lc_app.core.metrics import record
+
+DEFAULT_RRF_K = 60  # Reciprocal rank fusion damping constant
+DEFAULT_FETCH_MULTIPLIER = 4  # Candidates fetched from each index per result
+DEFAULT_CONTEXT_TOKEN_BUDGET = 768  # Estimated tokens of context sent to the LLM
+DEFAULT_MMR_LAMBDA = 0.7  # MMR trade-off, 1 is pure relevance and 0 pure diversity
+DEFAULT_DUPLICATE_THRESHOLD = 0.95  # Cosine similarity at which chunks are duplicates
+CHARS_PER_TOKEN = 4  # Rough characters per token, for budgets without a tokenizer
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="retrieval")
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[str]], rrf_k: int = DEFAULT_RRF_K
+) -> list[tuple[str, float]]:
+    """Fuse several ranked ID lists into one, best first."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, id_ in enumerate(ranking):
+            scores[id_] = scores.get(id_, 0.0) + 1.0 / (rrf_k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retrieve by dense vectors and BM25 keywords at once and fuse the rankings.
+
+    Both searches run concurrently and over-fetch `fetch_k` candidates; the
+    rankings are merged with reciprocal rank fusion and the top `k` documents
+    are returned. Exact tokens such as tickers, CUSIPs and numbers that dense
+    embeddings blur are picked up by the keyword side.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vectorstore: VectorStore
+    keyword_index: KeywordIndex
+    search_kwargs: dict[str, Any] = {}
+    rrf_k: int = DEFAULT_RRF_K
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        k = self.search_kwargs.get("k", 4)
+        fetch_k = self.search_kwargs.get("fetch_k", k * DEFAULT_FETCH_MULTIPLIER)
+        dense_kwargs = {
+            key: value
+            for key, value in self.search_kwargs.items()
+            if key not in ("k", "fetch_k")
+        }
+
+        where = self.search_kwargs.get("filter")
+        dense_future = _executor.submit(
+            self.vectorstore.similarity_search, query, k=fetch_k, **dense_kwargs
+        )
+        # The keyword index has no metadata, so filtered queries over-fetch and
+        # drop the hits that do not match the filter
+        keyword_future = _executor.submit(
+            self.keyword_index.search,
+            query,
+            fetch_k * DEFAULT_FETCH_MULTIPLIER if where else fetch_k,
+        )
+        dense_docs = dense_future.result()
+        keyword_ids = [id_ for id_, _ in keyword_future.result()]
+
+        docs = {doc.id: doc for doc in dense_docs}
+        if where and keyword_ids:
+            docs.update(self._get(keyword_ids, where))
+            keyword_ids = [id_ for id_ in keyword_ids if id_ in docs][:fetch_k]
+        fused = reciprocal_rank_fusion(
+            [[doc.id for doc in dense_docs], keyword_ids], self.rrf_k
+        )
+        top_ids = [id_ for id_, _ in fused[:k]]
+        missing = [id_ for id_ in top_ids if id_ not in docs]
+        if missing:
+            # Keyword-only hits still need their text and metadata
+            docs.update(self._get(missing))
+        return [docs[id_] for id_ in top_ids if id_ in docs]
+
+    def _get(self, ids: list[str], where: dict | None = None) -> dict[str, Document]:
+        """Load stored documents by ID, keeping those that match `where`."""
+        found = self.vectorstore.get(
+            ids=ids, where=where, include=["documents", "metadatas"]
+        )
+        return {
+            id_: Document(page_content=text, metadata=metadata or {}, id=id_)
+            for id_, text, metadata in zip(
+                found["ids"], found["documents"], found["metadatas"]
+            )
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the tokens of a text from its length."""
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def compression_enabled() -> bool:
+    """Whether retrieved context is re-ranked and trimmed before prompting."""
+    return getenv("COMPRESSION", "1").lower() not in ("0", "false", "no", "off")
+
+
+@dataclass
+class CompressionReport:
+    """What compressing one query's context did to its prompt size."""
+
+    candidates: int
+    duplicates: int
+    kept: int
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        # Negative when the compressed context came out larger than the baseline
+        return self.tokens_before - self.tokens_after
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "tokens_saved": self.tokens_saved}
+
+
+def compression_report(docs: list[Document]) -> dict | None:
+    """Get the compression report attached to a query's documents, if any."""
+    return docs[0].metadata.get("compression") if docs else None
+
+
+def _mmr(
+    query_similarity: np.ndarray, similarity: np.ndarray, k: int, lambda_mult: float
+) -> list[int]:
+    """Pick `k` indices by maximal marginal relevance, most relevant first."""
+    selected = [int(np.argmax(query_similarity))]
+    while len(selected) < min(k, len(query_similarity)):
+        redundancy = similarity[:, selected].max(axis=1)
+        scores = lambda_mult * query_similarity - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        selected.append(int(np.argmax(scores)))
+    return selected
+
+
+class CompressingRetriever(BaseRetriever):
+    """
+    Shrink retrieved context before it is pasted into the prompt.
+
+    The base retriever over-fetches candidates, whose stored vectors are loaded
+    from `vectorstore` (or embedded again without one), near-duplicates dropped
+    and `k` picked by maximal marginal relevance. Each pick is then trimmed to
+    the sentences that share the most informative terms with the query, with
+    sentences repeated by overlapping chunks kept once, until the token budget
+    is spent. Every returned document carries a report of the tokens saved
+    against pasting the base retriever's top `k` whole.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    base_retriever: BaseRetriever
+    embeddings: Embeddings
+    vectorstore: VectorStore | None = None
+    k: int = 4
+    token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET
+    mmr_lambda: float = DEFAULT_MMR_LAMBDA
+    duplicate_threshold: float = DEFAULT_DUPLICATE_THRESHOLD
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        candidates = self.base_retriever.invoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
+        return self._compress(query, candidates)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        candidates = await self.base_retriever.ainvoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
+        return await run_in_executor(None, self._compress, query, candidates)
+
+    def _rerank(
+        self, query: str, candidates: list[Document]
+    ) -> tuple[list[Document], int]:
+        """Drop near-duplicates and pick `k` candidates by MMR."""
+        vectors = self._vectors(candidates)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        query_vector = np.array(self.embeddings.embed_query(query), dtype=np.float32)
+        query_vector /= np.linalg.norm(query_vector) + 1e-12
+        similarity = vectors @ vectors.T
+
+        unique: list[int] = []
+        for i in range(len(candidates)):
+            if all(similarity[i, j] < self.duplicate_threshold for j in unique):
+                unique.append(i)
+        picked = _mmr(
+            vectors[unique] @ query_vector,
+            similarity[np.ix_(unique, unique)],
+            self.k,
+            self.mmr_lambda,
+        )
+        return [candidates[unique[i]] for i in picked], len(candidates) - len(unique)
+
+    def _vectors(self, candidates: list[Document]) -> np.ndarray:
+        """Get the candidates' stored vectors, embedding any the store lacks."""
+        stored: dict[str, Any] = {}
+        ids = [doc.id for doc in candidates if doc.id]
+        if self.vectorstore is not None and ids:
+            found = self.vectorstore.get(ids=ids, include=["embeddings"])
+            stored = dict(zip(found["ids"], found["embeddings"]))
+        vectors = [stored.get(doc.id) for doc in candidates]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            embedded = self.embeddings.embed_documents(
+                [candidates[i].page_content for i in missing]
+            )
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+        return np.array(vectors, dtype=np.float32)
+
+    def _trim(self, query: str, docs: list[Document]) -> list[Document]:
+        """Keep the query-relevant sentences of each document within the budget."""
+        sentences = []
+        seen = set()
+        for rank, doc in enumerate(docs):
+            for position, text in enumerate(_SENTENCE_END.split(doc.page_content)):
+                text = text.strip()
+                key = " ".join(text.lower().split())
+                if text and key not in seen:
+                    seen.add(key)
+                    sentences.append((rank, position, text, set(tokenize(text))))
+
+        # Terms found in fewer sentences say more about relevance
+        terms = set(tokenize(query))
+        frequency = {
+            term: sum(term in tokens for *_, tokens in sentences) for term in terms
+        }
+        weight = {
+            term: math.log(1 + len(sentences) / count)
+            for term, count in frequency.items()
+            if count
+        }
+        scored = sorted(
+            (-sum(weight.get(t, 0.0) for t in tokens & terms), rank, position, text)
+            for rank, position, text, tokens in sentences
+        )
+
+        chosen: dict[int, list[tuple[int, str]]] = {}
+        spent = 0
+        for _, rank, position, text in scored:
+            cost = estimate_tokens(text)
+            if spent + cost <= self.token_budget:
+                chosen.setdefault(rank, []).append((position, text))
+                spent += cost
+        if not chosen and scored:
+            # A single sentence larger than the whole budget is cut to fit
+            _, rank, position, text = scored[0]
+            chosen[rank] = [(position, text[: self.token_budget * CHARS_PER_TOKEN])]
+
+        trimmed = []
+        for rank, doc in enumerate(docs):
+            if rank in chosen:
+                text = " ".join(text for _, text in sorted(chosen[rank]))
+                trimmed.append(
+                    Document(page_content=text, metadata=dict(doc.metadata), id=doc.id)
+                )
+        return trimmed
+
+    def _compress(self, query: str, candidates: list[Document]) -> list[Document]:
+        if not candidates:
+            return []
+        started_at = time.perf_counter()
+        picked, duplicates = self._rerank(query, candidates)
+        docs = self._trim(query, picked)
+        report = CompressionReport(
+            candidates=len(candidates),
+            duplicates=duplicates,
+            kept=len(docs),
+            tokens_before=sum(
+                estimate_tokens(doc.page_content) for doc in candidates[: self.k]
+            ),
+            tokens_after=sum(estimate_tokens(doc.page_content) for doc in docs),
+        )
+        summary = report.as_dict()
+        for doc in docs:
+            doc.metadata["compression"] = summary
+        record(
+            "compress",
+            time.perf_counter() - started_at,
+            items=len(candidates),
+            tokens=report.tokens_saved,
+        )
+        return docs
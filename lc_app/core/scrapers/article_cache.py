@@ -0,0 +1,167 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from hashlib import sha256
+from os import getenv, makedirs, path
+
+DEFAULT_ARTICLE_CACHE_PATH = path.join(
+    path.expanduser("~"), ".cache", "lc_app", "articles.sqlite3"
+)  # Article bodies scraped from detail pages, keyed by URL
+DEFAULT_ARTICLE_CACHE_TTL = 86400.0  # Seconds before a cached article is scraped again
+DEFAULT_ARTICLE_CACHE_MAX_AGE = 30 * 86400.0  # Seconds before an entry is evicted
+DEFAULT_ARTICLE_CACHE_SIZE = 50000  # Articles kept, least recently seen evicted first
+LOOKUP_BATCH = 500  # URLs looked up per query, below SQLite's parameter limit
+
+
+@dataclass
+class CachedArticle:
+    title: str
+    content: str
+    content_hash: str
+    fetched_at: float
+
+
+class ArticleCache:
+    """
+    A SQLite store of article bodies scraped from detail pages, keyed by URL.
+
+    Entries younger than `ttl` seconds are served without rendering the page
+    again. A re-scraped article whose body hashes the same only has its fetch
+    time renewed. `evict` drops entries not seen for `max_age` seconds and then
+    the least recently seen ones beyond `max_entries`.
+    """
+
+    def __init__(self, db_path: str, ttl: float, max_age: float, max_entries: int):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = path.dirname(db_path)
+        if directory:
+            makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                seen_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS articles_seen_at ON articles (seen_at)"
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> CachedArticle | None:
+        """Get a cached article that is still within its TTL."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, content, content_hash, fetched_at FROM articles "
+                "WHERE url = ? AND fetched_at >= ?",
+                (url, now - self.ttl),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE articles SET seen_at = ? WHERE url = ?", (now, url)
+                )
+                self._conn.commit()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedArticle(*row)
+
+    def get_many(self, urls: list[str]) -> dict[str, CachedArticle]:
+        """Get the cached articles of several URLs at once, by URL."""
+        now = time.time()
+        found: dict[str, CachedArticle] = {}
+        with self._lock:
+            for start in range(0, len(urls), LOOKUP_BATCH):
+                batch = urls[start : start + LOOKUP_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    "SELECT url, title, content, content_hash, fetched_at "
+                    f"FROM articles WHERE url IN ({marks}) AND fetched_at >= ?",
+                    (*batch, now - self.ttl),
+                ).fetchall()
+                for url, *row in rows:
+                    found[url] = CachedArticle(*row)
+            if found:
+                self._conn.executemany(
+                    "UPDATE articles SET seen_at = ? WHERE url = ?",
+                    [(now, url) for url in found],
+                )
+                self._conn.commit()
+        self.hits += len(found)
+        self.misses += len(set(urls)) - len(found)
+        return found
+
+    def put(self, url: str, title: str, content: str) -> bool:
+        """Cache a scraped article; returns whether its body changed."""
+        digest = sha256(content.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM articles WHERE url = ?", (url,)
+            ).fetchone()
+            if row is not None and row[0] == digest:
+                self._conn.execute(
+                    "UPDATE articles SET title = ?, fetched_at = ?, seen_at = ? "
+                    "WHERE url = ?",
+                    (title, now, now, url),
+                )
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO articles "
+                    "(url, title, content, content_hash, fetched_at, seen_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, title, content, digest, now, now),
+                )
+            self._conn.commit()
+        return row is None or row[0] != digest
+
+    def evict(self) -> int:
+        """Drop stale and excess entries; returns how many were dropped."""
+        with self._lock:
+            dropped = self._conn.execute(
+                "DELETE FROM articles WHERE seen_at < ?",
+                (time.time() - self.max_age,),
+            ).rowcount
+            dropped += self._conn.execute(
+                "DELETE FROM articles WHERE url NOT IN "
+                "(SELECT url FROM articles ORDER BY seen_at DESC LIMIT ?)",
+                (self.max_entries,),
+            ).rowcount
+            self._conn.commit()
+        return dropped
+
+
+_article_caches: dict[str, ArticleCache] = {}
+
+
+def get_article_cache() -> ArticleCache | None:
+    """Get the process-wide article cache, or None if it is disabled."""
+    if getenv("ARTICLE_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    db_path = getenv("ARTICLE_CACHE_PATH", DEFAULT_ARTICLE_CACHE_PATH)
+    if db_path not in _article_caches:
+        _article_caches[db_path] = ArticleCache(
+            db_path,
+            ttl=float(getenv("ARTICLE_CACHE_TTL", DEFAULT_ARTICLE_CACHE_TTL)),
+            max_age=float(
+                getenv("ARTICLE_CACHE_MAX_AGE", DEFAULT_ARTICLE_CACHE_MAX_AGE)
+            ),
+            max_entries=int(getenv("ARTICLE_CACHE_SIZE", DEFAULT_ARTICLE_CACHE_SIZE)),
+        )
+    return _article_caches[db_path]
@@ -0,0 +1,247 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from os import getenv
+from typing import AsyncIterator
+
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Error as PlaywrightError,
+    Page,
+    Playwright,
+    async_playwright,
+)
+
+DEFAULT_POOL_BROWSERS = 1  # Number of Chromium processes kept alive
+DEFAULT_POOL_PAGES = 4  # Number of concurrent pages per browser
+DEFAULT_PAGE_MAX_USES = 25  # Recycle a page after this many navigations
+DEFAULT_POOL_IDLE_TIMEOUT = 60.0  # Seconds without work before the pool shuts down
+
+
+class _BrowserSlot:
+    """A single browser process with its context and idle pages."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.browser: Browser | None = None
+        self.context: BrowserContext | None = None
+        self.idle_pages: list[Page] = []
+        self.page_uses: dict[Page, int] = {}
+        self.active = 0
+
+    @property
+    def healthy(self) -> bool:
+        return (
+            self.browser is not None
+            and self.context is not None
+            and self.browser.is_connected()
+        )
+
+    async def close(self) -> None:
+        browser = self.browser
+        self.browser = None
+        self.context = None
+        self.idle_pages.clear()
+        self.page_uses.clear()
+        if browser is not None:
+            try:
+                await browser.close()
+            except PlaywrightError:
+                # The browser may already be gone if it crashed
+                pass
+
+
+class BrowserPool:
+    """
+    A long-lived pool of headless Chromium browsers and pages.
+
+    Browsers are launched lazily on first use and shared by every caller. Pages
+    are handed out through `page()`, returned to the pool afterwards and recycled
+    once they have served `max_page_uses` navigations. Crashed browsers are
+    relaunched on the next acquire, and the whole pool shuts itself down after
+    `idle_timeout` seconds without work. Playwright objects belong to the event
+    loop that created them, so a pool with live browsers refuses to be used
+    from another loop; `get_browser_pool` keeps one pool per loop.
+    """
+
+    def __init__(
+        self,
+        browsers: int = DEFAULT_POOL_BROWSERS,
+        pages_per_browser: int = DEFAULT_POOL_PAGES,
+        max_page_uses: int = DEFAULT_PAGE_MAX_USES,
+        idle_timeout: float | None = DEFAULT_POOL_IDLE_TIMEOUT,
+        headless: bool = True,
+    ):
+        if browsers < 1 or pages_per_browser < 1:
+            raise ValueError("A browser pool needs at least one browser and one page.")
+        self.browsers = browsers
+        self.pages_per_browser = pages_per_browser
+        self.max_page_uses = max_page_uses
+        self.idle_timeout = idle_timeout
+        self.headless = headless
+
+        self._playwright: Playwright | None = None
+        self._slots = [_BrowserSlot(i) for i in range(browsers)]
+        self._semaphore: asyncio.Semaphore | None = None
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._idle_task: asyncio.Task | None = None
+
+    @property
+    def size(self) -> int:
+        """The maximum number of pages that can be in use at once."""
+        return self.browsers * self.pages_per_browser
+
+    @property
+    def live(self) -> bool:
+        """Whether the pool holds a Playwright driver or browsers to close."""
+        return self._playwright is not None or any(
+            slot.browser is not None for slot in self._slots
+        )
+
+    def _bind_loop(self) -> None:
+        """Bind the pool's asyncio primitives to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self.live:
+            # Its browsers can only be closed from the loop that launched them
+            raise RuntimeError(
+                "The browser pool is still open on another event loop; "
+                "close it there first."
+            )
+        self._loop = loop
+        self._playwright = None
+        self._slots = [_BrowserSlot(i) for i in range(self.browsers)]
+        self._semaphore = asyncio.Semaphore(self.size)
+        self._lock = asyncio.Lock()
+        self._idle_task = None
+
+    async def _ensure_browser(self, slot: _BrowserSlot) -> None:
+        """Launch (or relaunch after a crash) the browser backing a slot."""
+        if slot.healthy:
+            return
+        async with self._lock:
+            if slot.healthy:
+                return
+            await slot.close()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            browser = await self._playwright.chromium.launch(headless=self.headless)
+            try:
+                context = await browser.new_context()
+            except BaseException:
+                await browser.close()
+                raise
+            # Publish both together so unlocked callers never see half a slot
+            slot.browser, slot.context = browser, context
+
+    def _pick_slot(self) -> _BrowserSlot:
+        return min(self._slots, key=lambda slot: slot.active)
+
+    async def _acquire(self, slot: _BrowserSlot) -> Page:
+        await self._ensure_browser(slot)
+        while slot.idle_pages:
+            page = slot.idle_pages.pop()
+            if not page.is_closed():
+                return page
+            slot.page_uses.pop(page, None)
+        page = await slot.context.new_page()
+        slot.page_uses[page] = 0
+        return page
+
+    async def _release(self, slot: _BrowserSlot, page: Page, broken: bool) -> None:
+        uses = slot.page_uses.get(page, 0) + 1
+        slot.page_uses[page] = uses
+        if broken or uses >= self.max_page_uses or not slot.healthy:
+            slot.page_uses.pop(page, None)
+            try:
+                await page.close()
+            except PlaywrightError:
+                pass
+            return
+        slot.idle_pages.append(page)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Borrow a page from the pool for the duration of the context."""
+        self._bind_loop()
+        self._cancel_idle_shutdown()
+        async with self._semaphore:
+            slot = self._pick_slot()
+            slot.active += 1
+            page = None
+            broken = False
+            try:
+                page = await self._acquire(slot)
+                yield page
+            except BaseException:
+                # Do not hand a page in an unknown state, e.g. mid-navigation
+                # after a cancellation or timeout, to the next caller
+                broken = True
+                raise
+            finally:
+                slot.active -= 1
+                if page is not None:
+                    await self._release(slot, page, broken)
+                self._schedule_idle_shutdown()
+
+    def _cancel_idle_shutdown(self) -> None:
+        if self._idle_task is not None and not self._idle_task.done():
+            self._idle_task.cancel()
+        self._idle_task = None
+
+    def _schedule_idle_shutdown(self) -> None:
+        if self.idle_timeout is None or any(slot.active for slot in self._slots):
+            return
+        self._cancel_idle_shutdown()
+        self._idle_task = asyncio.get_running_loop().create_task(
+            self._shutdown_when_idle(self.idle_timeout)
+        )
+
+    async def _shutdown_when_idle(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        if not any(slot.active for slot in self._slots):
+            await self._close_browsers()
+
+    async def _close_browsers(self) -> None:
+        for slot in self._slots:
+            await slot.close()
+        if self._playwright is not None:
+            playwright = self._playwright
+            self._playwright = None
+            await playwright.stop()
+
+    async def close(self) -> None:
+        """Close every browser and stop Playwright."""
+        if self._loop is None or self._loop is not asyncio.get_running_loop():
+            return
+        self._cancel_idle_shutdown()
+        await self._close_browsers()
+
+
+# One pool per event loop, forgotten with the loop
+_browser_pools: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the browser pool shared by all news scrapers on the running loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _browser_pools:
+        _browser_pools[loop] = BrowserPool(
+            browsers=int(getenv("SCRAPER_BROWSERS", DEFAULT_POOL_BROWSERS)),
+            pages_per_browser=int(getenv("SCRAPER_PAGES", DEFAULT_POOL_PAGES)),
+            max_page_uses=int(getenv("SCRAPER_PAGE_MAX_USES", DEFAULT_PAGE_MAX_USES)),
+            idle_timeout=float(
+                getenv("SCRAPER_IDLE_TIMEOUT", DEFAULT_POOL_IDLE_TIMEOUT)
+            ),
+        )
+    return _browser_pools[loop]
+
+
+async def close_browser_pool() -> None:
+    """Shut down the running loop's browser pool if it was started."""
+    pool = _browser_pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
@@ -0,0 +1,76 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+from bs4 import BeautifulSoup
+
+DEFAULT_EXTRACT_WORKERS = os.cpu_count() or 1  # Processes parsing HTML at once
+DEFAULT_EXTRACT_POOL_MIN = 8  # Pages needed before parsing moves to a process pool
+
+HTML_PARSER = "lxml"  # Several times faster than the standard library's parser
+
+# This module is all that pool workers import, so it must stay free of the
+# scraper, browser and LangChain modules
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def extract_text(html: str, selector: str) -> str:
+    """Extract the text of the elements matching `selector`, one block per element."""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    elements = soup.select(selector)
+    # Nested matches (an .article inside an <article>) would repeat their text
+    matched = {id(element) for element in elements}
+    outermost = [
+        element
+        for element in elements
+        if not any(id(parent) in matched for parent in element.parents)
+    ]
+    return "\n\n".join(
+        text
+        for text in (element.get_text("\n", strip=True) for element in outermost)
+        if text
+    )
+
+
+def _extract(args: tuple[str, str]) -> str:
+    return extract_text(*args)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Get the process pool shared by every extraction, starting it on first use."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                # Work already handed to the smaller pool still finishes
+                _pool.shutdown(wait=False)
+            # Spawned workers are safe to start from threaded callers like the API
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=get_context("spawn")
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a broken pool so the next extraction starts a new one."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is pool:
+            _pool, _pool_workers = None, 0
+
+
+def extract_many(jobs: list[tuple[str, str]], workers: int) -> list[str]:
+    """Extract the text of (html, selector) pairs, in the process pool if worth it."""
+    if len(jobs) < DEFAULT_EXTRACT_POOL_MIN or workers <= 1:
+        return [_extract(job) for job in jobs]
+    pool = _get_pool(workers)
+    try:
+        return list(pool.map(_extract, jobs, chunksize=4))
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        raise
@@ -0,0 +1,133 @@
+import asyncio
+from importlib.util import find_spec
+from os import getenv
+from urllib.parse import urlsplit
+
+import httpx
+from bs4 import BeautifulSoup
+
+DEFAULT_FETCH_MODE = "auto"  # One of "auto", "http" or "browser"
+DEFAULT_HTTP_TIMEOUT = 15.0  # Seconds for a single static fetch
+DEFAULT_HTTP_CONNECTIONS = 20  # Connections kept in the shared client pool
+DEFAULT_STATIC_MISS_LIMIT = 3  # Static misses before a host/selector goes to the browser
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+FETCH_MODES = ("auto", "http", "browser")
+
+
+class HttpFetcher:
+    """
+    Fetch pages as static HTML with a shared `httpx.AsyncClient`.
+
+    The client keeps connections alive between requests, negotiates gzip/brotli
+    and uses HTTP/2 when the `h2` package is installed. The fetcher also keeps
+    track of which (host, selector) pairs never show up in static HTML so that
+    callers can skip straight to a browser render for them.
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_HTTP_TIMEOUT,
+        max_connections: int = DEFAULT_HTTP_CONNECTIONS,
+        miss_limit: int = DEFAULT_STATIC_MISS_LIMIT,
+    ):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.miss_limit = miss_limit
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._hits: dict[tuple[str, str], int] = {}
+        self._misses: dict[tuple[str, str], int] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # httpx clients are bound to the loop that first used them
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                http2=find_spec("h2") is not None,
+                follow_redirects=True,
+                timeout=self.timeout,
+                headers={"User-Agent": DEFAULT_USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def fetch(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> httpx.Response | None:
+        """
+        Fetch a URL, returning None on transport errors or non-2xx replies.
+
+        A 304 reply to a conditional request (e.g. with If-None-Match) is
+        returned as is, so callers can reuse what they cached.
+        """
+        try:
+            response = await self._get_client().get(url, headers=headers)
+        except httpx.HTTPError as e:
+            print(f"Error: static fetch of {url} failed: {e!r}")
+            return None
+        if response.status_code == 304 and headers:
+            return response
+        if not response.is_success:
+            return None
+        return response
+
+    def should_try(self, url: str, wait_for: str) -> bool:
+        """Whether a static fetch is still worth trying for this host/selector."""
+        key = (urlsplit(url).netloc, wait_for)
+        return self._hits.get(key, 0) > 0 or self._misses.get(key, 0) < self.miss_limit
+
+    async def fetch_html(self, url: str, wait_for: str) -> str | None:
+        """Fetch static HTML, returning None if `wait_for` is not in the page."""
+        response = await self.fetch(url)
+        key = (urlsplit(url).netloc, wait_for)
+        if response is not None:
+            html = response.text
+            if BeautifulSoup(html, "html.parser").select_one(wait_for) is not None:
+                self._hits[key] = self._hits.get(key, 0) + 1
+                return html
+        self._misses[key] = self._misses.get(key, 0) + 1
+        return None
+
+    async def close(self) -> None:
+        """Close the underlying client."""
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+
+_http_fetcher: HttpFetcher | None = None
+
+
+def get_fetch_mode() -> str:
+    """Get the configured fetch mode for scrapers."""
+    mode = getenv("SCRAPER_FETCH_MODE", DEFAULT_FETCH_MODE).lower()
+    if mode not in FETCH_MODES:
+        raise ValueError(f"Unsupported SCRAPER_FETCH_MODE {mode!r}.")
+    return mode
+
+
+def get_http_fetcher() -> HttpFetcher:
+    """Get the process-wide static HTML fetcher."""
+    global _http_fetcher
+    if _http_fetcher is None:
+        _http_fetcher = HttpFetcher(
+            timeout=float(getenv("SCRAPER_HTTP_TIMEOUT", DEFAULT_HTTP_TIMEOUT)),
+            max_connections=int(
+                getenv("SCRAPER_HTTP_CONNECTIONS", DEFAULT_HTTP_CONNECTIONS)
+            ),
+        )
+    return _http_fetcher
+
+
+async def close_http_fetcher() -> None:
+    """Close the shared static HTML fetcher if it was started."""
+    if _http_fetcher is not None:
+        await _http_fetcher.close()
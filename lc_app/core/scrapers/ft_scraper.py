@@ -13,7 +13,7 @@ class FTScraper(NewsScraper):
         self.base_url = "https://www.ft.com"
         self.search_url = f"{self.base_url}/search?q={ticker}"
 
-    async def scrape(self) -> list[Article]:
+    async def scrape_news(self) -> list[Article]:
         """
         Scrape news articles using playwright and return a list of dictionaries with the article title, url, and content.
         """
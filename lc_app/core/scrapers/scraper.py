@@ -1,23 +1,50 @@
 import asyncio
+import sys
 from abc import ABC, abstractmethod
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from contextlib import aclosing
+from os import getenv
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+from lc_app.core.metrics import timed
+from lc_app.core.scrapers.article_cache import ArticleCache, CachedArticle
+from lc_app.core.scrapers.fetchers import (
+    close_http_fetcher,
+    get_fetch_mode,
+    get_http_fetcher,
+)
 from lc_app.core.scrapers.models import Article
+from lc_app.core.scrapers.throttle import HostRateLimiter
 
+T = TypeVar("T")
 
-class NewsScraper(ABC):
-    """A base class for news scrapers."""
+DEFAULT_SCRAPE_CONCURRENCY = 8  # Detail pages fetched at once per scraper
+DEFAULT_HOST_CONCURRENCY = 4  # Concurrent requests against a single host
+DEFAULT_HOST_INTERVAL = 0.25  # Seconds between request starts on a single host
+DEFAULT_PAGE_TIMEOUT = 30.0  # Seconds before a single page fetch is abandoned
 
-    @abstractmethod
-    async def scrape_news(self) -> list[Article]:
-        """Scrape news articles and return a list of dictionaries with the article title, url, and content."""
-        raise NotImplementedError("Subclasses must implement this method.")
 
+class WebScraper:
+    """Fetch pages with the shared HTTP client, browser pool and host limits."""
+
+    max_concurrency: int = int(
+        getenv("SCRAPER_CONCURRENCY", DEFAULT_SCRAPE_CONCURRENCY)
+    )
+    host_concurrency: int = int(
+        getenv("SCRAPER_HOST_CONCURRENCY", DEFAULT_HOST_CONCURRENCY)
+    )
+    host_interval: float = float(getenv("SCRAPER_HOST_INTERVAL", DEFAULT_HOST_INTERVAL))
+    page_timeout: float = float(getenv("SCRAPER_PAGE_TIMEOUT", DEFAULT_PAGE_TIMEOUT))
+
+    @timed("scrape")
     async def scrape_webpage(self, url: str, wait_for: str, error_on_timeout: bool = True) -> str:
         """
-        Scrape the content of a webpage using Playwright.
+        Scrape the content of a webpage.
 
-        This asynchronous method navigates to the specified URL, waits for a specific
-        element to load, and retrieves the page's HTML content.
+        The page is first fetched as static HTML through the shared httpx client.
+        If the element matching `wait_for` is not present in the static HTML
+        (e.g. because it is rendered client-side), the URL is escalated to a
+        Playwright render that waits for the element to load. The strategy is
+        controlled by the SCRAPER_FETCH_MODE environment variable: "auto"
+        (default), "http" (never render) or "browser" (always render).
 
         Args:
             url (str): The URL of the webpage to scrape.
@@ -29,14 +56,37 @@ class NewsScraper(ABC):
         Raises:
             playwright._impl._api_types.Error: If there is an issue with Playwright operations,
             such as navigation or selector waiting.
+        """
+        mode = get_fetch_mode()
+        if mode != "browser":
+            fetcher = get_http_fetcher()
+            if mode == "http" or fetcher.should_try(url, wait_for):
+                content = await fetcher.fetch_html(url, wait_for)
+                if content is not None:
+                    return content
+            if mode == "http":
+                message = f"Selector {wait_for!r} not found in static HTML of {url}"
+                if error_on_timeout:
+                    from playwright.async_api import TimeoutError
+
+                    raise TimeoutError(message)
+                print(f"Error: {message}")
+                return None
+        return await self.render_webpage(url, wait_for, error_on_timeout)
+
+    @timed("render")
+    async def render_webpage(self, url: str, wait_for: str, error_on_timeout: bool = True) -> str:
+        """
+        Render a webpage with Playwright and return its HTML content.
 
-        Note:
-            This method uses a headless Chromium browser for scraping.
+        Pages are borrowed from the shared headless Chromium pool, so no
+        browser is launched per URL.
         """
-        """scrape webpage using playwright and return the content."""
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+        from lc_app.core.scrapers.browser_pool import get_browser_pool
+
+        async with get_browser_pool().page() as page:
             try:
                 await page.goto(url)
                 await page.wait_for_selector(wait_for, timeout=10000)
@@ -47,8 +97,119 @@ class NewsScraper(ABC):
                 else:
                     print(f"Error: {e}")
                     content = None
-            finally:
-                # Ensure the page is closed even if an error occurs
-                await page.close()
-                await browser.close()
-        return content
\ No newline at end of file
+        return content
+
+    async def scrape_as_completed(
+        self, urls: list[str], scrape: Callable[[str], Awaitable[T]]
+    ) -> AsyncIterator[tuple[int, T | None]]:
+        """
+        Run `scrape` over many URLs concurrently, yielding results as they finish.
+
+        Concurrency is bounded by `max_concurrency` overall and by the per-host
+        limits, and every call is cut off after `page_timeout` seconds. Each
+        result comes with the index of its URL in `urls`; a URL that fails or
+        times out yields None so callers can fall back to whatever they already
+        have. Scrapes still running when the caller stops are cancelled.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        limiter = HostRateLimiter(self.host_concurrency, self.host_interval)
+
+        async def run(index: int, url: str) -> tuple[int, T | None]:
+            async with semaphore, limiter.limit(url):
+                try:
+                    return index, await asyncio.wait_for(scrape(url), self.page_timeout)
+                except Exception as e:
+                    print(f"Error: failed to scrape {url}: {e!r}")
+                    return index, None
+
+        tasks = [asyncio.create_task(run(i, url)) for i, url in enumerate(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def scrape_many(
+        self, urls: list[str], scrape: Callable[[str], Awaitable[T]]
+    ) -> list[T | None]:
+        """Run `scrape` over many URLs concurrently; results keep the order of `urls`."""
+        results: list[T | None] = [None] * len(urls)
+        async with aclosing(self.scrape_as_completed(urls, scrape)) as scraped:
+            async for index, result in scraped:
+                results[index] = result
+        return results
+
+
+class NewsScraper(WebScraper, ABC):
+    """
+    A base class for news scrapers.
+
+    Detail pages scraped through `stream_details` are served from `cache`
+    while they are fresh, unless `refresh` is set.
+    """
+
+    cache: ArticleCache | None = None
+    refresh: bool = False
+
+    async def stream_details(
+        self,
+        urls: list[str],
+        scrape: Callable[[str], Awaitable[tuple[str, str] | None]],
+    ) -> AsyncIterator[tuple[int, tuple[str, str] | None]]:
+        """
+        Scrape (body, title) pairs of detail pages, skipping cached ones.
+
+        Cached pages are yielded first; the rest are scraped concurrently, and
+        cached, and yielded as they finish. Each result comes with the index
+        of its URL in `urls`. The cache is only touched from worker threads,
+        so its SQLite commits never block the event loop.
+        """
+        indexes: dict[str, list[int]] = {}
+        for index, url in enumerate(urls):
+            indexes.setdefault(url, []).append(index)
+        cached: dict[str, CachedArticle] = {}
+        if self.cache is not None and not self.refresh:
+            cached = await asyncio.to_thread(self.cache.get_many, list(indexes))
+        missing = []
+        for url in indexes:
+            if url not in cached:
+                missing.append(url)
+                continue
+            for index in indexes[url]:
+                yield index, (cached[url].content, cached[url].title)
+        async with aclosing(self.scrape_as_completed(missing, scrape)) as scraped:
+            async for position, detail in scraped:
+                url = missing[position]
+                # Pages that failed are retried next run rather than cached empty
+                if self.cache is not None and detail and detail[0]:
+                    await asyncio.to_thread(self.cache.put, url, detail[1], detail[0])
+                for index in indexes[url]:
+                    yield index, detail
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.evict)
+
+    async def stream_news(self) -> AsyncIterator[Article]:
+        """
+        Yield news articles as they are scraped.
+
+        Scrapers that can hand out articles before the whole scrape is done
+        override this; by default it yields the result of `scrape_news`.
+        """
+        for article in await self.scrape_news():
+            yield article
+
+    @abstractmethod
+    async def scrape_news(self) -> list[Article]:
+        """Scrape news articles and return a list of dictionaries with the article title, url, and content."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+
+async def close_scraper_resources() -> None:
+    """Release the shared HTTP client and browser pool used by scrapers."""
+    await close_http_fetcher()
+    # Playwright is only imported, and the pool only exists, once a page is rendered
+    browser_pool = sys.modules.get("lc_app.core.scrapers.browser_pool")
+    if browser_pool is not None:
+        await browser_pool.close_browser_pool()
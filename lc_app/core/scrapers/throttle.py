@@ -0,0 +1,39 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from urllib.parse import urlsplit
+
+
+class HostRateLimiter:
+    """
+    Limit how hard we hit any single host.
+
+    Each host gets its own concurrency cap and a minimum interval between the
+    start of two consecutive requests, so a fan-out over many article pages does
+    not hammer one origin even when the overall concurrency is high.
+    """
+
+    def __init__(self, per_host_concurrency: int, min_interval: float):
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.min_interval = max(0.0, min_interval)
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._last_start: dict[str, float] = {}
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        """Hold a slot for the host of `url` while the request runs."""
+        host = urlsplit(url).netloc
+        semaphore = self._semaphores.setdefault(
+            host, asyncio.Semaphore(self.per_host_concurrency)
+        )
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with semaphore:
+            async with lock:
+                next_start = self._last_start.get(host, 0.0) + self.min_interval
+                wait = next_start - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start[host] = time.monotonic()
+            yield
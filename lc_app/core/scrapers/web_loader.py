@@ -0,0 +1,216 @@
+import asyncio
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from hashlib import sha256
+from os import getenv, makedirs, path
+
+from langchain_core.documents import Document
+
+from lc_app.core.metrics import span, timed
+from lc_app.core.scrapers.extract import DEFAULT_EXTRACT_WORKERS, extract_many
+from lc_app.core.scrapers.fetchers import get_fetch_mode, get_http_fetcher
+from lc_app.core.scrapers.scraper import WebScraper, close_scraper_resources
+
+DEFAULT_WEB_CACHE_PATH = path.join(
+    path.expanduser("~"), ".cache", "lc_app", "web_text.sqlite3"
+)  # Extracted page text, keyed by URL and selector
+
+
+def web_selector(webpage_class: str) -> str:
+    """
+    Turn a --scrape-class value into a CSS selector.
+
+    A bare name such as "article" matches both elements with that tag and
+    elements with that class; anything else is used as a CSS selector.
+    """
+    if re.fullmatch(r"[\w-]+", webpage_class):
+        return f"{webpage_class}, .{webpage_class}"
+    return webpage_class
+
+
+@dataclass
+class CachedText:
+    etag: str | None
+    html_hash: str
+    text: str
+
+
+class WebTextCache:
+    """
+    A SQLite store of text extracted from web pages, keyed by URL and selector.
+
+    Entries keep the page's ETag, for conditional requests, and the hash of the
+    HTML the text was extracted from, so unchanged pages are not parsed again.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = path.dirname(db_path)
+        if directory:
+            makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS web_text (
+                url TEXT NOT NULL,
+                selector TEXT NOT NULL,
+                etag TEXT,
+                html_hash TEXT NOT NULL,
+                text TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (url, selector)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, url: str, selector: str) -> CachedText | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, html_hash, text FROM web_text "
+                "WHERE url = ? AND selector = ?",
+                (url, selector),
+            ).fetchone()
+        return CachedText(*row) if row else None
+
+    def put(self, url: str, selector: str, entry: CachedText) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO web_text "
+                "(url, selector, etag, html_hash, text, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, selector, entry.etag, entry.html_hash, entry.text, time.time()),
+            )
+            self._conn.commit()
+
+
+_web_text_caches: dict[str, WebTextCache] = {}
+
+
+def get_web_text_cache() -> WebTextCache | None:
+    """Get the process-wide web text cache, or None if it is disabled."""
+    if getenv("WEB_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    db_path = getenv("WEB_CACHE_PATH", DEFAULT_WEB_CACHE_PATH)
+    if db_path not in _web_text_caches:
+        _web_text_caches[db_path] = WebTextCache(db_path)
+    return _web_text_caches[db_path]
+
+
+@dataclass
+class _Page:
+    url: str
+    html: str | None = None
+    etag: str | None = None
+    rendered: bool = False
+    text: str | None = None
+
+
+class WebTextLoader(WebScraper):
+    """
+    Fetch web pages and extract the text of the elements matching a selector.
+
+    Pages are fetched concurrently as static HTML, with If-None-Match when an
+    ETag is cached, and rendered in the shared browser pool when the static
+    HTML has no matching element. HTML is parsed in a shared process pool. Pages that
+    are not modified, or whose HTML hashes the same as last time, reuse the
+    cached text without being parsed.
+    """
+
+    def __init__(
+        self,
+        selector: str,
+        cache: WebTextCache | None = None,
+        workers: int | None = None,
+    ):
+        self.selector = selector
+        self.cache = cache
+        self.workers = workers or int(
+            getenv("EXTRACT_WORKERS", DEFAULT_EXTRACT_WORKERS)
+        )
+
+    @timed("fetch")
+    async def _fetch(self, url: str) -> _Page:
+        mode = get_fetch_mode()
+        cached = self.cache.get(url, self.selector) if self.cache else None
+        if mode != "browser":
+            headers = None
+            if cached is not None and cached.etag:
+                headers = {"If-None-Match": cached.etag}
+            response = await get_http_fetcher().fetch(url, headers=headers)
+            if response is not None and response.status_code == 304:
+                return _Page(url, etag=cached.etag, text=cached.text)
+            if response is not None:
+                etag = response.headers.get("etag")
+                return _Page(url, html=response.text, etag=etag)
+            if mode == "http":
+                return _Page(url)
+        return await self._render(url)
+
+    async def _render(self, url: str) -> _Page:
+        html = await self.render_webpage(url, self.selector, error_on_timeout=False)
+        return _Page(url, html=html, rendered=True)
+
+    def _extract_all(self, pages: list[_Page]) -> None:
+        """Fill in the text of fetched pages, parsing only those that changed."""
+        to_parse = []
+        for page in pages:
+            if page.text is not None or page.html is None:
+                continue
+            html_hash = sha256(page.html.encode("utf-8")).hexdigest()
+            cached = self.cache.get(page.url, self.selector) if self.cache else None
+            if cached is not None and cached.html_hash == html_hash:
+                page.text = cached.text
+            else:
+                to_parse.append((page, html_hash))
+        if not to_parse:
+            return
+
+        jobs = [(page.html, self.selector) for page, _ in to_parse]
+        html_bytes = sum(len(html) for html, _ in jobs)
+        with span("extract", items=len(jobs), bytes=html_bytes):
+            texts = extract_many(jobs, self.workers)
+
+        for (page, html_hash), text in zip(to_parse, texts):
+            page.text = text
+            if self.cache is not None and text:
+                entry = CachedText(page.etag, html_hash, text)
+                self.cache.put(page.url, self.selector, entry)
+
+    async def load(self, urls: list[str]) -> list[Document]:
+        """Fetch and extract every URL, skipping pages without matching text."""
+        pages = await self.scrape_many(urls, self._fetch)
+        pages = [page if page else _Page(url) for url, page in zip(urls, pages)]
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._extract_all, pages)
+
+        if get_fetch_mode() == "auto":
+            # The element may only exist once client-side scripts have run
+            missing = [
+                page.url for page in pages if not page.text and not page.rendered
+            ]
+            if missing:
+                rendered = await self.scrape_many(missing, self._render)
+                rendered = [page for page in rendered if page]
+                await loop.run_in_executor(None, self._extract_all, rendered)
+                by_url = {page.url: page for page in rendered}
+                pages = [by_url.get(page.url, page) for page in pages]
+
+        return [
+            Document(page_content=page.text, metadata={"source": page.url})
+            for page in pages
+            if page.text
+        ]
+
+
+async def load_web_documents(loader: WebTextLoader, urls: list[str]) -> list[Document]:
+    """Load web documents and release the shared scraper resources afterwards."""
+    try:
+        return await loader.load(urls)
+    finally:
+        await close_scraper_resources()
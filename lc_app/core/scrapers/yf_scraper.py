@@ -1,7 +1,10 @@
+from contextlib import aclosing
 from datetime import datetime
+from typing import AsyncIterator
 
 from bs4 import BeautifulSoup
 
+from lc_app.core.scrapers.article_cache import ArticleCache
 from lc_app.core.scrapers.models import Article
 from lc_app.core.scrapers.scraper import NewsScraper
 
@@ -9,10 +12,19 @@ from lc_app.core.scrapers.scraper import NewsScraper
 class YahooFinanceNewsScraper(NewsScraper):
     """A class to scrape news articles from Yahoo Finance."""
 
-    def __init__(self, ticker: str | None = None, topic: str | None = None):
+    def __init__(
+        self,
+        ticker: str | None = None,
+        topic: str | None = None,
+        base_url: str = "https://finance.yahoo.com",
+        cache: ArticleCache | None = None,
+        refresh: bool = False,
+    ):
         self.ticker = ticker
+        self.cache = cache
+        self.refresh = refresh
         self.topic = topic if topic else "latest-news"
-        self.base_url = "https://finance.yahoo.com"
+        self.base_url = base_url.rstrip("/")
         if self.ticker:
             self.news_url = f"{self.base_url}/quote/{self.ticker}/latest-news/"
             self.wait_for = "div.news-stream"
@@ -22,29 +34,49 @@ class YahooFinanceNewsScraper(NewsScraper):
 
     async def scrape_news(self) -> list[Article]:
         """scrape news articles using playwright and return a list of dictionaries with the article title, url, and content."""
+        indexed = [item async for item in self._stream_indexed()]
+        # Streaming yields in completion order; return the listing's order
+        return [article for _, article in sorted(indexed, key=lambda item: item[0])]
+
+    async def stream_news(self) -> AsyncIterator[Article]:
+        """Yield each story of the listing page as soon as its detail page is in."""
+        async with aclosing(self._stream_indexed()) as indexed:
+            async for _, article in indexed:
+                yield article
+
+    async def _stream_indexed(self) -> AsyncIterator[tuple[int, Article]]:
+        """Yield stories with their position on the listing page as they finish."""
         content = await self.scrape_webpage(
             self.news_url,
             wait_for=self.wait_for,
         )
         if not content:
-            return []
+            return
         soup = BeautifulSoup(content, "html.parser")
         articles = soup.find_all("li", class_=lambda x: x and "story-item" in x)
-        news_data = []
+        stories = []
         for article in articles:
             title = article.find("h3").get_text()
             url = article.find("a")["href"]
             if not url.startswith("http"):
-                url = f"https://finance.yahoo.com{url}"
-            content, _ = await self.__scrape_detailed_page(url)
-            if not content:
-                content = article.find("p").get_text() if article.find("p") else ""
+                url = f"{self.base_url}{url}"
+            teaser = article.find("p").get_text() if article.find("p") else ""
+            source, published_at = None, None
             source_date = article.find("div", class_=lambda x: x and "publishing" in x)
             if source_date and len(source_date.contents) >= 3:
                 source = source_date.contents[0].get_text().strip()
                 published_at = source_date.contents[2].get_text().strip()
-            news_data.append(
-                Article(
+            stories.append((title, url, teaser, source, published_at))
+
+        # Cached stories come first, then uncached ones as their pages finish
+        details = self.stream_details(
+            [url for _, url, _, _, _ in stories], self.__scrape_detailed_page
+        )
+        async with aclosing(details):
+            async for index, detail in details:
+                title, url, teaser, source, published_at = stories[index]
+                content = detail[0] if detail and detail[0] else teaser
+                yield index, Article(
                     title=title,
                     url=url,
                     content=content,
@@ -55,8 +87,6 @@ class YahooFinanceNewsScraper(NewsScraper):
                     published_at=published_at,
                     system="Yahoo Finance",
                 )
-            )
-        return news_data
 
     async def __scrape_detailed_page(self, url: str) -> tuple[str, str] | None:
         """scrape detailed page using playwright and return the content."""
@@ -68,6 +98,8 @@ class YahooFinanceNewsScraper(NewsScraper):
         soup = BeautifulSoup(content, "html.parser")
         title = soup.find(
             name=("div", "h1"), class_=lambda x: x and "cover-title" in x
-        ).get_text()
-        article_body = soup.find("div", class_=lambda x: x and "body" in x).get_text()
-        return article_body, title
+        )
+        article_body = soup.find("div", class_=lambda x: x and "body" in x)
+        if article_body is None:
+            return None
+        return article_body.get_text(), title.get_text() if title else ""
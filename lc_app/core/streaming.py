@@ -0,0 +1,117 @@
+import re
+import time
+from dataclasses import dataclass, field
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+_THINK_BLOCK = re.compile(r"<think>.*?(</think>|$)\s*", re.DOTALL)
+
+
+@dataclass
+class StreamTimings:
+    """Latency breakdown of a single streamed answer."""
+
+    started_at: float = field(default_factory=time.perf_counter)
+    retrieval: float | None = None  # Seconds spent retrieving documents
+    first_token: float | None = None  # Seconds until the first token arrived
+    total: float | None = None  # Seconds until the last token arrived
+    tokens: int = 0  # Streamed chunks, one per token for Ollama
+
+    def mark_retrieved(self) -> None:
+        self.retrieval = time.perf_counter() - self.started_at
+
+    def mark_token(self) -> None:
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.started_at
+        self.tokens += 1
+
+    def mark_done(self) -> None:
+        self.total = time.perf_counter() - self.started_at
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        if self.total is None or self.first_token is None or self.tokens < 2:
+            return None
+        generation = self.total - self.first_token
+        # The first token ends the time to first token, so it is not counted
+        return (self.tokens - 1) / generation if generation > 0 else None
+
+    def as_dict(self) -> dict:
+        return {
+            "retrieval": self.retrieval,
+            "first_token": self.first_token,
+            "total": self.total,
+            "tokens": self.tokens,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+    def __str__(self) -> str:
+        def seconds(value: float | None) -> str:
+            return f"{value:.2f}s" if value is not None else "n/a"
+
+        rate = self.tokens_per_second
+        return (
+            f"retrieval {seconds(self.retrieval)}, "
+            f"time to first token {seconds(self.first_token)}, "
+            f"{self.tokens} tokens at {f'{rate:.1f}' if rate else 'n/a'} tokens/s, "
+            f"total {seconds(self.total)}"
+        )
+
+
+class ThinkFilter:
+    """
+    Drop `<think>...</think>` sections from a token stream.
+
+    Tags can be split across tokens, so text that might be the start of a tag is
+    held back until the next token shows whether it is one.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._thinking = False
+        self._after_think = False
+
+    def feed(self, token: str) -> str:
+        """Consume a token and return the text that can be shown so far."""
+        self._buffer += token
+        if self._after_think:
+            # Reasoning models put blank lines after the block
+            self._buffer = self._buffer.lstrip()
+            self._after_think = not self._buffer
+        shown = []
+        while self._buffer:
+            tag = THINK_CLOSE if self._thinking else THINK_OPEN
+            index = self._buffer.find(tag)
+            if index >= 0:
+                if not self._thinking:
+                    shown.append(self._buffer[:index])
+                self._buffer = self._buffer[index + len(tag) :]
+                if self._thinking:
+                    self._buffer = self._buffer.lstrip()
+                    self._after_think = not self._buffer
+                self._thinking = not self._thinking
+                continue
+            # Keep back a suffix that could still grow into the tag
+            keep = next(
+                (
+                    n
+                    for n in range(len(tag) - 1, 0, -1)
+                    if self._buffer.endswith(tag[:n])
+                ),
+                0,
+            )
+            if not self._thinking:
+                shown.append(self._buffer[: len(self._buffer) - keep])
+            self._buffer = self._buffer[len(self._buffer) - keep :]
+            break
+        return "".join(shown)
+
+    def flush(self) -> str:
+        """Return any text still held back at the end of the stream."""
+        rest, self._buffer = self._buffer, ""
+        return "" if self._thinking else rest
+
+
+def strip_think(text: str) -> str:
+    """Remove `<think>...</think>` sections from a complete answer."""
+    return _THINK_BLOCK.sub("", text)
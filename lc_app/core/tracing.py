@@ -0,0 +1,315 @@
+import atexit
+import queue
+import random
+import threading
+import time
+from os import getenv
+from typing import Any, Callable
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.documents import Document
+from langchain_core.outputs import LLMResult
+
+from lc_app.core.metrics import STAGE_ERRORS, record
+
+DEFAULT_TRACE_SAMPLE_RATE = 1.0  # Fraction of chain runs that are traced
+DEFAULT_TRACE_QUEUE_SIZE = 10000  # Events buffered before new ones are dropped
+DEFAULT_TRACE_BATCH_SIZE = 200  # Events shipped per flush
+DEFAULT_TRACE_FLUSH_INTERVAL = 1.0  # Seconds a partial batch waits before shipping
+DEFAULT_TRACE_SHUTDOWN_TIMEOUT = 5.0  # Seconds spent shipping queued events at exit
+
+# Callback events recorded and replayed on the exporting handler
+TRACED_EVENTS = (
+    "on_chain_start",
+    "on_chain_end",
+    "on_chain_error",
+    "on_llm_start",
+    "on_chat_model_start",
+    "on_llm_end",
+    "on_llm_error",
+    "on_retriever_start",
+    "on_retriever_end",
+    "on_retriever_error",
+    "on_tool_start",
+    "on_tool_end",
+    "on_tool_error",
+)
+
+
+class Tracer(BaseCallbackHandler):
+    """
+    A callback handler that records chain events and exports them off-thread.
+
+    Callbacks only put the event on a bounded queue, so a slow tracing host
+    never slows a query down. A background thread replays queued events on
+    the exporting handler, e.g. Langfuse's, in batches and flushes it after
+    each one. Runs are sampled as a whole, by their root run, and events that
+    do not fit in the queue are dropped and counted.
+    """
+
+    raise_error = False
+    run_inline = True
+
+    def __init__(
+        self,
+        handler_factory: Callable[[], BaseCallbackHandler],
+        sample_rate: float = DEFAULT_TRACE_SAMPLE_RATE,
+        queue_size: int = DEFAULT_TRACE_QUEUE_SIZE,
+        batch_size: int = DEFAULT_TRACE_BATCH_SIZE,
+        flush_interval: float = DEFAULT_TRACE_FLUSH_INTERVAL,
+    ):
+        self.handler_factory = handler_factory
+        self.sample_rate = sample_rate
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._sampled: dict[UUID, bool] = {}
+        self._handler: BaseCallbackHandler | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._counters = {
+            "queued": 0,
+            "dropped": 0,
+            "sampled_out": 0,
+            "sent": 0,
+            "failed": 0,
+            "flushes": 0,
+        }
+        self._flush_seconds_total = 0.0
+        self._flush_seconds_max = 0.0
+        self._flush_seconds_last = 0.0
+
+    def _is_sampled(self, event: str, run_id: UUID, parent_run_id: UUID | None) -> bool:
+        if event.endswith("_start"):
+            if parent_run_id is None:
+                sampled = random.random() < self.sample_rate
+                if not sampled:
+                    self._count("sampled_out")
+            else:
+                sampled = self._sampled.get(parent_run_id, False)
+            self._sampled[run_id] = sampled
+            return sampled
+        return self._sampled.pop(run_id, False)
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def _record(self, event: str, args: tuple, kwargs: dict[str, Any]) -> None:
+        run_id = kwargs.get("run_id")
+        if run_id is None or not self._is_sampled(
+            event, run_id, kwargs.get("parent_run_id")
+        ):
+            return
+        try:
+            self._queue.put_nowait((event, args, kwargs))
+        except queue.Full:
+            if event.endswith("_start"):
+                # Leave the rest of the run untraced rather than send half of it;
+                # finished runs were already forgotten by _is_sampled
+                self._sampled[run_id] = False
+            self._count("dropped")
+            return
+        self._count("queued")
+        if self._thread is None:
+            self._start()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="tracing", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _next_batch(self) -> list[tuple]:
+        """Wait for an event, then collect more until the batch is full or due."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _ship(self, batch: list[tuple]) -> None:
+        started_at = time.perf_counter()
+        failed = 0
+        try:
+            if self._handler is None:
+                self._handler = self.handler_factory()
+            for event, args, kwargs in batch:
+                try:
+                    getattr(self._handler, event)(*args, **kwargs)
+                except Exception:
+                    failed += 1
+            flush = getattr(self._handler, "flush", None)
+            if flush is not None:
+                flush()
+        except Exception as e:
+            print(f"Error: Failed to export traces: {e}")
+            failed = len(batch)
+        elapsed = time.perf_counter() - started_at
+        with self._lock:
+            self._counters["sent"] += len(batch) - failed
+            self._counters["failed"] += failed
+            self._counters["flushes"] += 1
+            self._flush_seconds_total += elapsed
+            self._flush_seconds_max = max(self._flush_seconds_max, elapsed)
+            self._flush_seconds_last = elapsed
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._ship(batch)
+
+    def close(self, timeout: float = DEFAULT_TRACE_SHUTDOWN_TIMEOUT) -> None:
+        """Ship the queued events, waiting at most `timeout` seconds."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """Get the tracer's counters and flush latencies in seconds."""
+        with self._lock:
+            flushes = self._counters["flushes"]
+            return {
+                **self._counters,
+                "pending": self._queue.qsize(),
+                "sample_rate": self.sample_rate,
+                "flush_seconds_avg": self._flush_seconds_total / flushes
+                if flushes
+                else 0.0,
+                "flush_seconds_max": self._flush_seconds_max,
+                "flush_seconds_last": self._flush_seconds_last,
+            }
+
+
+def _traced(event: str):
+    def method(self: Tracer, *args, **kwargs) -> None:
+        self._record(event, args, kwargs)
+
+    method.__name__ = event
+    return method
+
+
+for _event in TRACED_EVENTS:
+    setattr(Tracer, _event, _traced(_event))
+
+
+class StageMetricsHandler(BaseCallbackHandler):
+    """
+    Record the retriever and LLM runs inside a chain as metrics stages.
+
+    Retrieval is recorded as the "retrieve" stage, with the documents found,
+    and LLM calls as the "llm" stage, with the tokens the model reports.
+    """
+
+    raise_error = False
+    run_inline = True
+
+    def __init__(self):
+        self._started: dict[UUID, float] = {}
+
+    def _start(self, run_id: UUID) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def _finish(self, stage: str, run_id: UUID, **sizes: int | None) -> None:
+        started_at = self._started.pop(run_id, None)
+        if started_at is not None:
+            record(stage, time.perf_counter() - started_at, **sizes)
+
+    def _fail(self, stage: str, run_id: UUID) -> None:
+        self._started.pop(run_id, None)
+        STAGE_ERRORS.inc(stage=stage)
+
+    def on_retriever_start(self, serialized, query, *, run_id, **kwargs) -> None:
+        self._start(run_id)
+
+    def on_retriever_end(
+        self, documents: list[Document], *, run_id, **kwargs
+    ) -> None:
+        self._finish("retrieve", run_id, items=len(documents))
+
+    def on_retriever_error(self, error, *, run_id, **kwargs) -> None:
+        self._fail("retrieve", run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs) -> None:
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self._start(run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs) -> None:
+        self._finish("llm", run_id, tokens=_token_count(response))
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._fail("llm", run_id)
+
+
+def _token_count(response: LLMResult) -> int | None:
+    """Get the prompt plus completion tokens an LLM reported, if it did."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if "total_tokens" in usage:
+        return usage["total_tokens"]
+    # Ollama reports counts on the last generation of each prompt
+    counts = [
+        info.get("prompt_eval_count", 0) + info.get("eval_count", 0)
+        for generations in response.generations
+        for generation in generations
+        if (info := generation.generation_info)
+        and ("eval_count" in info or "prompt_eval_count" in info)
+    ]
+    return sum(counts) if counts else None
+
+
+stage_metrics_handler = StageMetricsHandler()
+
+_tracer: Tracer | None = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer(handler_factory: Callable[[], BaseCallbackHandler]) -> Tracer:
+    """
+    Get the process-wide tracer, creating it on first use.
+
+    `handler_factory` builds the exporting handler, on the tracer's thread,
+    the first time events are shipped. Sampling, queue and batch sizes come
+    from the TRACE_* env vars.
+    """
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(
+                handler_factory,
+                sample_rate=float(
+                    getenv("TRACE_SAMPLE_RATE", DEFAULT_TRACE_SAMPLE_RATE)
+                ),
+                queue_size=int(getenv("TRACE_QUEUE_SIZE", DEFAULT_TRACE_QUEUE_SIZE)),
+                batch_size=int(getenv("TRACE_BATCH_SIZE", DEFAULT_TRACE_BATCH_SIZE)),
+                flush_interval=float(
+                    getenv("TRACE_FLUSH_INTERVAL", DEFAULT_TRACE_FLUSH_INTERVAL)
+                ),
+            )
+        return _tracer
+
+
+def tracer_stats() -> dict | None:
+    """Get the process-wide tracer's counters, or None if nothing is traced."""
+    return _tracer.stats() if _tracer is not None else None
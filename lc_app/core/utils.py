@@ -1,8 +1,22 @@
+import queue
+import threading
 from datetime import datetime
-from typing import Callable, Awaitable, Any, TypeVar
-from asyncio import get_event_loop
+from typing import AsyncIterator, Callable, Awaitable, Any, Generic, Iterator, TypeVar
+from asyncio import (
+    AbstractEventLoop,
+    CancelledError,
+    Task,
+    get_event_loop,
+    new_event_loop,
+    set_event_loop,
+    sleep,
+)
 T = TypeVar("T")
 
+DEFAULT_STREAM_BUFFER = 64  # Items an async stream may run ahead of its consumer
+DEFAULT_STREAM_POLL_INTERVAL = 0.1  # Seconds between checks for a closed stream
+_DONE = object()
+
 
 def hydreate_template(template_str: str, placeholders: dict[str, str]) -> str:
     """
@@ -30,5 +44,124 @@ def run_sync(func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
     Run an async function synchronously.
     """
 
-    loop = get_event_loop()
-    return loop.run_until_complete(func(*args, **kwargs))
\ No newline at end of file
+    try:
+        loop = get_event_loop()
+    except RuntimeError:
+        # Worker threads have no event loop by default; give them their own
+        loop = new_event_loop()
+        set_event_loop(loop)
+    return loop.run_until_complete(func(*args, **kwargs))
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class SyncStream(Iterator[T], Generic[T]):
+    """
+    Iterate an async generator synchronously, while it keeps producing.
+
+    The generator runs as a task on its own event loop in a background thread
+    and hands items over through a queue of `buffer` items, so the consumer
+    works on the first items while later ones are still being produced.
+    Errors are raised to the consumer. `close` may be called from any thread:
+    it cancels the task at once, and a consumer waiting on another thread
+    stops as if the stream had ended.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., AsyncIterator[T]],
+        args: tuple,
+        kwargs: dict,
+        buffer: int = DEFAULT_STREAM_BUFFER,
+    ):
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._items: queue.Queue = queue.Queue(maxsize=max(1, buffer))
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._loop: AbstractEventLoop | None = None
+        self._task: Task | None = None
+        self._thread = threading.Thread(
+            target=self._run, name="sync-stream", daemon=True
+        )
+        self._thread.start()
+
+    async def _produce(self) -> None:
+        stream = self._func(*self._args, **self._kwargs)
+        try:
+            async for item in stream:
+                # Wait for room without blocking the loop's other tasks
+                while not self._stop.is_set():
+                    try:
+                        self._items.put_nowait(item)
+                        break
+                    except queue.Full:
+                        await sleep(0.01)
+                if self._stop.is_set():
+                    return
+        finally:
+            await stream.aclose()
+
+    def _run(self) -> None:
+        loop = new_event_loop()
+        set_event_loop(loop)
+        with self._lock:
+            self._loop = loop
+            self._task = loop.create_task(self._produce())
+            if self._stop.is_set():
+                self._task.cancel()
+        result: object = _DONE
+        try:
+            loop.run_until_complete(self._task)
+        except CancelledError:
+            pass
+        except BaseException as e:
+            result = _Failure(e)
+        finally:
+            with self._lock:
+                self._loop = None
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+        while not self._stop.is_set():
+            try:
+                self._items.put(result, timeout=DEFAULT_STREAM_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def __next__(self) -> T:
+        while not self._stop.is_set():
+            try:
+                item = self._items.get(timeout=DEFAULT_STREAM_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                self._stop.set()
+                break
+            if isinstance(item, _Failure):
+                self._stop.set()
+                raise item.error
+            return item
+        raise StopIteration
+
+    def close(self) -> None:
+        """Stop the stream, cancel the producer and wait for it to clean up."""
+        self._stop.set()
+        with self._lock:
+            if self._loop is not None and self._task is not None:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+
+
+def iter_sync(
+    func: Callable[..., AsyncIterator[T]],
+    *args: Any,
+    buffer: int = DEFAULT_STREAM_BUFFER,
+    **kwargs: Any,
+) -> SyncStream[T]:
+    """Iterate an async generator synchronously; see `SyncStream`."""
+    return SyncStream(func, args, kwargs, buffer)
@@ -0,0 +1,522 @@
+import json
+import sqlite3
+import threading
+import uuid
+from os import getenv, makedirs, path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+VECTOR_BACKENDS = ("chroma", "numpy")  # Supported vector store backends
+DEFAULT_VECTOR_BACKEND = "chroma"  # Backend for new collections
+CHROMA_DB_FILE = "chroma.sqlite3"  # Marks a directory as a Chroma collection
+NUMPY_MANIFEST_FILE = "vectors.json"  # Marks a directory as a NumPy collection
+NUMPY_VECTORS_FILE = "vectors.bin"  # Memory-mapped vectors, one row per record
+NUMPY_SCALES_FILE = "scales.bin"  # Per-row scales of int8 quantized vectors
+NUMPY_RECORDS_FILE = "records.sqlite3"  # IDs, documents and metadata by row
+DEFAULT_SEARCH_BLOCK = 65536  # Rows scored per NumPy matrix product
+
+_OPERATORS = {
+    "$eq": "=",
+    "$ne": "!=",
+    "$gt": ">",
+    "$gte": ">=",
+    "$lt": "<",
+    "$lte": "<=",
+}
+
+
+def _where_sql(where: dict) -> tuple[str, list]:
+    """Translate a Chroma `where` clause into SQL over JSON metadata."""
+    if len(where) != 1:
+        return _where_sql({"$and": [{key: value} for key, value in where.items()]})
+    key, value = next(iter(where.items()))
+    if key in ("$and", "$or"):
+        parts = [_where_sql(clause) for clause in value]
+        joiner = " AND " if key == "$and" else " OR "
+        sql = joiner.join(f"({part})" for part, _ in parts)
+        return sql, [param for _, params in parts for param in params]
+    field = "json_extract(metadata, ?)"
+    json_path = f'$."{key}"'
+    if not isinstance(value, dict):
+        return f"{field} = ?", [json_path, value]
+    (operator, operand), *rest = value.items()
+    if rest:
+        raise ValueError(f"Expected one operator for {key!r}, got {value!r}.")
+    if operator in ("$in", "$nin"):
+        placeholders = ",".join("?" * len(operand))
+        negate = "NOT " if operator == "$nin" else ""
+        return f"{field} {negate}IN ({placeholders})", [json_path, *operand]
+    if operator not in _OPERATORS:
+        raise ValueError(f"Unsupported filter operator {operator!r}.")
+    return f"{field} {_OPERATORS[operator]} ?", [json_path, operand]
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    A vector store that keeps embeddings in a memory-mapped array.
+
+    Vectors are normalized and stored row by row in a flat file, as float32 or
+    int8 with a per-row scale, and searched by brute-force cosine similarity
+    with NumPy. IDs, documents and metadata live in a SQLite table keyed by
+    row. Opening a collection only maps the file, and read-only mappings share
+    pages between the worker processes that search it.
+
+    Metadata filters use Chroma's `where` syntax. Scores returned by the
+    `*_with_score` methods are cosine distances, smaller is closer, like Chroma's.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        embedding_function: Embeddings | None = None,
+        dtype: str | None = None,
+    ):
+        self.db_path = db_path
+        self._embedding_function = embedding_function
+        self._lock = threading.Lock()
+        self._mapped: tuple[int, np.ndarray, np.ndarray | None] | None = None
+
+        makedirs(db_path, exist_ok=True)
+        manifest_path = path.join(db_path, NUMPY_MANIFEST_FILE)
+        if path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self._manifest = json.load(f)
+        else:
+            dtype = dtype or getenv("VECTOR_QUANTIZE") or "float32"
+            if dtype not in ("float32", "int8"):
+                raise ValueError(f"Unsupported vector dtype {dtype!r}.")
+            # Dimensions are only known once the first vectors are written
+            self._manifest = {"dtype": dtype, "dimensions": None}
+            self._write_manifest()
+
+        self._conn = sqlite3.connect(
+            path.join(db_path, NUMPY_RECORDS_FILE), check_same_thread=False, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                row INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                document TEXT,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @property
+    def embeddings(self) -> Embeddings | None:
+        return self._embedding_function
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self._manifest["dtype"])
+
+    def _file(self, name: str) -> str:
+        return path.join(self.db_path, name)
+
+    def _write_manifest(self) -> None:
+        with open(self._file(NUMPY_MANIFEST_FILE), "w") as f:
+            json.dump(self._manifest, f)
+
+    def _rows(self) -> int:
+        """Count the rows written to the vector file."""
+        manifest_path = self._file(NUMPY_MANIFEST_FILE)
+        if self._manifest["dimensions"] is None and path.exists(manifest_path):
+            # Another process wrote the first vectors since this store was opened
+            with open(manifest_path) as f:
+                self._manifest = json.load(f)
+        dimensions = self._manifest["dimensions"]
+        if not dimensions or not path.exists(self._file(NUMPY_VECTORS_FILE)):
+            return 0
+        return path.getsize(self._file(NUMPY_VECTORS_FILE)) // (
+            dimensions * self.dtype.itemsize
+        )
+
+    def layout(self) -> dict:
+        """Describe the vector file, including rows no record uses anymore."""
+        rows = self._rows()
+        with self._lock:
+            (records,) = self._conn.execute("SELECT COUNT(*) FROM records").fetchone()
+        return {
+            "dtype": self._manifest["dtype"],
+            "dimensions": self._manifest["dimensions"],
+            # Rows of deleted or replaced records, reclaimed by compaction
+            "unused_rows": rows - records,
+        }
+
+    def _matrix(self) -> tuple[np.ndarray, np.ndarray | None] | None:
+        """Map the vector file, remapping it when another writer has grown it."""
+        rows = self._rows()
+        if not rows:
+            return None
+        if self._mapped is None or self._mapped[0] != rows:
+            shape = (rows, self._manifest["dimensions"])
+            matrix = np.memmap(
+                self._file(NUMPY_VECTORS_FILE), dtype=self.dtype, mode="r", shape=shape
+            )
+            scales = None
+            if self.dtype == np.int8:
+                scales = np.memmap(
+                    self._file(NUMPY_SCALES_FILE),
+                    dtype=np.float32,
+                    mode="r",
+                    shape=(rows,),
+                )
+            self._mapped = (rows, matrix, scales)
+        return self._mapped[1], self._mapped[2]
+
+    def _encode(self, vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
+        """Normalize vectors and quantize them to the store's dtype."""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        if self.dtype != np.int8:
+            return vectors.astype(np.float32), None
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales = np.where(scales == 0, 1, scales).astype(np.float32)
+        quantized = np.round(vectors / scales[:, None]).astype(np.int8)
+        return quantized, scales
+
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: list[str],
+        metadatas: list[dict] | None = None,
+    ) -> None:
+        """Insert or replace records by ID with precomputed embeddings."""
+        if not ids:
+            return
+        metadatas = metadatas or [{} for _ in ids]
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            if self._manifest["dimensions"] is None:
+                self._manifest["dimensions"] = vectors.shape[1]
+                self._write_manifest()
+            elif vectors.shape[1] != self._manifest["dimensions"]:
+                raise ValueError(
+                    f"Expected {self._manifest['dimensions']} dimensions, "
+                    f"got {vectors.shape[1]}."
+                )
+            encoded, scales = self._encode(vectors)
+
+            existing = dict(self._select_rows(ids))
+            # Later copies of an ID within the call win
+            positions = {id_: i for i, id_ in enumerate(ids)}
+            updates = [
+                (existing[id_], i) for id_, i in positions.items() if id_ in existing
+            ]
+            appends = [i for id_, i in positions.items() if id_ not in existing]
+
+            next_row = self._rows()
+            rows = {ids[i]: next_row + n for n, i in enumerate(appends)}
+            rows.update({ids[i]: row for row, i in updates})
+            # Vectors are written before their records, so every visible
+            # record has a vector
+            self._write_vectors(encoded, scales, appends, updates)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO records (row, id, document, metadata) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (rows[id_], id_, documents[i], json.dumps(metadatas[i] or {}))
+                    for id_, i in positions.items()
+                ],
+            )
+            self._conn.commit()
+
+    def _write_vectors(
+        self,
+        encoded: np.ndarray,
+        scales: np.ndarray | None,
+        appends: list[int],
+        updates: list[tuple[int, int]],
+    ) -> None:
+        files = [(NUMPY_VECTORS_FILE, encoded)]
+        if scales is not None:
+            files.append((NUMPY_SCALES_FILE, scales))
+        for name, values in files:
+            row_bytes = values[0].nbytes
+            with open(self._file(name), "ab") as f:
+                f.write(values[appends].tobytes())
+            if updates:
+                with open(self._file(name), "r+b") as f:
+                    for row, i in updates:
+                        f.seek(row * row_bytes)
+                        f.write(values[i].tobytes())
+
+    def _select_rows(self, ids: list[str]) -> list[tuple[str, int]]:
+        found = []
+        unique = list(dict.fromkeys(ids))
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(unique), 500):
+            batch = unique[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            found += self._conn.execute(
+                f"SELECT id, row FROM records WHERE id IN ({placeholders})", batch
+            ).fetchall()
+        return found
+
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        include: Sequence[str] = ("documents", "metadatas"),
+    ) -> dict[str, Any]:
+        """Get records by ID and/or filter, shaped like Chroma's `get` result."""
+        clauses, params = [], []
+        if ids is not None:
+            if not ids:
+                return {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+            clauses.append(f"id IN ({','.join('?' * len(ids))})")
+            params += ids
+        if where:
+            sql, where_params = _where_sql(where)
+            clauses.append(sql)
+            params += where_params
+        query = "SELECT row, id, document, metadata FROM records"
+        if clauses:
+            query += " WHERE " + " AND ".join(f"({clause})" for clause in clauses)
+        query += " ORDER BY row"
+        if limit is not None or offset:
+            query += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset or 0]
+        with self._lock:
+            records = self._conn.execute(query, params).fetchall()
+        result: dict[str, Any] = {
+            "ids": [id_ for _, id_, _, _ in records],
+            "documents": [document for _, _, document, _ in records],
+            "metadatas": [json.loads(metadata) for _, _, _, metadata in records],
+        }
+        if "embeddings" in include:
+            mapped = self._matrix()
+            result["embeddings"] = (
+                [self._decode(row, *mapped) for row, _, _, _ in records]
+                if mapped
+                else []
+            )
+        return result
+
+    def _decode(self, row: int, matrix: np.ndarray, scales: np.ndarray | None):
+        if scales is None:
+            return np.asarray(matrix[row], dtype=np.float32)
+        return matrix[row].astype(np.float32) * scales[row]
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> None:
+        """Delete records by ID; their rows are left unused in the vector file."""
+        if not ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM records WHERE id = ?", [(id_,) for id_ in ids]
+            )
+            self._conn.commit()
+
+    def _search(
+        self, vector: Sequence[float], k: int, where: dict | None
+    ) -> list[tuple[Document, float]]:
+        mapped = self._matrix()
+        if mapped is None:
+            return []
+        matrix, scales = mapped
+        # Quantized rows are compared against the unquantized query
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1)
+
+        candidates = None
+        if where:
+            sql, params = _where_sql(where)
+            with self._lock:
+                candidates = np.fromiter(
+                    (
+                        row
+                        for (row,) in self._conn.execute(
+                            f"SELECT row FROM records WHERE {sql}", params
+                        )
+                    ),
+                    dtype=np.int64,
+                )
+            candidates = candidates[candidates < len(matrix)]
+            if not len(candidates):
+                return []
+
+        total = len(matrix) if candidates is None else len(candidates)
+        scores = np.empty(total, dtype=np.float32)
+        for start in range(0, total, DEFAULT_SEARCH_BLOCK):
+            end = min(start + DEFAULT_SEARCH_BLOCK, total)
+            rows = slice(start, end) if candidates is None else candidates[start:end]
+            block = matrix[rows]
+            if scales is None:
+                scores[start:end] = block @ query
+            else:
+                scores[start:end] = (block.astype(np.float32) @ query) * scales[rows]
+
+        # Over-fetch a little, rows of deleted records have no record anymore
+        fetch = min(total, k * 2 + 8)
+        top = np.argpartition(-scores, fetch - 1)[:fetch]
+        top = top[np.argsort(-scores[top])]
+        rows = top if candidates is None else candidates[top]
+        by_row = self._records_by_row([int(row) for row in rows])
+
+        results = []
+        for position, row in zip(top, rows):
+            record = by_row.get(int(row))
+            if record is None:
+                continue
+            id_, document, metadata = record
+            doc = Document(page_content=document, metadata=json.loads(metadata), id=id_)
+            results.append((doc, float(1 - scores[position])))
+            if len(results) == k:
+                break
+        return results
+
+    def _records_by_row(self, rows: list[int]) -> dict[int, tuple[str, str, str]]:
+        if not rows:
+            return {}
+        placeholders = ",".join("?" * len(rows))
+        with self._lock:
+            records = self._conn.execute(
+                f"SELECT row, id, document, metadata FROM records "
+                f"WHERE row IN ({placeholders})",
+                rows,
+            ).fetchall()
+        return {row: record for row, *record in records}
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        texts = list(texts)
+        if self._embedding_function is None:
+            raise ValueError("An embedding function is required to add texts.")
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        vectors = self._embedding_function.embed_documents(texts)
+        self.upsert(ids, vectors, texts, metadatas)
+        return ids
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        filter: dict | None = None,
+        **kwargs: Any,
+    ) -> list[tuple[Document, float]]:
+        """Search by vector; returns cosine distances, like Chroma does."""
+        return self._search(embedding, k, filter)
+
+    def similarity_search_by_vector(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        filter: dict | None = None,
+        **kwargs: Any,
+    ) -> list[Document]:
+        return [doc for doc, _ in self._search(embedding, k, filter)]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: dict | None = None, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        if self._embedding_function is None:
+            raise ValueError("An embedding function is required to search by text.")
+        return self._search(self._embedding_function.embed_query(query), k, filter)
+
+    def similarity_search(
+        self, query: str, k: int = 4, filter: dict | None = None, **kwargs: Any
+    ) -> list[Document]:
+        return [
+            doc for doc, _ in self.similarity_search_with_score(query, k, filter)
+        ]
+
+    def _select_relevance_score_fn(self):
+        return self._cosine_relevance_score_fn
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        db_path: str | None = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        if db_path is None:
+            raise ValueError("A db_path is required for a NumPy vector store.")
+        store = cls(db_path, embedding_function=embedding)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    def close(self) -> None:
+        self._mapped = None
+        self._conn.close()
+
+
+def collection_backend(db_path: str) -> str | None:
+    """Get the backend of an existing collection, or None if there is none."""
+    if path.isfile(path.join(db_path, NUMPY_MANIFEST_FILE)):
+        return "numpy"
+    if path.isfile(path.join(db_path, CHROMA_DB_FILE)):
+        return "chroma"
+    return None
+
+
+def is_collection(db_path: str) -> bool:
+    """Whether a directory holds a collection of any backend."""
+    return collection_backend(db_path) is not None
+
+
+def open_vectorstore(
+    db_path: str, embeddings: Embeddings | None = None, backend: str | None = None
+) -> VectorStore:
+    """
+    Open the vector store in a directory.
+
+    Existing collections are opened with the backend that created them; new
+    ones use `backend`, or the VECTOR_BACKEND env var, defaulting to Chroma.
+    Raises ValueError if `backend` conflicts with an existing collection's.
+    """
+    existing = collection_backend(db_path)
+    if existing is not None:
+        if backend is not None and backend != existing:
+            raise ValueError(
+                f"{db_path!r} is a {existing} collection; "
+                f"it cannot be opened as {backend}."
+            )
+        backend = existing
+    elif backend is None:
+        backend = getenv("VECTOR_BACKEND", DEFAULT_VECTOR_BACKEND)
+    if backend == "numpy":
+        return NumpyVectorStore(db_path, embedding_function=embeddings)
+    if backend == "chroma":
+        from langchain_chroma import Chroma
+
+        return Chroma(persist_directory=db_path, embedding_function=embeddings)
+    raise ValueError(f"Unsupported vector backend {backend!r}.")
+
+
+def upsert_vectors(
+    store: VectorStore,
+    ids: list[str],
+    embeddings: list[list[float]],
+    documents: list[str],
+    metadatas: list[dict],
+) -> None:
+    """Write precomputed embeddings to a store without re-embedding."""
+    if isinstance(store, NumpyVectorStore):
+        store.upsert(ids, embeddings, documents, metadatas)
+    else:
+        store._collection.upsert(
+            ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas
+        )